@@ -0,0 +1,96 @@
+"""
+Time how long the ingest CLI takes to import, per command
+
+    python benchmarks/cli_startup.py [--runs N] [--top N]
+
+Runs each command with --help under `python -X importtime` in a fresh interpreter, which imports main.py and
+parses the command line without running anything, and reports the median import time of kg_alzheimers.main with
+the slowest modules it pulled in. Also times importing cli_utils, which is what a transform worker loads.
+Commands over CLI_IMPORT_BUDGET_SECONDS, or that import one of HEAVY_MODULES, are flagged and the script exits 1.
+tests/unit/test_cli_startup.py checks the heavy modules, wall-clock times are too noisy for the unit tests.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+RUN_CLI = "from kg_alzheimers.main import typer_app; typer_app()"
+# modules only some commands need, none of them should be imported just to start the CLI
+HEAVY_MODULES = [
+    "biolink_model",
+    "cat_merge",
+    "closurizer",
+    "duckdb",
+    "kghub_downloader",
+    "kgx",
+    "koza.app",
+    "koza.cli_utils",
+    "linkml",
+    "linkml_runtime",
+    "pandas",
+    "pyarrow",
+    "sh",
+]
+# loading main.py took 1.2s when it imported all of cli_utils up front, it now takes ~0.15s
+CLI_IMPORT_BUDGET_SECONDS = 0.6
+COMMANDS = [
+    "--version",
+    "download",
+    "transform",
+    "merge",
+    "closure",
+    "jsonl",
+    "sqlite",
+    "solr",
+    "export",
+    "report",
+    "prepare-release",
+]
+
+
+def import_times(args: List[str]) -> Dict[str, int]:
+    """The cumulative import time in microseconds of each module imported by running python with args"""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, module = line.split("|")
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def heavy_modules(times: Dict[str, int]) -> List[str]:
+    """The HEAVY_MODULES among the imported modules"""
+    return sorted(heavy for heavy in HEAVY_MODULES if heavy in times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command, the median is reported")
+    parser.add_argument("--top", type=int, default=3, help="Slowest top-level imports to list per command")
+    args = parser.parse_args()
+
+    targets = {command: ["-c", RUN_CLI, command, "--help"] for command in COMMANDS}
+    targets["--version"] = ["-c", RUN_CLI, "--version"]
+    targets["(cli_utils)"] = ["-c", "import kg_alzheimers.cli_utils"]
+    module = {name: "kg_alzheimers.main" for name in targets}
+    module["(cli_utils)"] = "kg_alzheimers.cli_utils"
+
+    failed = False
+    for name, target in targets.items():
+        runs = [import_times(target) for _ in range(args.runs)]
+        median = statistics.median(times[module[name]] for times in runs) / 1e6
+        slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+        top = [f"{mod} {us / 1e6:.2f}s" for mod, us in slowest if "." not in mod and mod != "kg_alzheimers"]
+        heavy = heavy_modules(runs[-1])
+        problems = [f"over the {CLI_IMPORT_BUDGET_SECONDS}s budget"] if median > CLI_IMPORT_BUDGET_SECONDS else []
+        problems += [f"imports {', '.join(heavy)}"] if heavy else []
+        failed = failed or bool(problems)
+        print(f"{name:16} {median:6.2f}s  {', '.join(top[: args.top])}{'  ' + '; '.join(problems) if problems else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
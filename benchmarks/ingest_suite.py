@@ -0,0 +1,161 @@
+"""
+Run each ingest on synthetic sources at a range of sizes and record its throughput
+
+    python benchmarks/ingest_suite.py [--ingests NAME ...] [--scales 10k 1M] [--engine koza|columnar] [--label LABEL]
+
+The sources come from synthetic_sources.py, the same files for the same ingest and size every time. Each ingest runs
+in a fresh process, so peak RSS is its own, with the same Koza setup as `ingest transform`. Results are written
+like the metrics of an ingest run, one file per ingest and size, to benchmarks/results/<label>/<ingest>@<scale>.json,
+where the label defaults to the current commit. Compare two commits with
+
+    ingest metrics compare benchmarks/results/<before> benchmarks/results/<after>
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+from synthetic_sources import GENERATORS, generate
+
+INGESTS_DIR = Path("src/kg_alzheimers")
+RESULTS_DIR = Path("benchmarks/results")
+SCALES = ["10k", "1M"]
+
+
+def parse_scale(scale: str) -> int:
+    """10k -> 10000, 1M -> 1000000"""
+    multiplier = {"k": 1000, "M": 1000000}.get(scale[-1], 1)
+    return int(float(scale.rstrip("kM")) * multiplier)
+
+
+def default_label() -> str:
+    return subprocess.run(
+        ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def write_config(ingest: str, sources: Dict, directory: Path) -> Path:
+    """A copy of the ingest's config and transform code in directory, reading the synthetic sources"""
+    with open(INGESTS_DIR / "ingests.yaml") as fh:
+        source_file = INGESTS_DIR / yaml.safe_load(fh)[ingest]["config"]
+    with open(source_file) as fh:
+        config = yaml.safe_load(fh)
+
+    maps = sources.pop("maps", {})
+    config.update(
+        {key: [str(path) for path in value] if key == "files" else str(value) for key, value in sources.items()}
+    )
+    depends_on = []
+    for map_file in config.get("depends_on", []):
+        with open(map_file) as fh:
+            map_config = yaml.safe_load(fh)
+        map_config["files"] = [str(maps[Path(map_file).stem])]
+        depends_on.append(str(directory / Path(map_file).name))
+        Path(depends_on[-1]).write_text(yaml.safe_dump(map_config))
+    if depends_on:
+        config["depends_on"] = depends_on
+    # the expected counts are for the real sources
+    config.pop("min_node_count", None)
+    config.pop("min_edge_count", None)
+
+    ingest_dir = directory / "ingest"
+    ingest_dir.mkdir()
+    for py in source_file.parent.glob("*.py"):
+        shutil.copy(py, ingest_dir)
+    (ingest_dir / source_file.name).write_text(yaml.safe_dump(config))
+    return ingest_dir / source_file.name
+
+
+def run_ingest(ingest: str, config_file: str, output_dir: str, engine: str) -> Dict:
+    """Run the ingest like `ingest transform` does, in the process the suite starts for it"""
+    import importlib
+
+    from koza.cli_utils import transform_source
+    from koza.model.config.source_config import OutputFormat
+
+    from kg_alzheimers.columnar import COLUMNAR_INGESTS
+    from kg_alzheimers.utils.json_utils import use_streaming_json_reader
+    from kg_alzheimers.utils.map_utils import use_compiled_maps
+    from kg_alzheimers.utils.metrics_utils import collect_metrics, use_row_counts
+
+    columnar = engine == "columnar" and ingest in COLUMNAR_INGESTS
+    if columnar:
+        # imported before the clock starts, like Koza is
+        engine_module = importlib.import_module(COLUMNAR_INGESTS[ingest])
+    use_streaming_json_reader()
+    use_compiled_maps(f"{output_dir}/map_cache")
+    use_row_counts()
+    with collect_metrics(ingest, output_dir, engine="columnar" if columnar else "koza") as metrics:
+        if columnar:
+            engine_module.transform(output_dir=f"{output_dir}/transform_output", config_file=Path(config_file))
+        else:
+            transform_source(
+                source=config_file,
+                output_dir=f"{output_dir}/transform_output",
+                output_format=OutputFormat.tsv,
+                verbose=False,
+            )
+    return metrics
+
+
+def benchmark(ingest: str, scale: str, engine: str = "koza", workdir: Path = None) -> Dict:
+    """Generate the sources of ingest at scale, run it in a fresh process and return its metrics"""
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        directory = Path(tmp)
+        start = time.perf_counter()
+        rows = parse_scale(scale)
+        sources = generate(ingest, directory / "data", rows)
+        generate_seconds = time.perf_counter() - start
+        config_file = write_config(ingest, sources, directory)
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            metrics = pool.submit(run_ingest, ingest, str(config_file), str(directory / "output"), engine).result()
+    if metrics["rows_read"] is None:
+        # the columnar engines read every row of their sources
+        metrics["rows_read"] = rows
+        metrics["rows_per_second"] = round(rows / metrics["wall_seconds"], 1) if metrics["wall_seconds"] else None
+    return {**metrics, "ingest": f"{ingest}@{scale}", "scale": scale, "generate_seconds": round(generate_seconds, 3)}
+
+
+def format_results(results: List[Dict]) -> str:
+    header = f"{'ingest':<40} {'rows read':>10} {'written':>10} {'seconds':>8} {'rows/s':>10} {'peak RSS MB':>11}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result['ingest']:<40} {result['rows_read'] or 0:>10} {result['rows_written']:>10} "
+            f"{result['wall_seconds']:>8.1f} {result['rows_per_second'] or 0:>10.0f} {result['peak_rss_mb']:>11.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ingests", nargs="+", default=sorted(GENERATORS), choices=sorted(GENERATORS), metavar="NAME")
+    parser.add_argument("--scales", nargs="+", default=SCALES, help="Rows per ingest, e.g. 10k or 1M")
+    parser.add_argument("--engine", choices=["koza", "columnar"], default="koza")
+    parser.add_argument("--label", help="Results directory name, defaults to the current commit")
+    args = parser.parse_args()
+
+    results_dir = RESULTS_DIR / (args.label or default_label())
+    results_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    for scale in args.scales:
+        for ingest in args.ingests:
+            result = benchmark(ingest, scale, engine=args.engine)
+            (results_dir / f"{result['ingest']}.json").write_text(json.dumps(result, indent=2))
+            print(format_results([result]).splitlines()[-1], flush=True)
+            results.append(result)
+    print(format_results(results))
+    print(f"Results written to {results_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Time the per-row work hoisted out of ingest loops, before and after
+
+    python benchmarks/loop_invariants.py [--rows N]
+
+Runs a loop like the xenbase publication_to_gene ingest's map lookup plus mgi publication_to_gene's
+resolve_term("mentions") over synthetic rows, once with the map fetch and resolve_term inside the loop as the ingests
+had them, and once with them bound before the loop, using a KozaApp with the repo's translation table.
+"""
+
+import argparse
+import time
+
+from koza.app import KozaApp
+from koza.cli_utils import get_translation_table
+from loguru import logger
+
+GLOBAL_TABLE = "src/kg_alzheimers/translation_table.yaml"
+
+
+def make_koza_app(genes: int) -> KozaApp:
+    koza_app = KozaApp.__new__(KozaApp)
+    koza_app._map_cache = {"genepage-2-gene": {str(i): {"gene_id": f"{i}-g"} for i in range(genes)}}
+    koza_app.translation_table = get_translation_table(GLOBAL_TABLE, None, logger)
+    return koza_app
+
+
+def before(koza_app: KozaApp, rows: list):
+    for row in rows:
+        koza_app.translation_table.resolve_term("mentions")
+        genepage2gene = koza_app.get_map("genepage-2-gene")
+        list(genepage2gene[row].values())
+
+
+def after(koza_app: KozaApp, rows: list):
+    koza_app.translation_table.resolve_term("mentions")
+    genepage2gene = koza_app.get_map("genepage-2-gene")
+    for row in rows:
+        list(genepage2gene[row].values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="Synthetic rows")
+    args = parser.parse_args()
+
+    koza_app = make_koza_app(genes=10000)
+    rows = [str(i % 10000) for i in range(args.rows)]
+
+    timings = {}
+    for name, loop in [("before", before), ("after", after)]:
+        start = time.perf_counter()
+        loop(koza_app, rows)
+        timings[name] = time.perf_counter() - start
+
+    for name, seconds in timings.items():
+        print(f"{name}: {seconds:8.2f}s  {seconds / args.rows * 1e9:6.0f}ns per row")
+    print(f"saved:  {timings['before'] - timings['after']:8.2f}s per {args.rows} rows")
+
+
+if __name__ == "__main__":
+    main()
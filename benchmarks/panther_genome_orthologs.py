@@ -0,0 +1,94 @@
+"""
+Compare the Koza and columnar Panther genome orthologs engines
+
+    python benchmarks/panther_genome_orthologs.py [--rows N]
+
+Uses data/panther/AllOrthologs.tar.gz when it has been downloaded, otherwise generates a synthetic archive
+where, like the real file, most rows are for species outside ncbitaxon_catalog.
+"""
+
+import argparse
+import io
+import random
+import shutil
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from kg_alzheimers.columnar import panther_genome_orthologs
+from kg_alzheimers.ingests.panther.orthology_utils import ncbitaxon_catalog
+
+ARCHIVE = Path("data/panther/AllOrthologs.tar.gz")
+INGEST_DIR = Path("src/kg_alzheimers/ingests/panther")
+OTHER_SPECIES = [f"SP{i:03d}" for i in range(130)]
+DATABASES = ["Ensembl", "GeneID", "FlyBase", "WormBase", "PomBase", "EnsemblGenome", "Gene_ORFName", "HGNC"]
+
+
+def make_synthetic_archive(directory: Path, rows: int) -> Path:
+    rng = random.Random(0)
+    species = list(ncbitaxon_catalog) + OTHER_SPECIES
+
+    def gene() -> str:
+        return (
+            f"{rng.choice(species)}|{rng.choice(DATABASES)}=G{rng.randint(1, 10**6)}|UniProtKB=P{rng.randint(1, 10**5)}"
+        )
+
+    data = "".join(f"{gene()}\t{gene()}\tLDO\tEukaryota\tPTHR{rng.randint(10000, 50000)}\n" for _ in range(rows))
+    data = data.encode()
+    archive = directory / "AllOrthologs.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        info = tarfile.TarInfo("AllOrthologs")
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+    return archive
+
+
+def write_config(directory: Path, archive: Path) -> Path:
+    with open(INGEST_DIR / "genome_orthologs.yaml") as fh:
+        config = yaml.safe_load(fh)
+    config["file_archive"] = str(archive)
+    ingest_dir = directory / "ingest"
+    ingest_dir.mkdir()
+    shutil.copy(INGEST_DIR / "genome_orthologs.py", ingest_dir)
+    (ingest_dir / "genome_orthologs.yaml").write_text(yaml.safe_dump(config))
+    return ingest_dir / "genome_orthologs.yaml"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows in the synthetic archive")
+    args = parser.parse_args()
+
+    from koza.cli_utils import transform_source
+    from koza.model.config.source_config import OutputFormat
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        if ARCHIVE.is_file():
+            archive = directory / ARCHIVE.name
+            shutil.copy(ARCHIVE, archive)
+        else:
+            print(f"{ARCHIVE} not found, generating {args.rows} synthetic rows")
+            archive = make_synthetic_archive(directory, args.rows)
+        config_file = write_config(directory, archive)
+
+        start = time.perf_counter()
+        panther_genome_orthologs.transform(output_dir=str(directory / "columnar"), config_file=config_file)
+        columnar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        transform_source(
+            source=str(config_file), output_dir=str(directory / "koza"), output_format=OutputFormat.tsv, verbose=False
+        )
+        koza = time.perf_counter() - start
+
+    print(f"koza:     {koza:8.1f}s")
+    print(f"columnar: {columnar:8.1f}s")
+    print(f"speedup:  {koza / columnar:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare the Koza and columnar STRING protein links engines on the human file
+
+    python benchmarks/string_protein_links.py [--rows N]
+
+Uses data/string/9606.protein_links.txt.gz and data/string/entrez_2_string.tsv when they have been downloaded,
+otherwise generates a synthetic human file with the given number of rows.
+"""
+
+import argparse
+import gzip
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from kg_alzheimers.columnar import string_protein_links
+
+HUMAN_FILE = Path("data/string/9606.protein_links.txt.gz")
+MAP_FILE = Path("data/string/entrez_2_string.tsv")
+INGEST_DIR = Path("src/kg_alzheimers/ingests/string")
+
+
+def make_synthetic_data(directory: Path, rows: int, proteins: int = 20000):
+    rng = random.Random(0)
+    ids = [f"9606.ENSP{i:011d}" for i in range(proteins)]
+    map_file = directory / "entrez_2_string.tsv"
+    with open(map_file, "w") as fh:
+        fh.write("#NCBI taxid / entrez / STRING\n")
+        for i, protein in enumerate(ids):
+            genes = "|".join(str(100000 + i * 3 + j) for j in range(1 + (i % 20 == 0)))
+            fh.write(f"9606\t{genes}\t{protein}\n")
+    links_file = directory / "9606.protein_links.txt.gz"
+    with gzip.open(links_file, "wt") as fh:
+        fh.write(
+            "protein1 protein2 neighborhood fusion cooccurence coexpression experimental database textmining "
+            "combined_score\n"
+        )
+        for _ in range(rows):
+            scores = " ".join(str(rng.choice([0, 0, rng.randint(1, 999)])) for _ in range(7))
+            fh.write(f"{rng.choice(ids)} {rng.choice(ids)} {scores} {rng.randint(150, 999)}\n")
+    return links_file, map_file
+
+
+def write_configs(directory: Path, links_file: Path, map_file: Path) -> Path:
+    with open("src/kg_alzheimers/maps/entrez-2-string.yaml") as fh:
+        map_config = yaml.safe_load(fh)
+    map_config["files"] = [str(map_file)]
+    (directory / "entrez-2-string.yaml").write_text(yaml.safe_dump(map_config))
+
+    with open(INGEST_DIR / "protein_links.yaml") as fh:
+        config = yaml.safe_load(fh)
+    config["files"] = [str(links_file)]
+    config["depends_on"] = [str(directory / "entrez-2-string.yaml")]
+    ingest_dir = directory / "ingest"
+    ingest_dir.mkdir()
+    for py in INGEST_DIR.glob("*.py"):
+        shutil.copy(py, ingest_dir)
+    (ingest_dir / "protein_links.yaml").write_text(yaml.safe_dump(config))
+    return ingest_dir / "protein_links.yaml"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500000, help="Rows in the synthetic file")
+    args = parser.parse_args()
+
+    from koza.cli_utils import transform_source
+    from koza.model.config.source_config import OutputFormat
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        if HUMAN_FILE.is_file() and MAP_FILE.is_file():
+            links_file, map_file = HUMAN_FILE.resolve(), MAP_FILE.resolve()
+        else:
+            print(f"{HUMAN_FILE} not found, generating {args.rows} synthetic rows")
+            links_file, map_file = make_synthetic_data(directory, args.rows)
+        config_file = write_configs(directory, links_file, map_file)
+
+        start = time.perf_counter()
+        string_protein_links.transform(output_dir=str(directory / "columnar"), config_file=config_file)
+        columnar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        transform_source(
+            source=str(config_file), output_dir=str(directory / "koza"), output_format=OutputFormat.tsv, verbose=False
+        )
+        koza = time.perf_counter() - start
+
+    print(f"koza:     {koza:8.1f}s")
+    print(f"columnar: {columnar:8.1f}s")
+    print(f"speedup:  {koza / columnar:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+"""
+Deterministic synthetic source files for the ingests in ingests.yaml, for benchmarks/ingest_suite.py
+
+Each generator writes files in the format of the real source, e.g. Bgee's gzipped expr_simple TSVs grouped by gene,
+the Alliance BGI and expression JSON with the records under "data", CTD's commented preamble, with a mix of rows
+the ingest keeps, filters out or skips, like the real files. A generator takes the directory to write to, the
+number of rows across its primary files and a seeded Random, and returns the config entries to replace:
+
+    {"files": [...], "maps": {"taxon-labels": Path(...)}}
+
+"maps" has the data file for each map the ingest depends_on, by the map config's file name. Other keys, like
+file_archive, replace the ingest config's own.
+"""
+
+import gzip
+import json
+import random
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from panther_genome_orthologs import make_synthetic_archive
+from string_protein_links import make_synthetic_data
+
+TAXA = {
+    "NCBITaxon:9606": "Homo sapiens",
+    "NCBITaxon:10090": "Mus musculus",
+    "NCBITaxon:10116": "Rattus norvegicus",
+    "NCBITaxon:7955": "Danio rerio",
+    "NCBITaxon:7227": "Drosophila melanogaster",
+    "NCBITaxon:6239": "Caenorhabditis elegans",
+    "NCBITaxon:44689": "Dictyostelium discoideum",
+    "NCBITaxon:4896": "Schizosaccharomyces pombe",
+    "NCBITaxon:559292": "Saccharomyces cerevisiae S288C",
+    "NCBITaxon:8364": "Xenopus tropicalis",
+}
+# Alliance providers, with their gene id prefix, taxon and anatomy ontology
+PROVIDERS = {
+    "MGI": ("MGI", "NCBITaxon:10090", "EMAPA"),
+    "ZFIN": ("ZFIN:ZDB-GENE-", "NCBITaxon:7955", "ZFA"),
+    "RGD": ("RGD", "NCBITaxon:10116", "UBERON"),
+    "FB": ("FB:FBgn", "NCBITaxon:7227", "FBbt"),
+    "WB": ("WB:WBGene", "NCBITaxon:6239", "WBbt"),
+    "SGD": ("SGD:S", "NCBITaxon:559292", "UBERON"),
+}
+REACTOME_SPECIES = ["Homo sapiens", "Mus musculus", "Rattus norvegicus", "Danio rerio", "Bos taurus", "Gallus gallus"]
+# species Reactome has that aren't in reactome_id_mapping.yaml
+OTHER_REACTOME_SPECIES = ["Plasmodium falciparum", "Mycobacterium tuberculosis"]
+BGEE_COLUMNS = [
+    "Gene ID", "Gene name", "Anatomical entity ID", "Anatomical entity name", "Expression", "Call quality", "FDR",
+    "Expression score", "Expression rank",
+]  # fmt: skip
+HGNC_COLUMNS = [
+    "hgnc_id", "symbol", "name", "locus_group", "locus_type", "status", "location", "location_sortable",
+    "alias_symbol", "alias_name", "prev_symbol", "prev_name", "gene_group", "gene_group_id", "date_approved_reserved",
+    "date_symbol_changed", "date_name_changed", "date_modified", "entrez_id", "ensembl_gene_id", "vega_id", "ucsc_id",
+    "ena", "refseq_accession", "ccds_id", "uniprot_ids", "pubmed_id", "mgd_id", "rgd_id", "lsdb", "cosmic", "omim_id",
+    "mirbase", "homeodb", "snornabase", "bioparadigms_slc", "orphanet", "pseudogene.org", "horde_id", "merops", "imgt",
+    "iuphar", "kznf_gene_catalog", "mamit-trnadb", "cd", "lncrnadb", "enzyme_id", "intermediate_filament_db",
+    "rna_central_id", "lncipedia", "gtrnadb", "agr", "mane_select", "gencc",
+]  # fmt: skip
+POMBASE_PHAF_COLUMNS = [
+    "Database name", "Gene systematic ID", "FYPO ID", "Allele description", "Expression", "Parental strain",
+    "Strain name (background)", "Genotype description", "Gene symbol", "Allele name", "Allele synonym", "Allele type",
+    "Evidence", "Condition", "Penetrance", "Severity", "Extension", "Reference", "Taxon", "Date", "Ploidy",
+]  # fmt: skip
+XENBASE_COLUMNS = [
+    "SUBJECT", "SUBJECT_LABEL", "SUBJECT_TAXON", "SUBJECT_TAXON_LABEL", "OBJECT", "OBJECT_LABEL", "RELATION",
+    "RELATION_LABEL", "EVIDENCE", "EVIDENCE_LABEL", "SOURCE", "IS_DEFINED_BY", "QUALIFIER",
+]  # fmt: skip
+
+
+def _open(path: Path):
+    return gzip.open(path, "wt") if path.suffix == ".gz" else open(path, "w")
+
+
+def write_tsv(path: Path, lines: Iterable[List[str]], header: List[str] = None, preamble: List[str] = ()) -> Path:
+    with _open(path) as fh:
+        for line in preamble:
+            fh.write(f"{line}\n")
+        if header:
+            fh.write("\t".join(header) + "\n")
+        for line in lines:
+            fh.write("\t".join(line) + "\n")
+    return path
+
+
+def write_json(path: Path, data: Iterable[Dict]) -> Path:
+    """Alliance style json, the records under "data", written one record at a time"""
+    with _open(path) as fh:
+        fh.write('{"metaData": {"dataProvider": {"type": "curated"}, "release": "synthetic"}, "data": [')
+        for i, record in enumerate(data):
+            fh.write(("," if i else "") + json.dumps(record))
+        fh.write("]}\n")
+    return path
+
+
+def split(rows: int, parts: int) -> List[int]:
+    """rows spread over parts files"""
+    return [rows // parts + (i < rows % parts) for i in range(parts)]
+
+
+def taxon_labels(directory: Path) -> Path:
+    return write_tsv(directory / "taxon_labels.tsv", TAXA.items())
+
+
+def pmid(rng: random.Random) -> str:
+    return f"PMID:{rng.randint(10**6, 4 * 10**7)}"
+
+
+def alliance_gene(directory: Path, rows: int, rng: random.Random) -> Dict:
+    def _genes(provider: str, prefix: str, taxon: str, count: int):
+        for i in range(count):
+            entity = {
+                "primaryId": f"{prefix}:{i}" if ":" not in prefix else f"{prefix}{i:07d}",
+                "taxonId": taxon,
+                "crossReferences": [
+                    {"id": f"ENSEMBL:ENSG{rng.randint(1, 10**6):011d}", "pages": ["default"]},
+                    {"id": f"UniProtKB:P{rng.randint(10000, 99999)}", "pages": []},
+                ][: rng.randint(0, 2)],
+            }
+            if rng.random() < 0.6:
+                entity["synonyms"] = [f"syn{i}-{j}" for j in range(rng.randint(1, 4))]
+            record = {"basicGeneticEntity": entity, "symbol": f"{provider}g{i}", "soTermId": "SO:0001217"}
+            if rng.random() < 0.9:
+                record["name"] = f"{provider} gene {i}\r" if rng.random() < 0.01 else f"{provider} gene {i}"
+            yield record
+
+    files = [
+        write_json(directory / f"BGI_{provider}.json.gz", _genes(provider, prefix, taxon, count))
+        for (provider, (prefix, taxon, _)), count in zip(PROVIDERS.items(), split(rows, len(PROVIDERS)))
+    ]
+    return {"files": files, "maps": {"taxon-labels": taxon_labels(directory)}}
+
+
+def alliance_gene_to_expression(directory: Path, rows: int, rng: random.Random) -> Dict:
+    def _expression(provider: str, prefix: str, anatomy: str, count: int):
+        for _ in range(count):
+            gene = rng.randint(1, max(count // 10, 1))
+            record = {
+                "geneId": f"{prefix}:{gene}" if ":" not in prefix else f"{prefix}{gene:07d}",
+                "evidence": {"publicationId": pmid(rng)},
+                "assay": rng.choice(["MMO:0000655", "MMO:0000658", "MMO:0000640"]),
+                "dateAssigned": "2020-01-01T00:00:00-00:00",
+            }
+            site = rng.random()
+            if site < 0.8:
+                record["whereExpressed"] = {"anatomicalStructureTermId": f"{anatomy}:{rng.randint(1, 30000):07d}"}
+            elif site < 0.95:
+                record["whereExpressed"] = {"cellularComponentTermId": f"GO:{rng.randint(1, 70000):07d}"}
+            else:
+                # no expression site, logged and skipped
+                record["whereExpressed"] = {"whereExpressedStatement": "embryo"}
+            if provider in ["ZFIN", "FB"]:
+                record["whenExpressed"] = {"stageTermId": f"{anatomy[:2]}S:{rng.randint(1, 50):07d}"}
+            if rng.random() < 0.5:
+                record["crossReference"] = {"id": f"{provider}:{rng.randint(1, 10**6)}"}
+            yield record
+
+    files = [
+        write_json(directory / f"EXPRESSION_{provider}.json.gz", _expression(provider, prefix, anatomy, count))
+        for (provider, (prefix, _, anatomy)), count in zip(PROVIDERS.items(), split(rows, len(PROVIDERS)))
+    ]
+    return {"files": files}
+
+
+def bgee_gene_to_expression(directory: Path, rows: int, rng: random.Random) -> Dict:
+    """Rows grouped by gene, about 20 anatomical entities each, some of them failing the rank, score or FDR filters"""
+
+    def _rows(species: str, count: int):
+        gene = 0
+        for i in range(count):
+            if i % 20 == 0:
+                gene += 1
+            entity = f"UBERON:{rng.randint(1, 20000):07d}"
+            if rng.random() < 0.1:
+                entity += f" ∩ CL:{rng.randint(1, 5000):07d}"
+            rank = rng.uniform(1, 40000)
+            yield [
+                f"ENS{species[:3].upper()}G{gene:011d}",
+                f"gene{gene}",
+                entity,
+                "anatomical entity",
+                "present",
+                rng.choice(["gold quality", "silver quality"]),
+                f"{rng.choice([0.0001, 0.001, 0.01, 0.1]):g}",
+                f"{100 - rank / 400:.2f}",
+                f"{rank:.2f}",
+            ]
+
+    files = [
+        write_tsv(directory / f"{species}_expr_simple.tsv.gz", _rows(species, count), BGEE_COLUMNS)
+        for species, count in zip(["Homo_sapiens", "Bos_taurus", "Sus_scrofa"], split(rows, 3))
+    ]
+    return {"files": files}
+
+
+def ctd_chemical_to_disease(directory: Path, rows: int, rng: random.Random) -> Dict:
+    """Mostly inferred associations, which the ingest skips, after CTD's 27 line preamble"""
+    preamble = ["# Comparative Toxicogenomics Database (CTD)"] + ["#"] * 26
+    header = [
+        "# ChemicalName", "ChemicalID", "CasRN", "DiseaseName", "DiseaseID", "DirectEvidence", "InferenceGeneSymbol",
+        "InferenceScore", "OmimIDs", "PubMedIDs",
+    ]  # fmt: skip
+
+    def _rows():
+        yield ["#"]
+        for _ in range(rows):
+            evidence = rng.choices(["", "therapeutic", "marker/mechanism"], weights=[90, 5, 5])[0]
+            yield [
+                "chemical",
+                f"D{rng.randint(1, 999999):06d}",
+                "",
+                "disease",
+                f"MESH:D{rng.randint(1, 99999):06d}",
+                evidence,
+                "" if evidence else f"GENE{rng.randint(1, 20000)}",
+                "" if evidence else f"{rng.uniform(1, 100):.2f}",
+                "",
+                "|".join(str(rng.randint(10**6, 4 * 10**7)) for _ in range(rng.randint(1, 3))),
+            ]
+
+    return {"files": [write_tsv(directory / "CTD_chemicals_diseases.tsv.gz", _rows(), header, preamble)]}
+
+
+def dictybase_gene(directory: Path, rows: int, rng: random.Random) -> Dict:
+    def _rows():
+        for i in range(rows):
+            synonyms = ", ".join(f"dsyn{i}-{j}" for j in range(rng.randint(0, 3)))
+            yield [f"DDB_G{i:07d}", f"gene{i}", synonyms, f"product {i}"]
+
+    data = write_tsv(directory / "gene_information.txt", _rows(), ["GENE ID", "Gene Name", "Synonyms", "Gene products"])
+    return {"files": [data], "maps": {"taxon-labels": taxon_labels(directory)}}
+
+
+def dictybase_gene_to_phenotype(directory: Path, rows: int, rng: random.Random) -> Dict:
+    """Strains with one or more genes and phenotypes, a few of the phenotype names unknown to ddpheno"""
+    phenotypes = [f"phenotype {i}" for i in range(2000)]
+    ddpheno = write_tsv(
+        directory / "ddpheno.tsv", ([f"DDPHENO:{i:07d}", name] for i, name in enumerate(phenotypes)), ["id", "name"]
+    )
+
+    def _rows():
+        for i in range(rows):
+            genes = [f"DDB_G{rng.randint(1, 13000):07d}" for _ in range(rng.choices([1, 2], weights=[9, 1])[0])]
+            names = rng.sample(phenotypes, rng.randint(1, 4))
+            if rng.random() < 0.02:
+                names.append("unknown phenotype")
+            symbols = "|".join(f"gene{int(gene[5:])}" for gene in genes)
+            yield [f"DBS{i:07d}", f"strain{i}", symbols, "|".join(genes), " | ".join(names)]
+
+    header = ["Systematic_Name", "Strain_Descriptor", "Associated gene(s)", "DDB_G_ID", "Phenotypes"]
+    data = write_tsv(directory / "all-mutants-ddb_g.txt", _rows(), header)
+    return {"files": [data], "maps": {"dictybase_phenotype_names_to_ids": ddpheno}}
+
+
+def hgnc_gene(directory: Path, rows: int, rng: random.Random) -> Dict:
+    so_terms = write_tsv(
+        directory / "hgnc_so_terms.tsv", ([f"HGNC:{i}", "SO:0001217"] for i in range(1, rows + 1) if i % 10)
+    )
+
+    def _rows():
+        for i in range(1, rows + 1):
+            row = dict.fromkeys(HGNC_COLUMNS, "")
+            row.update(
+                hgnc_id=f"HGNC:{i}",
+                symbol=f"GENE{i}",
+                name=f"gene {i}",
+                locus_group="protein-coding gene",
+                locus_type="gene with protein product",
+                status="Approved",
+                location=f"{rng.randint(1, 22)}q{rng.randint(11, 40)}",
+                alias_symbol="|".join(f"ALIAS{i}-{j}" for j in range(rng.randint(0, 3))),
+                prev_symbol=f"PREV{i}" if rng.random() < 0.3 else "",
+                entrez_id=str(i + 1000),
+                ensembl_gene_id=f"ENSG{i:011d}" if rng.random() < 0.9 else "",
+                omim_id="|".join(str(rng.randint(100000, 699999)) for _ in range(rng.choice([0, 0, 1, 2]))),
+                uniprot_ids=f"P{rng.randint(10000, 99999)}",
+                agr=f"HGNC:{i}",
+            )
+            yield list(row.values())
+
+    data = write_tsv(directory / "hgnc_complete_set.txt", _rows(), HGNC_COLUMNS)
+    return {"files": [data], "maps": {"hgnc-so-terms": so_terms}}
+
+
+def panther_genome_orthologs(directory: Path, rows: int, rng: random.Random) -> Dict:
+    return {"file_archive": make_synthetic_archive(directory, rows)}
+
+
+def pombase_gene(directory: Path, rows: int, rng: random.Random) -> Dict:
+    """Mostly protein coding genes, the rest filtered out"""
+
+    def _rows():
+        for i in range(rows):
+            gene_type = rng.choices(["protein coding gene", "ncRNA gene", "tRNA gene"], weights=[7, 2, 1])[0]
+            systematic_id = f"SPAC{i:05d}.01"
+            yield [
+                systematic_id,
+                f"PomBase:{systematic_id}",
+                f"pom{i}" if rng.random() < 0.7 else "",
+                f"chromosome_{rng.randint(1, 3)}",
+                f"product {i}",
+                f"Q{rng.randint(10000, 99999)}" if rng.random() < 0.8 else "",
+                gene_type,
+                ",".join(f"psyn{i}-{j}" for j in range(rng.randint(0, 2))),
+            ]
+
+    data = write_tsv(directory / "gene_IDs_names_products.tsv", _rows())
+    return {"files": [data], "maps": {"taxon-labels": taxon_labels(directory)}}
+
+
+def pombase_gene_to_phenotype(directory: Path, rows: int, rng: random.Random) -> Dict:
+    def _rows():
+        for _ in range(rows):
+            row = dict.fromkeys(POMBASE_PHAF_COLUMNS, "")
+            conditions = [f"FYECO:{rng.randint(1, 300):07d}" for _ in range(rng.randint(0, 3))]
+            row.update(
+                {
+                    "Database name": "PomBase",
+                    "Gene systematic ID": f"SPAC{rng.randint(1, 5000):05d}.01",
+                    "FYPO ID": f"FYPO:{rng.randint(1, 8000):07d}",
+                    "Allele description": "deletion",
+                    "Expression": "null",
+                    "Evidence": "ECO:0000336",
+                    "Condition": ",".join(conditions),
+                    "Reference": pmid(rng),
+                    "Taxon": "4896",
+                    "Date": "2020-01-01",
+                    "Ploidy": "haploid",
+                }
+            )
+            yield list(row.values())
+
+    return {"files": [write_tsv(directory / "phenotype_annotations.pombase.phaf.gz", _rows(), POMBASE_PHAF_COLUMNS)]}
+
+
+def _reactome_rows(rows: int, rng: random.Random, component: Callable[[], str]):
+    for _ in range(rows):
+        species = rng.choice(REACTOME_SPECIES) if rng.random() < 0.9 else rng.choice(OTHER_REACTOME_SPECIES)
+        pathway = f"R-{species[:3].upper()}-{rng.randint(1, 9999999)}"
+        yield [
+            component(),
+            pathway,
+            f"https://reactome.org/PathwayBrowser/#/{pathway}",
+            "pathway",
+            rng.choice(["IEA", "TAS"]),
+            species,
+        ]
+
+
+def reactome_chemical_to_pathway(directory: Path, rows: int, rng: random.Random) -> Dict:
+    data = _reactome_rows(rows, rng, lambda: str(rng.randint(1, 200000)))
+    return {"files": [write_tsv(directory / "ChEBI2Reactome.txt", data)]}
+
+
+def reactome_gene_to_pathway(directory: Path, rows: int, rng: random.Random) -> Dict:
+    data = _reactome_rows(rows, rng, lambda: str(rng.randint(1, 10**6)))
+    return {"files": [write_tsv(directory / "NCBI2Reactome.txt", data)]}
+
+
+def reactome_pathway(directory: Path, rows: int, rng: random.Random) -> Dict:
+    def _rows():
+        for i in range(rows):
+            species = rng.choice(REACTOME_SPECIES) if rng.random() < 0.9 else rng.choice(OTHER_REACTOME_SPECIES)
+            yield [f"R-{species[:3].upper()}-{i}", f"pathway {i}", species]
+
+    return {"files": [write_tsv(directory / "ReactomePathways.txt", _rows())]}
+
+
+def string_protein_links(directory: Path, rows: int, rng: random.Random) -> Dict:
+    links_file, map_file = make_synthetic_data(directory, rows)
+    return {"files": [links_file], "maps": {"entrez-2-string": map_file}}
+
+
+def xenbase_gene_to_phenotype(directory: Path, rows: int, rng: random.Random) -> Dict:
+    def _rows():
+        for _ in range(rows):
+            yield [
+                f"Xenbase:XB-GENE-{rng.randint(1, 10**6)}",
+                "gene",
+                "NCBITaxon:8364",
+                "Xenopus tropicalis",
+                f"XPO:{rng.randint(1, 10**5):07d}",
+                "phenotype",
+                "RO:0002200",
+                "has phenotype",
+                "",
+                "",
+                pmid(rng) if rng.random() < 0.8 else "",
+                "",
+                "",
+            ]
+
+    return {"files": [write_tsv(directory / "xb_xpo_spo_v_v1.tab", _rows(), XENBASE_COLUMNS)]}
+
+
+def xenbase_orthologs(directory: Path, rows: int, rng: random.Random) -> Dict:
+    """Human, mouse and zebrafish orthologs of Xenbase gene pages, each page with a tropicalis and two laevis genes"""
+    pages = max(rows // 3, 1)
+    genepages = write_tsv(
+        directory / "XenbaseGenepageToGeneIdMapping.txt",
+        (
+            [f"XB-GENEPAGE-{i}", f"gene{i}", f"XB-GENE-{3 * i}", f"gene{i}", f"XB-GENE-{3 * i + 1}", f"gene{i}.L"]
+            + [f"XB-GENE-{3 * i + 2}", f"gene{i}.S"]
+            for i in range(pages)
+        ),
+    )
+    files = []
+    for species, count in zip(["Human", "Mouse", "Zebrafish"], split(rows, 3)):
+        lines = (
+            [str(rng.randint(1, 10**6)), f"XB-GENEPAGE-{rng.randrange(pages)}", "gene", "gene name"]
+            for _ in range(count)
+        )
+        files.append(write_tsv(directory / f"XenbaseGene{species}OrthologMapping.txt", lines))
+    return {"files": files, "maps": {"genepage-2-gene": genepages}}
+
+
+def xenbase_non_entrez_orthologs(directory: Path, rows: int, rng: random.Random) -> Dict:
+    def _rows():
+        for i in range(rows):
+            yield [
+                f"XB-GENE-{i}",
+                str(rng.randint(100000, 699999)) if rng.random() < 0.3 else "",
+                f"MGI:{rng.randint(1, 10**6)}" if rng.random() < 0.5 else "",
+                f"ZDB-GENE-{rng.randint(1, 10**6)}" if rng.random() < 0.5 else "",
+                "",
+            ]
+
+    header = ["Xenbase", "OMIM", "MGI", "ZFIN", "GEISHA"]
+    return {"files": [write_tsv(directory / "XenbaseGeneNonEntrezOrthologMapping.txt", _rows(), header)]}
+
+
+def zfin_gene_to_phenotype(directory: Path, rows: int, rng: random.Random) -> Dict:
+    """Mostly abnormal phenotypes, a few of their entity-quality combinations missing from the ZP mapping"""
+    combinations = [
+        [f"ZFA:{rng.randint(1, 9999):07d}", "0", f"ZFA:{rng.randint(1, 9999):07d}", f"PATO:{rng.randint(1, 2000):07d}"]
+        + ["0", "0", "0"]
+        for _ in range(2000)
+    ]
+    zp = write_tsv(
+        directory / "id_map_zfin.tsv",
+        ([f"ZP:{i:07d}", "-".join(key)] for i, key in enumerate(combinations[:1950])),
+        ["iri", "id"],
+    )
+
+    def _rows():
+        for i in range(rows):
+            key = [element if element != "0" else "" for element in rng.choice(combinations)]
+            tag = "abnormal" if rng.random() < 0.9 else "normal"
+            yield [
+                f"ZDB-GENO-{i}", "gene", f"ZDB-GENE-{rng.randint(1, 10**5)}", key[0], "subterm", key[1], "", key[2],
+                "superterm", key[3], "quality", tag, key[4], "", key[5], "", key[6], "", f"ZDB-FISH-{i}", "fish",
+                "ZFS:0000001", "ZFS:0000044", f"ZDB-GENOX-{i}", f"ZDB-PUB-{rng.randint(1, 10**5)}", f"ZDB-FIG-{i}",
+            ]  # fmt: skip
+
+    return {"files": [write_tsv(directory / "phenoGeneCleanData_fish.txt", _rows())], "maps": {"eqe2zp": zp}}
+
+
+GENERATORS: Dict[str, Callable[[Path, int, random.Random], Dict]] = {
+    "alliance_gene": alliance_gene,
+    "alliance_gene_to_expression": alliance_gene_to_expression,
+    "bgee_gene_to_expression": bgee_gene_to_expression,
+    "ctd_chemical_to_disease": ctd_chemical_to_disease,
+    "dictybase_gene": dictybase_gene,
+    "dictybase_gene_to_phenotype": dictybase_gene_to_phenotype,
+    "hgnc_gene": hgnc_gene,
+    "panther_genome_orthologs": panther_genome_orthologs,
+    "pombase_gene": pombase_gene,
+    "pombase_gene_to_phenotype": pombase_gene_to_phenotype,
+    "reactome_chemical_to_pathway": reactome_chemical_to_pathway,
+    "reactome_gene_to_pathway": reactome_gene_to_pathway,
+    "reactome_pathway": reactome_pathway,
+    "string_protein_links": string_protein_links,
+    "xenbase_gene_to_phenotype": xenbase_gene_to_phenotype,
+    "xenbase_non_entrez_orthologs": xenbase_non_entrez_orthologs,
+    "xenbase_orthologs": xenbase_orthologs,
+    "zfin_gene_to_phenotype": zfin_gene_to_phenotype,
+}
+
+
+def generate(ingest: str, directory: Path, rows: int) -> Dict:
+    """Write the synthetic sources of ingest to directory, the same files for the same ingest and rows every time"""
+    directory.mkdir(parents=True, exist_ok=True)
+    return GENERATORS[ingest](directory, rows, random.Random(f"{ingest}-{rows}"))
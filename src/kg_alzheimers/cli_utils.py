@@ -1,31 +1,37 @@
-import csv
+"""
+Implementations of the ingest CLI commands
+
+main.py imports this module only when a command runs, and the heavier dependencies here (Koza, kgx, cat_merge,
+closurizer, duckdb, pandas, pyarrow, the Biolink schema) are imported by the functions that use them, so a command
+only pays for its own imports.
+"""
+
+import importlib
 import os
 import sys
 import tarfile
 
-import duckdb
 import yaml
 from pathlib import Path
 from typing import Optional
-from biolink_model.datamodel import model  # import the pythongen biolink model to get the version
-from linkml_runtime import SchemaView
-from linkml.utils.helpers import convert_to_snake_case
-import requests
-
-# from loguru import logger
-import pandas
-import sh
-
-from cat_merge.merge import merge
-from closurizer.closurizer import add_closure
-from kgx.cli.cli_utils import transform as kgx_transform
-from koza.cli_utils import transform_source
-from koza.model.config.source_config import OutputFormat
-from linkml_runtime.utils.formatutils import camelcase
 
+from kg_alzheimers.columnar import COLUMNAR_INGESTS
 from kg_alzheimers.utils.ingest_utils import ingest_output_exists, file_exists, get_ingests
 from kg_alzheimers.utils.log_utils import get_logger
-from kg_alzheimers.utils.export_utils import export
+from kg_alzheimers.utils.id_utils import DEFAULT_ID_STRATEGY, set_id_strategy
+from kg_alzheimers.utils.manifest_utils import (
+    PHENIO_INPUTS,
+    PHENIO_TAR,
+    changed_inputs,
+    ingest_inputs,
+    ingest_settings,
+    is_up_to_date,
+    record_manifest,
+)
+from kg_alzheimers.utils.metrics_utils import collect_metrics
+from kg_alzheimers.utils.parallel_utils import format_summary, run_parallel
+from kg_alzheimers.utils.plan_utils import DOWNLOAD_WORKERS, build_ingest_graph, format_plan, schedule
+from kg_alzheimers.utils.profile_utils import collect_profiles, profile_ingest
 
 
 OUTPUT_DIR = "output"
@@ -39,8 +45,15 @@ def transform_one(
     force: Optional[bool] = False,
     verbose: Optional[bool] = None,
     log: bool = False,
+    engine: str = "koza",
+    id_strategy: str = DEFAULT_ID_STRATEGY,
+    profile: bool = False,
+    output_format: str = "tsv",
 ):
     logger = get_logger(name=ingest if log else None, verbose=verbose)
+    set_id_strategy(id_strategy)
+    if rdf and output_format != "tsv":
+        raise ValueError("--rdf converts the TSV output, it can't be used with --format parquet")
 
     ingests = get_ingests()
 
@@ -48,17 +61,13 @@ def transform_one(
         # if log: logger.removeHandler(fh)
         raise ValueError(f"{ingest} is not a valid ingest - see ingests.yaml for a list of options")
 
-    # if a url is provided instead of a config, just download the file and copy it to the output dir
+    # if a url is provided instead of a config, just download the files to the output dir
     if "url" in ingests[ingest]:
-        for url in ingests[ingest]["url"]:
-            filename = url.split("/")[-1]
-
-            if Path(f"{output_dir}/transform_output/{filename}").is_file() and not force:
-                continue
+        from kg_alzheimers.utils.download_utils import fetch_pass_through
 
-            response = requests.get(url, allow_redirects=True)
-            with open(f"{output_dir}/transform_output/{filename}", "wb") as f:
-                f.write(response.content)
+        rows = fetch_pass_through(ingest, ingests[ingest]["url"], output_dir=output_dir, force=force)
+        for filename, count in rows.items():
+            logger.info(f"{ingest}: {filename} has {count} rows")
         return
 
     source_file = Path(Path(__file__).parent, ingests[ingest]["config"])
@@ -67,27 +76,65 @@ def transform_one(
         # if log: logger.removeHandler(fh)
         raise ValueError(f"Source file {source_file} does not exist")
 
-    if ingest_output_exists(ingest, output_dir) and not force:
-        logger.info(f"Transformed output exists - skipping ingest: {ingest} - To run this ingest anyway, use --force")
-        # if log: logger.removeHandler(fh)
-        return
-
-    logger.info(f"Running ingest: {ingest}")
-    try:
-        transform_source(
-            source=source_file.as_posix(),
-            output_dir=f"{output_dir}/transform_output",
-            output_format=OutputFormat.tsv,
-            row_limit=row_limit,
-            verbose=verbose,
-            # verbose=False if verbose == None else verbose,
-            # log=log
-        )
-    except ValueError as e:
-        # if log: logger.removeHandler(fh)
-        raise ValueError(f"Missing data - {e}")
+    inputs = ingest_inputs(ingest, engine)
+    settings = ingest_settings(ingest, row_limit, engine)
+    if not force and ingest_output_exists(ingest, f"{output_dir}/transform_output", output_format):
+        changed = changed_inputs(ingest, inputs, output_dir, settings)
+        if not changed:
+            logger.info(f"Inputs unchanged - skipping ingest: {ingest} - To run this ingest anyway, use --force")
+            return
+        logger.info(f"Inputs changed for {ingest}: {', '.join(changed)}")
+
+    from kg_alzheimers.utils.parquet_utils import remove_other_formats
+
+    remove_other_formats(f"{output_dir}/transform_output", ingest, output_format)
+    profile_dir = f"{output_dir}/profile" if profile else None
+    columnar = engine == "columnar" and ingest in COLUMNAR_INGESTS
+    with collect_metrics(ingest, output_dir, engine="columnar" if columnar else "koza"), profile_ingest(
+        ingest, profile_dir
+    ):
+        if columnar:
+            logger.info(f"Running ingest: {ingest} (columnar engine)")
+            try:
+                importlib.import_module(COLUMNAR_INGESTS[ingest]).transform(
+                    output_dir=f"{output_dir}/transform_output", row_limit=row_limit, output_format=output_format
+                )
+            except FileNotFoundError as e:
+                raise ValueError(f"Missing data - {e}")
+        else:
+            from koza.cli_utils import transform_source
+            from koza.model.config.source_config import OutputFormat
+
+            from kg_alzheimers.utils.association_utils import pop_factory_reports
+            from kg_alzheimers.utils.json_utils import use_streaming_json_reader
+            from kg_alzheimers.utils.map_utils import use_compiled_maps
+            from kg_alzheimers.utils.metrics_utils import use_row_counts
+            from kg_alzheimers.utils.parquet_utils import use_parquet_writer
+
+            logger.info(f"Running ingest: {ingest}")
+            use_streaming_json_reader()
+            use_compiled_maps(f"{output_dir}/map_cache")
+            use_row_counts()
+            use_parquet_writer(output_format == "parquet")
+            try:
+                transform_source(
+                    source=source_file.as_posix(),
+                    output_dir=f"{output_dir}/transform_output",
+                    output_format=OutputFormat.tsv,
+                    row_limit=row_limit,
+                    verbose=verbose,
+                    # verbose=False if verbose == None else verbose,
+                    # log=log
+                )
+            except ValueError as e:
+                # if log: logger.removeHandler(fh)
+                raise ValueError(f"Missing data - {e}")
+            for report in pop_factory_reports():
+                logger.info(f"Association fast path - {report}")
 
     if rdf:
+        from kgx.cli.cli_utils import transform as kgx_transform
+
         logger.info(f"Creating rdf output {output_dir}/rdf/{ingest}.nt.gz ...")
 
         Path(f"{output_dir}/rdf").mkdir(parents=True, exist_ok=True)
@@ -109,10 +156,11 @@ def transform_one(
             output_compression="gz",
         )
 
-    if not ingest_output_exists(ingest, f"{output_dir}/transform_output"):
+    if not ingest_output_exists(ingest, f"{output_dir}/transform_output", output_format):
         # if log: logger.removeHandler(fh)
         raise FileNotFoundError(f"Ingest {ingest} did not produce the the expected output")
 
+    record_manifest(ingest, inputs, output_dir, settings)
     # if log: logger.removeHandler(fh)
 
 
@@ -121,160 +169,58 @@ def transform_phenio(
     force: bool = False,
     verbose: Optional[bool] = False,
     log: bool = False,
+    profile: bool = False,
+    output_format: str = "tsv",
 ):
     # if log: fh = add_log_fh(logger, "logs/phenio.log")
     logger = get_logger(name="phenio" if log else None, verbose=verbose)
 
-    # TODO: can this be fetched from a purl?
-    biolink_model_schema = SchemaView(
-        f"https://raw.githubusercontent.com/biolink/biolink-model/v{model.version}/biolink-model.yaml"
-    )
-
-    phenio_tar = "data/monarch/kg-phenio.tar.gz"
-    if not Path(phenio_tar).is_file():
+    if not Path(PHENIO_TAR).is_file():
         # if log: logger.removeHandler(fh)
-        raise FileNotFoundError("data/monarch/kg-phenio.tar.gz")
-
-    nodefile = "merged-kg_nodes.tsv"
-    edgefile = "merged-kg_edges.tsv"
-
-    tar = tarfile.open(phenio_tar)
-    tar.extract(nodefile, "data/monarch")
-    tar.extract(edgefile, "data/monarch")
-
-    Path(f"{output_dir}/transform_output").mkdir(parents=True, exist_ok=True)
-
-    nodes = f"{output_dir}/transform_output/phenio_nodes.tsv"
-    edges = f"{output_dir}/transform_output/phenio_edges.tsv"
-
-    if (force is False) and file_exists(nodes) and file_exists(edges):
-        logger.info(f"Transformed output exists - skipping ingest: Phenio - To run this ingest anyway, use --force")
+        raise FileNotFoundError(PHENIO_TAR)
+
+    nodes = f"{output_dir}/transform_output/phenio_nodes.{output_format}"
+    edges = f"{output_dir}/transform_output/phenio_edges.{output_format}"
+
+    if (
+        (force is False)
+        and file_exists(nodes)
+        and file_exists(edges)
+        and is_up_to_date("phenio", PHENIO_INPUTS, output_dir)
+    ):
+        logger.info(f"Inputs unchanged - skipping ingest: Phenio - To run this ingest anyway, use --force")
         # if log: logger.removeHandler(fh)
         return
 
-    nodes_df = pandas.read_csv(
-        f"data/monarch/{nodefile}", sep="\t", dtype="string", quoting=csv.QUOTE_NONE, lineterminator="\n"
-    )
-    nodes_df = nodes_df[~nodes_df["id"].str.contains("omim.org|hgnc_id")]
-    nodes_df = nodes_df[~nodes_df["id"].str.startswith("MGI:")]
-
-    # Hopefully this won't be necessary long term, but these IDs are coming
-    # in with odd OBO prefixes from Phenio currently.
-    obo_prefixes_to_repair = ["FBbt", "WBbt", "ZFA", "XAO"]
-    for prefix in obo_prefixes_to_repair:
-        nodes_df["id"] = nodes_df["id"].str.replace(f"OBO:{prefix}_", f"{prefix}:")
-
-    # These bring in nodes necessary for other ingests, but won't capture the same_as / equivalentClass
-    # associations that we'll also need
-    exclude_prefixes = ["HGNC", "FlyBase", "http", "biolink"]
-
-    Path(f"{output_dir}/qc/").mkdir(parents=True, exist_ok=True)
-    excluded_nodes = nodes_df[nodes_df["id"].str.startswith(tuple(exclude_prefixes))]
-    nodes_df = nodes_df[~nodes_df["id"].str.startswith(tuple(exclude_prefixes))]
-
-    # Replace biolink:Occurrent category with biolink:BiologicalProcessOrActivity as a fallback to rescue
-    # GO nodes that are getting a mixin category of Occurrent that we don't want to exclude all of
-    nodes_df["category"] = nodes_df["category"].str.replace("biolink:Occurrent", "biolink:BiologicalProcessOrActivity")
-
-    valid_node_categories = {
-        f"biolink:{camelcase(cat)}" for cat in biolink_model_schema.class_descendants("named thing")
-    }
-    phenio_node_categories = set(nodes_df["category"].unique())
-    invalid_node_categories = phenio_node_categories - valid_node_categories
-    if invalid_node_categories:
-        logger.error(f"Invalid node categories: {invalid_node_categories}")
-        invalid_node_categories_df = nodes_df[nodes_df["category"].isin(invalid_node_categories)]
-        excluded_nodes = pandas.concat([excluded_nodes, invalid_node_categories_df])
-        logger.error(f"Removing {len(invalid_node_categories_df)} nodes with invalid categories")
-        nodes_df = nodes_df[~nodes_df["category"].isin(invalid_node_categories)]
-
-    excluded_nodes.to_csv(f"{output_dir}/qc/excluded_phenio_nodes.tsv", sep="\t", index=False)
-
-    nodes_df.to_csv(nodes, sep="\t", index=False)
-
-    edges_df = pandas.read_csv(
-        f"data/monarch/{edgefile}", sep="\t", dtype="string", quoting=csv.QUOTE_NONE, lineterminator="\n"
-    )
-    edges_df.drop(
-        edges_df.columns.difference(
-            [
-                "id",
-                "subject",
-                "predicate",
-                "object",
-                "category",
-                "primary_knowledge_source",
-                "aggregator_knowledge_source",
-                "knowledge_level",
-                "agent_type",
-            ]
-        ),
-        axis=1,
-        inplace=True,
-    )
+    from kg_alzheimers.columnar import phenio
+    from kg_alzheimers.utils.parquet_utils import remove_other_formats
+    from kg_alzheimers.utils.schema_utils import biolink_sets
 
-    # if knowledge level doesn't exist, add it and assign to knowledge_assertion
-    if "knowledge_level" not in edges_df.columns:
-        edges_df["knowledge_level"] = "knowledge_assertion"
-    # same for agent_type, setting it to manual_agent
-    if "agent_type" not in edges_df.columns:
-        edges_df["agent_type"] = "manual_agent"
+    remove_other_formats(f"{output_dir}/transform_output", "phenio", output_format)
 
-    # prepend infores:monarchinitiative to the aggregator_knowledge_source column for edges that don't have it
-    edges_df["aggregator_knowledge_source"] = edges_df["aggregator_knowledge_source"].apply(
-        lambda x: f"infores:monarchinitiative|{x}" if not x.startswith("infores:monarchinitiative") else x
+    biolink = biolink_sets()
+    with collect_metrics("phenio", output_dir, engine="columnar") as metrics, profile_ingest(
+        "phenio", f"{output_dir}/profile" if profile else None
+    ):
+        counts = phenio.transform(
+            output_dir=f"{output_dir}/transform_output",
+            qc_dir=f"{output_dir}/qc",
+            valid_node_categories=set(biolink["named_thing_descendants"]),
+            valid_predicates=set(biolink["related_to_descendants"]),
+            valid_edge_categories=set(biolink["association_descendants"]),
+            tag=phenio.phenio_release_tag(),
+            output_format=output_format,
+        )
+        metrics["rows_read"] = counts["rows_read"]
+    logger.info(
+        f"Phenio: wrote {counts['nodes']} nodes and {counts['edges']} edges, excluded {counts['excluded_nodes']} nodes"
     )
 
-    edges_df = edges_df[edges_df["predicate"].str.contains(":")]
-
-    # assign level association category if edge category is empty
-    edges_df["category"].fillna("biolink:Association", inplace=True)
-
-    # Hopefully this won't be necessary long term, but these IDs are coming
-    # in with odd OBO prefixes from Phenio currently.
-    for prefix in obo_prefixes_to_repair:
-        for field in ["subject", "object"]:
-            edges_df[field] = edges_df[field].str.replace(f"OBO:{prefix}_", f"{prefix}:")
-
-    # Only keep edges where the subject and object both are within our allowable prefix list
-    edges_df = edges_df[
-        ~edges_df["subject"].str.startswith(tuple(exclude_prefixes))
-        & ~edges_df["object"].str.startswith(tuple(exclude_prefixes))
-    ]
-
-    # Remove edges where the subject or object is NA
-    edges_df = edges_df[~edges_df["subject"].isna() & ~edges_df["object"].isna()]
-
-    valid_predicates = {
-        f"biolink:{convert_to_snake_case(pred)}" for pred in biolink_model_schema.slot_descendants("related to")
-    }
-    phenio_predicates = set(edges_df["predicate"].unique())
-    invalid_predicates = phenio_predicates - valid_predicates
-    if invalid_predicates:
-        logger.error(f"Invalid predicates found in Phenio associations: {invalid_predicates}")
-        invalid_edges_df = edges_df[edges_df["predicate"].isin(invalid_predicates)]
-        logger.error(f"Removing {invalid_edges_df.shape[0]} edges with invalid predicates")
-        edges_df = edges_df[~edges_df["predicate"].isin(invalid_predicates)]
-
-    valid_edge_categories = {
-        f"biolink:{camelcase(cat)}" for cat in biolink_model_schema.class_descendants("association")
-    }
-    phenio_edge_categories = set(edges_df["category"].unique())
-    invalid_edge_categories = phenio_edge_categories - valid_edge_categories
-    if invalid_edge_categories:
-        logger.error(f"Invalid edge categories: {invalid_edge_categories}")
-        invalid_edge_categories_df = edges_df[edges_df["category"].isin(invalid_edge_categories)]
-        logger.error(f"Removing {len(invalid_edge_categories_df)} edges with invalid categories")
-        edges_df = edges_df[~edges_df["category"].isin(invalid_edge_categories)]
-
-    edges_df.to_csv(edges, sep="\t", index=False)
-    Path(f"data/monarch/{nodefile}").unlink()
-    Path(f"data/monarch/{edgefile}").unlink()
-
     if not file_exists(nodes) or not file_exists(edges):
         # if log: logger.removeHandler(fh)
         raise FileNotFoundError("Phenio transform did not produce the expected output")
 
+    record_manifest("phenio", PHENIO_INPUTS, output_dir)
     # if log: logger.removeHandler(fh)
 
 
@@ -285,16 +231,89 @@ def transform_all(
     force: bool = False,
     verbose: Optional[bool] = None,
     log: bool = False,
+    parallel: Optional[int] = None,
+    engine: str = "koza",
+    id_strategy: str = DEFAULT_ID_STRATEGY,
+    profile: bool = False,
+    output_format: str = "tsv",
 ):
     # if log: fh = add_log_fh(logger, Path(f"logs/all_ingests.log"))
+    from kg_alzheimers.utils.map_utils import format_map_report, preload_maps
+
     logger = get_logger(name="all_ingests" if log else None, verbose=verbose)
 
     # TODO:
     # - check for data - download if missing (maybe y/n prompt?)
     # - check for difference in data? maybe implement in kghub downloder instead?
 
+    if parallel and parallel > 1:
+        # Start the longest ingests first, pass-through downloads run in their own lane next to the Koza ingests.
+        # Each ingest runs in its own process and always writes its own log file,
+        # since interleaved output from several ingests on stderr is unreadable
+        graph = build_ingest_graph(
+            output_dir=output_dir, force=force, output_format=output_format, row_limit=row_limit, engine=engine
+        )
+        # a map nothing runs against or that is already compiled needs no task, the ingests load it themselves
+        skipped_maps = [name for name, node in graph.items() if name.startswith("map:") and node["skipped"]]
+        tasks = []
+        for task in schedule(graph, cpu_workers=parallel):
+            name = task["name"]
+            if name in skipped_maps:
+                continue
+            if name.startswith("map:"):
+                # compile the map once, before the ingests that depend on it start and memory-map it
+                func = preload_maps
+                kwargs = {
+                    "map_files": {user: [graph[name]["map_file"]] for user in graph[name]["users"]},
+                    "cache_dir": f"{output_dir}/map_cache",
+                }
+            elif name == "phenio":
+                func = transform_phenio
+                kwargs = {
+                    "output_dir": output_dir,
+                    "force": force,
+                    "verbose": verbose,
+                    "log": True,
+                    "profile": profile,
+                    "output_format": output_format,
+                }
+            else:
+                func = transform_one
+                kwargs = {
+                    "ingest": name,
+                    "output_dir": output_dir,
+                    "row_limit": row_limit,
+                    "rdf": rdf,
+                    "force": force,
+                    "verbose": verbose,
+                    "log": True,
+                    "engine": engine,
+                    "id_strategy": id_strategy,
+                    "profile": profile,
+                    "output_format": output_format,
+                }
+            tasks.append(
+                {
+                    "name": name,
+                    "func": func,
+                    "kwargs": kwargs,
+                    "lane": task["lane"],
+                    "depends_on": [
+                        dependency for dependency in graph[name]["depends_on"] if dependency not in skipped_maps
+                    ],
+                }
+            )
+
+        logger.info(f"Running {len(tasks)} tasks with {parallel} parallel workers, logs are written to ./logs/")
+        results = run_parallel(tasks, max_workers=parallel, logger=logger, lanes={"io": DOWNLOAD_WORKERS})
+        if profile and Path(f"{output_dir}/profile").is_dir():
+            # the workers each rewrite profile.json as they finish, collect it once more with every ingest done
+            collect_profiles(f"{output_dir}/profile")
+        print(format_summary(results))
+        return
+
     try:
-        transform_phenio(output_dir=output_dir, force=force)
+        transform_phenio(output_dir=output_dir, force=force, profile=profile, output_format=output_format)
     except Exception as e:
         logger.error(f"Error running Phenio ingest: {e}")
 
@@ -309,14 +328,35 @@ def transform_all(
                 force=force,
                 verbose=verbose,
                 log=log,
+                engine=engine,
+                id_strategy=id_strategy,
+                profile=profile,
+                output_format=output_format,
             )
         except Exception as e:
             logger.error(f"Error running ingest {ingest}: {e}")
             pass
+    logger.info(format_map_report())
 
     # if log: logger.removeHandler(fh)
 
 
+def plan_transforms(
+    output_dir: str = OUTPUT_DIR,
+    force: bool = False,
+    parallel: Optional[int] = None,
+    output_format: str = "tsv",
+    row_limit: Optional[int] = None,
+    engine: str = "koza",
+):
+    """Print the order transform --all would run ingests in, and its estimated makespan"""
+    cpu_workers = parallel if parallel and parallel > 1 else 1
+    graph = build_ingest_graph(
+        output_dir=output_dir, force=force, output_format=output_format, row_limit=row_limit, engine=engine
+    )
+    print(format_plan(graph, schedule(graph, cpu_workers=cpu_workers), cpu_workers=cpu_workers))
+
+
 def get_release_version():
     import datetime
 
@@ -363,8 +403,17 @@ def merge_files(
     input_dir: str = f"{OUTPUT_DIR}/transform_output",
     output_dir: str = OUTPUT_DIR,
     verbose: Optional[bool] = None,
+    engine: str = "duckdb",
+    memory_limit: Optional[str] = None,
 ):
     logger = get_logger(None, verbose)
+    if engine == "cat_merge":
+        parquet = [path.name for path in sorted(Path(input_dir).glob("*.parquet"))]
+        if parquet:
+            raise ValueError(
+                f"cat_merge only reads TSV, but {input_dir} has Parquet transform output ({', '.join(parquet)}) - "
+                "merge it with the default duckdb engine, or transform again with --format tsv"
+            )
     logger.info("Generating mappings...")
 
     mappings = []
@@ -374,7 +423,14 @@ def merge_files(
 
     logger.info("Merging knowledge graph...")
 
-    merge(name=name, source=input_dir, output_dir=output_dir, mappings=mappings)
+    if engine == "cat_merge":
+        from cat_merge.merge import merge
+
+        merge(name=name, source=input_dir, output_dir=output_dir, mappings=mappings)
+    else:
+        from kg_alzheimers.utils.merge_utils import merge
+
+        merge(name=name, input_dir=input_dir, output_dir=output_dir, mappings=mappings, memory_limit=memory_limit)
 
 
 def apply_closure(
@@ -385,6 +441,10 @@ def apply_closure(
     edges_output_file = f"{output_dir}/{name}-denormalized-edges.tsv"
     nodes_output_file = f"{output_dir}/{name}-denormalized-nodes.tsv"
     database = f"{name}.duckdb"
+
+    import sh
+    from closurizer.closurizer import add_closure
+
     add_closure(
         kg_archive=f"{output_dir}/{name}.tar.gz",
         closure_file=closure_file,
@@ -414,26 +474,28 @@ def apply_closure(
 
 
 def load_sqlite():
+    import sh
+
     sh.bash("scripts/load_sqlite.sh")
 
 
 def load_solr():
+    import sh
+
     sh.bash("scripts/load_solr.sh", _out=sys.stdout, _err=sys.stderr)
 
 
 def load_jsonl():
-    db = duckdb.connect('output/kg-alzheimers.duckdb')
+    import duckdb
+    import pandas
 
-    biolink_model = SchemaView(
-        f"https://raw.githubusercontent.com/biolink/biolink-model/v{model.version}/biolink-model.yaml"
-    )
+    from kg_alzheimers.utils.schema_utils import biolink_sets
 
-    class_ancestor_dict = {}
-    for c in biolink_model.all_classes().values():
-        class_ancestor_dict[f"biolink:{camelcase(c.name)}"] = [
-            f"biolink:{camelcase(a)}" for a in biolink_model.class_ancestors(c.name)
-        ]
-    all_slot_names = biolink_model.all_slots().keys()
+    db = duckdb.connect('output/kg-alzheimers.duckdb')
+
+    biolink = biolink_sets()
+    class_ancestor_dict = biolink["class_ancestors"]
+    multivalued_slots = set(biolink["multivalued_slots"])
 
     # this may appear to be unused, but it's accessed in the duckdb sql queries below
     class_ancestor_df = pandas.DataFrame(list(class_ancestor_dict.items()), columns=['classname', 'ancestors'])
@@ -442,10 +504,7 @@ def load_jsonl():
     edge_columns = db.sql("PRAGMA table_info(edges);").df()["name"].to_list()
 
     def slot_is_multi_valued(slot_name: str) -> bool:
-        slot_name = slot_name.lower().replace("_", " ")
-        if slot_name not in all_slot_names:
-            return False
-        return biolink_model.get_slot(slot_name).multivalued
+        return slot_name.lower().replace("_", " ") in multivalued_slots
 
     mv_node_columns = [col for col in node_columns if slot_is_multi_valued(col) and col != "category"]
     mv_edge_columns = [col for col in edge_columns if slot_is_multi_valued(col) and col != "category"]
@@ -487,14 +546,19 @@ def create_qc_reports():
         raise FileNotFoundError(qc_sql, "generate_reports.sql QC SQL script not found")
     sql = qc_sql.read_text()
 
+    import duckdb
+
     con = duckdb.connect('output/kg_alzheimers.duckdb')
     con.execute(sql)
 
 def export_tsv():
+    from kg_alzheimers.utils.export_utils import export
+
     export()
 
 
 def do_prepare_release(dir: str = OUTPUT_DIR):
+    import sh
 
     compressed_artifacts = [
         'output/kg-alzheimers.duckdb',
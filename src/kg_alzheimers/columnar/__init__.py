@@ -0,0 +1,12 @@
+"""
+Columnar engines for ingests where building a pydantic model per row is the bottleneck
+
+Each engine writes the same nodes/edges files as the Koza ingest it replaces, and is used by
+`ingest transform --engine columnar`. Ingests without an entry here always run through Koza.
+The Phenio transform in phenio.py has no Koza ingest and always runs here.
+"""
+
+COLUMNAR_INGESTS = {
+    "panther_genome_orthologs": "kg_alzheimers.columnar.panther_genome_orthologs",
+    "string_protein_links": "kg_alzheimers.columnar.string_protein_links",
+}
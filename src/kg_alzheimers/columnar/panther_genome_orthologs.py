@@ -0,0 +1,132 @@
+"""
+Columnar engine for the Panther genome orthologs ingest
+
+Writes the same edges as ingests/panther/genome_orthologs.py. The AllOrthologs member is streamed straight
+out of the tarball in Arrow record batches instead of being extracted to disk first. Rows are dropped with a regex
+on the raw Gene/Ortholog strings unless both start with a species tag from ncbitaxon_catalog, since that
+discards most of the file before anything is split. The surviving gene specs are parsed with regex
+extraction and their database prefixes are resolved through a lookup table, once per distinct prefix.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import duckdb
+import pyarrow
+import pyarrow.compute as pc
+from pyarrow import csv as pa_csv
+import yaml
+from koza.io.writer.tsv_writer import TSVWriter
+from koza.io.yaml_loader import UniqueIncludeLoader
+
+from kg_alzheimers.columnar.tsv import TarMemberReader, write_tsv
+from kg_alzheimers.utils.id_utils import sql_edge_id
+from kg_alzheimers.utils.parquet_utils import write_parquet
+from kg_alzheimers.ingests.panther.orthology_utils import get_biolink_curie_prefix, ncbitaxon_catalog
+
+CONFIG_FILE = Path(__file__).parent.parent / "ingests" / "panther" / "genome_orthologs.yaml"
+
+SPECIES_PATTERN = f"^({'|'.join(re.escape(species) for species in ncbitaxon_catalog)})\\|"
+# species|DB=id|protdb=pdbid, where the DB=id spec is either DB=id or MGI=MGI=id
+GENE_PATTERN = r"^[^|]*\|(?P<db>[^|=]*)=(?P<id>[^|=]*)\|[^|]*$"
+MGI_GENE_PATTERN = r"^[^|]*\|[^|=]*=MGI=(?P<id>[^|=]*)\|[^|]*$"
+
+
+def load_config(config_file: Path = CONFIG_FILE) -> Dict:
+    with open(config_file, "r") as config_fh:
+        return yaml.load(config_fh, Loader=UniqueIncludeLoader)
+
+
+def _curie_prefixes(dbs: pyarrow.Array) -> pyarrow.Array:
+    """Map each database name to its CURIE prefix, or null when the namespace isn't used"""
+    distinct = pc.unique(dbs)
+    # an empty prefix is skipped by parse_gene_id, just like an unmapped one
+    prefixes = pyarrow.array([get_biolink_curie_prefix(db) or None for db in distinct.to_pylist()], pyarrow.string())
+    return pc.take(prefixes, pc.index_in(dbs, value_set=distinct))
+
+
+def parse_genes(genes: pyarrow.Array) -> pyarrow.Array:
+    """Vectorized parse_gene: the gene CURIE for each entry, null where the Koza ingest would skip the row"""
+    spec = pc.extract_regex(genes, GENE_PATTERN)
+    valid = pc.is_valid(spec)
+    prefixes = _curie_prefixes(pc.struct_field(spec, "db"))
+    curies = pc.binary_join_element_wise(prefixes, pc.struct_field(spec, "id"), ":")
+    mgi = pc.binary_join_element_wise("MGI", pc.struct_field(pc.extract_regex(genes, MGI_GENE_PATTERN), "id"), ":")
+    return pc.if_else(valid, curies, mgi)
+
+
+def read_orthologs(archive: str, member: str, columns: List[str], row_limit: Optional[int] = None):
+    """Yield (gene, ortholog, panther id) tables for the rows where both genes are from species of interest"""
+    read_options = pa_csv.ReadOptions(column_names=columns, block_size=16 * 1024 * 1024)
+    parse_options = pa_csv.ParseOptions(delimiter="\t", quote_char=False)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={column: pyarrow.string() for column in columns},
+        include_columns=["Gene", "Ortholog", "Panther Ortholog ID"],
+    )
+    rows_read = 0
+    with TarMemberReader(archive, member) as fh:
+        reader = pa_csv.open_csv(
+            fh, read_options=read_options, parse_options=parse_options, convert_options=convert_options
+        )
+        for batch in reader:
+            if row_limit is not None:
+                batch = batch.slice(0, row_limit - rows_read)
+            rows_read += len(batch)
+            # the second column is only matched for rows whose first column passed
+            table = pyarrow.Table.from_batches([batch])
+            table = table.filter(pc.match_substring_regex(table["Gene"], SPECIES_PATTERN))
+            yield table.filter(pc.match_substring_regex(table["Ortholog"], SPECIES_PATTERN))
+            if row_limit is not None and rows_read >= row_limit:
+                break
+
+
+def edge_batches(tables, edge_columns: List[str]):
+    for table in tables:
+        subjects = parse_genes(table["Gene"].combine_chunks())
+        objects = parse_genes(table["Ortholog"].combine_chunks())
+        keep = pc.and_(pc.is_valid(subjects), pc.is_valid(objects))
+        subjects = subjects.filter(keep)
+        objects = objects.filter(keep)
+        families = table["Panther Ortholog ID"].combine_chunks().filter(keep)
+        rows = len(subjects)
+        values = {
+            "id": _edge_ids(subjects, objects, families),
+            "subject": subjects,
+            "predicate": _constant("biolink:orthologous_to", rows),
+            "object": objects,
+            "category": _constant("biolink:GeneToGeneHomologyAssociation", rows),
+            "agent_type": _constant("not_provided", rows),
+            "aggregator_knowledge_source": _constant("infores:monarchinitiative", rows),
+            "has_evidence": pc.binary_join_element_wise("PANTHER.FAMILY", families, ":"),
+            "knowledge_level": _constant("knowledge_assertion", rows),
+            "primary_knowledge_source": _constant("infores:panther", rows),
+        }
+        yield pyarrow.RecordBatch.from_arrays([values[column] for column in edge_columns], names=edge_columns)
+
+
+def _edge_ids(subjects: pyarrow.Array, objects: pyarrow.Array, families: pyarrow.Array) -> pyarrow.Array:
+    """The ids edge_id gives the Koza ingest's edges, built by DuckDB"""
+    edges = pyarrow.table({"subject": subjects, "object": objects, "family": families})  # noqa: F841
+    expression = sql_edge_id(["subject", "'biolink:orthologous_to'", "object", "'infores:panther'", "family"])
+    return duckdb.sql(f"SELECT {expression} AS id FROM edges").arrow()["id"].combine_chunks()
+
+
+def _constant(value: str, rows: int) -> pyarrow.Array:
+    return pyarrow.repeat(pyarrow.scalar(value, pyarrow.string()), rows)
+
+
+def transform(
+    output_dir: str, row_limit: Optional[int] = None, config_file: Path = CONFIG_FILE, output_format: str = "tsv"
+) -> int:
+    """Write <output_dir>/panther_genome_orthologs_edges.tsv, or .parquet, returns the number of edges written"""
+    config = load_config(config_file)
+    (member,) = config["files"]
+    edge_columns = list(TSVWriter._order_columns(set(config["edge_properties"]), "edge"))
+    schema = pyarrow.schema([(column, pyarrow.string()) for column in edge_columns])
+
+    tables = read_orthologs(config["file_archive"], member, config["columns"], row_limit=row_limit)
+    batches = pyarrow.RecordBatchReader.from_batches(schema, edge_batches(tables, edge_columns))
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    path = Path(output_dir) / f"{config['name']}_edges.{output_format}"
+    return write_parquet(batches, path) if output_format == "parquet" else write_tsv(batches, path)
@@ -0,0 +1,325 @@
+"""
+Columnar Phenio transform
+
+Filters the nodes and edges of the kg-phenio tarball into phenio_nodes.tsv, phenio_edges.tsv and
+qc/excluded_phenio_nodes.tsv. Each member is read in Arrow record batches, the filtering rules are applied
+to one batch at a time with Arrow compute functions, and DuckDB writes the batches out as they are produced,
+so memory use is bounded by the batch size rather than by the edge file.
+The files are written the way pandas' to_csv wrote them before: values are quoted only where they contain
+a tab, a quote or a line break.
+
+The two members are streamed straight out of the tarball into Parquet once per Phenio release, keyed by
+the release tag that `ingest download --write-metadata` records, and the transform reads those instead of
+decompressing the tarball every time. The cache is rebuilt when the tarball changes, and only the latest release
+is kept.
+"""
+
+import io
+import json
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import duckdb
+import pyarrow
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import yaml
+from loguru import logger
+from pyarrow import csv as pa_csv
+
+from kg_alzheimers.columnar.tsv import TarMemberReader
+from kg_alzheimers.utils.parquet_utils import write_parquet
+from kg_alzheimers.utils.manifest_utils import PHENIO_TAR
+
+NODES_MEMBER = "merged-kg_nodes.tsv"
+EDGES_MEMBER = "merged-kg_edges.tsv"
+
+# Hopefully this won't be necessary long term, but these IDs are coming in with odd OBO prefixes from Phenio
+OBO_PREFIXES_TO_REPAIR = ["FBbt", "WBbt", "ZFA", "XAO"]
+# These bring in nodes necessary for other ingests, but won't capture the same_as / equivalentClass
+# associations that we'll also need
+EXCLUDE_PREFIXES = ["HGNC", "FlyBase", "http", "biolink"]
+EXCLUDE_NODE_PATTERN = "omim.org|hgnc_id"
+EDGE_COLUMNS = [
+    "id",
+    "subject",
+    "predicate",
+    "object",
+    "category",
+    "primary_knowledge_source",
+    "aggregator_knowledge_source",
+    "knowledge_level",
+    "agent_type",
+]
+EDGE_DEFAULTS = {"knowledge_level": "knowledge_assertion", "agent_type": "manual_agent"}
+AGGREGATOR = "infores:monarchinitiative"
+# the values pandas reads as missing by default
+NULL_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+BLOCK_SIZE = 16 * 1024 * 1024
+BATCH_ROWS = 64 * 1024
+PHENIO_CACHE_DIR = "data/monarch/phenio_cache"
+METADATA_FILE = "data/metadata.yaml"
+
+
+@contextmanager
+def open_member(archive: str, member: str) -> Iterator[pa_csv.CSVStreamingReader]:
+    """Read a TSV member of the tarball in all-string record batches"""
+    with io.BufferedReader(TarMemberReader(archive, member), buffer_size=BLOCK_SIZE) as fh:
+        columns = fh.readline().decode().rstrip("\n").split("\t")
+        yield pa_csv.open_csv(
+            fh,
+            read_options=pa_csv.ReadOptions(column_names=columns, block_size=BLOCK_SIZE),
+            parse_options=pa_csv.ParseOptions(delimiter="\t", quote_char=False),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={column: pyarrow.string() for column in columns},
+                null_values=NULL_VALUES,
+                strings_can_be_null=True,
+            ),
+        )
+
+
+def phenio_release_tag(metadata_file: str = METADATA_FILE) -> Optional[str]:
+    """The Phenio release recorded by `ingest download --write-metadata`, if it was run"""
+    if not Path(metadata_file).is_file():
+        return None
+    with open(metadata_file) as fh:
+        tag = ((yaml.safe_load(fh) or {}).get("data") or {}).get("phenio")
+    return str(tag) if tag else None
+
+
+def cached_members(
+    archive: str = PHENIO_TAR, cache_dir: str = PHENIO_CACHE_DIR, tag: Optional[str] = None
+) -> Dict[str, Path]:
+    """Convert the nodes and edges members of the tarball to Parquet unless they're cached, returns their paths"""
+    stat = Path(archive).stat()
+    source = {"archive": str(archive), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    path = Path(cache_dir) / (tag or "untagged")
+    members = {member: path / f"{Path(member).stem}.parquet" for member in (NODES_MEMBER, EDGES_MEMBER)}
+    source_file = path / "source.json"
+    if source_file.is_file() and json.loads(source_file.read_text()) == source:
+        return members
+
+    logger.info(f"Caching the Phenio {tag or 'untagged'} nodes and edges in {path}")
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    tmp_path = Path(tempfile.mkdtemp(prefix=f"{path.name}.", dir=cache_dir))
+    for member, member_path in members.items():
+        with open_member(archive, member) as reader:
+            with pq.ParquetWriter(tmp_path / member_path.name, reader.schema, compression="zstd") as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+    (tmp_path / "source.json").write_text(json.dumps(source))
+
+    # the members of a previous release take several GB and won't be read again
+    for previous in Path(cache_dir).iterdir():
+        if previous != tmp_path:
+            shutil.rmtree(previous)
+    tmp_path.rename(path)
+    return members
+
+
+def read_cached(path: Path) -> Tuple[pyarrow.Schema, Iterator[pyarrow.RecordBatch]]:
+    parquet = pq.ParquetFile(path)
+    return parquet.schema_arrow, parquet.iter_batches(batch_size=BATCH_ROWS)
+
+
+def repair_obo_prefixes(values: pyarrow.ChunkedArray) -> pyarrow.ChunkedArray:
+    for prefix in OBO_PREFIXES_TO_REPAIR:
+        values = pc.replace_substring(values, f"OBO:{prefix}_", f"{prefix}:")
+    return values
+
+
+def starts_with_any(values: pyarrow.ChunkedArray, prefixes: List[str]) -> pyarrow.ChunkedArray:
+    return pc.match_substring_regex(values, f"^({'|'.join(prefixes)})")
+
+
+def _set_column(table: pyarrow.Table, name: str, values: pyarrow.ChunkedArray) -> pyarrow.Table:
+    return table.set_column(table.schema.get_field_index(name), name, values)
+
+
+def _invalid(values: pyarrow.ChunkedArray, valid: Set[str], counts: Dict[Optional[str], int]) -> pyarrow.Array:
+    """Which values are missing or not in valid, counting the rows of each invalid value"""
+    invalid = pc.invert(pc.fill_null(pc.is_in(values, value_set=pyarrow.array(sorted(valid), pyarrow.string())), False))
+    for entry in pc.value_counts(values.filter(invalid)).to_pylist():
+        counts[entry["values"]] = counts.get(entry["values"], 0) + entry["counts"]
+    return invalid
+
+
+def node_batches(
+    batches: Iterator[pyarrow.RecordBatch],
+    valid_categories: Set[str],
+    excluded: List[pyarrow.Table],
+    invalid_categories: Dict[Optional[str], int],
+) -> Iterator[pyarrow.RecordBatch]:
+    """Filter node batches, collecting the excluded nodes and counting the invalid categories"""
+    excluded_by_category = []
+    for batch in batches:
+        table = pyarrow.Table.from_batches([batch])
+        table = table.filter(
+            pc.invert(
+                pc.or_(
+                    pc.match_substring_regex(table["id"], EXCLUDE_NODE_PATTERN),
+                    pc.starts_with(table["id"], "MGI:"),
+                )
+            )
+        )
+        table = _set_column(table, "id", repair_obo_prefixes(table["id"]))
+
+        by_prefix = starts_with_any(table["id"], EXCLUDE_PREFIXES)
+        excluded.append(table.filter(by_prefix))
+        table = table.filter(pc.invert(by_prefix))
+
+        # Replace biolink:Occurrent category with biolink:BiologicalProcessOrActivity as a fallback to rescue
+        # GO nodes that are getting a mixin category of Occurrent that we don't want to exclude all of
+        categories = pc.replace_substring(table["category"], "biolink:Occurrent", "biolink:BiologicalProcessOrActivity")
+        table = _set_column(table, "category", categories)
+
+        invalid = _invalid(table["category"], valid_categories, invalid_categories)
+        excluded_by_category.append(table.filter(invalid))
+        yield from table.filter(pc.invert(invalid)).to_batches()
+    # nodes excluded for their prefix come first, then the ones excluded for their category
+    excluded.extend(excluded_by_category)
+
+
+def edge_batches(
+    batches: Iterator[pyarrow.RecordBatch],
+    valid_predicates: Set[str],
+    valid_categories: Set[str],
+    invalid_predicates: Dict[Optional[str], int],
+    invalid_categories: Dict[Optional[str], int],
+) -> Iterator[pyarrow.RecordBatch]:
+    """Filter edge batches, counting the invalid predicates and categories"""
+    for batch in batches:
+        table = pyarrow.Table.from_batches([batch])
+        table = table.select([column for column in table.schema.names if column in EDGE_COLUMNS])
+        for column, default in EDGE_DEFAULTS.items():
+            if column not in table.schema.names:
+                table = table.append_column(column, pyarrow.repeat(pyarrow.scalar(default), len(table)))
+
+        # prepend infores:monarchinitiative to the aggregator_knowledge_source of edges that don't have it
+        aggregators = table["aggregator_knowledge_source"]
+        prepended = pc.if_else(
+            pc.starts_with(aggregators, AGGREGATOR),
+            aggregators,
+            pc.binary_join_element_wise(AGGREGATOR, aggregators, "|"),
+        )
+        table = _set_column(table, "aggregator_knowledge_source", pc.coalesce(prepended, AGGREGATOR))
+
+        table = table.filter(pc.match_substring(table["predicate"], ":"))
+        # edges without a category are plain associations
+        table = _set_column(table, "category", pc.fill_null(table["category"], "biolink:Association"))
+        for column in ["subject", "object"]:
+            table = _set_column(table, column, repair_obo_prefixes(table[column]))
+
+        # Only keep edges where the subject and object both are within our allowable prefix list,
+        # a missing subject or object drops the edge too
+        table = table.filter(
+            pc.invert(
+                pc.or_kleene(
+                    starts_with_any(table["subject"], EXCLUDE_PREFIXES),
+                    starts_with_any(table["object"], EXCLUDE_PREFIXES),
+                )
+            )
+        )
+
+        table = table.filter(pc.invert(_invalid(table["predicate"], valid_predicates, invalid_predicates)))
+        yield from table.filter(
+            pc.invert(_invalid(table["category"], valid_categories, invalid_categories))
+        ).to_batches()
+
+
+def copy_batches(batches: Iterator[pyarrow.RecordBatch], schema: pyarrow.Schema, path: Path) -> int:
+    """Write batches as a TSV, or Parquet to a .parquet path, as they're produced, returns the rows written"""
+    if path.suffix == ".parquet":
+        return write_parquet(pyarrow.RecordBatchReader.from_batches(schema, batches), path)
+    rows = 0
+
+    def _counted():
+        nonlocal rows
+        for batch in batches:
+            rows += len(batch)
+            yield batch
+
+    reader = pyarrow.RecordBatchReader.from_batches(schema, _counted())  # noqa: F841
+    # DuckDB only quotes values that need it and writes nulls as empty strings, like pandas' to_csv
+    duckdb.sql(f"COPY (SELECT * FROM reader) TO '{path}' (HEADER, DELIMITER '\t')")
+    return rows
+
+
+def _log_invalid(kind: str, counts: Dict[Optional[str], int], removed: str):
+    if counts:
+        logger.error(f"Invalid {kind}: {set(counts)}")
+        logger.error(f"Removing {sum(counts.values())} {removed}")
+
+
+def transform(
+    output_dir: str,
+    qc_dir: str,
+    valid_node_categories: Set[str],
+    valid_predicates: Set[str],
+    valid_edge_categories: Set[str],
+    archive: str = PHENIO_TAR,
+    cache_dir: str = PHENIO_CACHE_DIR,
+    tag: Optional[str] = None,
+    output_format: str = "tsv",
+) -> Dict[str, int]:
+    """Write phenio_nodes.tsv and phenio_edges.tsv, or .parquet, to output_dir and excluded_phenio_nodes.tsv to qc_dir
+
+    Returns the number of nodes, edges and excluded nodes written, and the number of rows read from the tarball.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    Path(qc_dir).mkdir(parents=True, exist_ok=True)
+    members = cached_members(archive, cache_dir, tag)
+
+    excluded: List[pyarrow.Table] = []
+    invalid_node_categories: Dict[Optional[str], int] = {}
+    node_schema, node_reader = read_cached(members[NODES_MEMBER])
+    nodes = copy_batches(
+        node_batches(node_reader, valid_node_categories, excluded, invalid_node_categories),
+        node_schema,
+        Path(output_dir) / f"phenio_nodes.{output_format}",
+    )
+    excluded_nodes = copy_batches(
+        (batch for table in excluded for batch in table.to_batches()),
+        node_schema,
+        Path(qc_dir) / "excluded_phenio_nodes.tsv",
+    )
+    _log_invalid("node categories", invalid_node_categories, "nodes with invalid categories")
+
+    invalid_predicates: Dict[Optional[str], int] = {}
+    invalid_edge_categories: Dict[Optional[str], int] = {}
+    edge_schema, edge_reader = read_cached(members[EDGES_MEMBER])
+    edge_columns = [column for column in edge_schema.names if column in EDGE_COLUMNS]
+    edge_columns += [column for column in EDGE_DEFAULTS if column not in edge_columns]
+    edges = copy_batches(
+        edge_batches(edge_reader, valid_predicates, valid_edge_categories, invalid_predicates, invalid_edge_categories),
+        pyarrow.schema([(column, pyarrow.string()) for column in edge_columns]),
+        Path(output_dir) / f"phenio_edges.{output_format}",
+    )
+    _log_invalid("predicates found in Phenio associations", invalid_predicates, "edges with invalid predicates")
+    _log_invalid("edge categories", invalid_edge_categories, "edges with invalid categories")
+
+    rows_read = sum(pq.ParquetFile(members[member]).metadata.num_rows for member in [NODES_MEMBER, EDGES_MEMBER])
+    return {"nodes": nodes, "edges": edges, "excluded_nodes": excluded_nodes, "rows_read": rows_read}
@@ -0,0 +1,203 @@
+"""
+Columnar engine for the STRING protein links ingest
+
+Writes the same edges as ingests/string/protein_links.py, but instead of building a pydantic model per row,
+it reads the gzipped space-delimited files in Arrow record batches, applies the combined_score filter to each
+batch, and does the symmetric pair dedup, the entrez-2-string join, the expansion of multi-gene mappings
+and the evidence codes as DuckDB column operations.
+"""
+
+import importlib.util
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import duckdb
+import numpy
+import pyarrow
+import pyarrow.compute as pc
+from pyarrow import csv as pa_csv
+import yaml
+from koza.io.writer.tsv_writer import TSVWriter
+from koza.io.yaml_loader import UniqueIncludeLoader
+from loguru import logger
+
+from kg_alzheimers.columnar.tsv import write_tsv
+from kg_alzheimers.utils.id_utils import sql_edge_id
+from kg_alzheimers.utils.parquet_utils import write_parquet
+
+INGEST_DIR = Path(__file__).parent.parent / "ingests" / "string"
+CONFIG_FILE = INGEST_DIR / "protein_links.yaml"
+
+SCORE_COLUMNS = [
+    "neighborhood",
+    "fusion",
+    "cooccurence",
+    "coexpression",
+    "experimental",
+    "database",
+    "textmining",
+    "combined_score",
+]
+LINKS_SCHEMA = pyarrow.schema(
+    [("protein1", pyarrow.string()), ("protein2", pyarrow.string())]
+    + [(column, pyarrow.int32()) for column in SCORE_COLUMNS]
+)
+# Koza's filter codes for the comparisons the protein links filters can use
+FILTER_OPERATORS = {
+    "gt": pc.greater,
+    "gte": pc.greater_equal,
+    "lt": pc.less,
+    "lte": pc.less_equal,
+    "eq": pc.equal,
+    "ne": pc.not_equal,
+}
+# rows from later files get a higher ordinal, which keeps output in the same order as the Koza ingest
+FILE_ORDINAL_STRIDE = 2**40
+
+
+def evidence_code_mappings() -> Dict[str, str]:
+    """EVIDENCE_CODE_MAPPINGS from string_utils.py, which Koza imports from the ingest directory"""
+    spec = importlib.util.spec_from_file_location("string_utils", INGEST_DIR / "string_utils.py")
+    string_utils = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(string_utils)
+    return string_utils.EVIDENCE_CODE_MAPPINGS
+
+
+def load_config(config_file: Path = CONFIG_FILE) -> Dict:
+    with open(config_file, "r") as config_fh:
+        return yaml.load(config_fh, Loader=UniqueIncludeLoader)
+
+
+def read_links(files: List[str], filters: List[Dict], row_limit: Optional[int] = None) -> pyarrow.Table:
+    """Read protein links files batch by batch, keeping only the rows that pass the config filters
+
+    Files are read in reverse order, like Koza does, and every row gets an ordinal so the output can be
+    written in input order.
+    """
+    convert_options = pa_csv.ConvertOptions(column_types=LINKS_SCHEMA)
+    parse_options = pa_csv.ParseOptions(delimiter=" ", quote_char=False)
+    tables = []
+    for file_index, file in enumerate(reversed(files)):
+        offset = file_index * FILE_ORDINAL_STRIDE
+        rows_read = 0
+        for batch in pa_csv.open_csv(file, parse_options=parse_options, convert_options=convert_options):
+            if row_limit is not None:
+                batch = batch.slice(0, row_limit - rows_read)
+            ordinal = pyarrow.array(
+                numpy.arange(offset + rows_read, offset + rows_read + len(batch), dtype=numpy.int64)
+            )
+            rows_read += len(batch)
+            table = pyarrow.Table.from_batches([batch]).append_column("ordinal", ordinal)
+            for row_filter in filters:
+                mask = FILTER_OPERATORS[row_filter["filter_code"]](table[row_filter["column"]], row_filter["value"])
+                if row_filter.get("inclusion", "include") == "exclude":
+                    mask = pc.invert(mask)
+                table = table.filter(mask)
+            tables.append(table)
+            if row_limit is not None and rows_read >= row_limit:
+                break
+    if not tables:
+        return LINKS_SCHEMA.append(pyarrow.field("ordinal", pyarrow.int64())).empty_table()
+    return pyarrow.concat_tables(tables)
+
+
+def read_entrez_2_string(map_config: Dict) -> pyarrow.Table:
+    """Read the entrez-2-string map, keeping the last entry for each STRING id like Koza's map loader does"""
+    read_options = pa_csv.ReadOptions(column_names=["taxid", "entrez", "string"])
+    parse_options = pa_csv.ParseOptions(
+        delimiter=map_config.get("delimiter", "\t").encode().decode("unicode_escape"),
+        quote_char=False,
+        # the commented header line has no delimiters in it
+        invalid_row_handler=lambda row: "skip",
+    )
+    convert_options = pa_csv.ConvertOptions(column_types={name: pyarrow.string() for name in read_options.column_names})
+    tables = []
+    for file in map_config["files"]:
+        table = pa_csv.read_csv(
+            file, read_options=read_options, parse_options=parse_options, convert_options=convert_options
+        )
+        table = table.filter(pc.invert(pc.starts_with(table["taxid"], "#")))
+        offset = len(tables) * FILE_ORDINAL_STRIDE
+        tables.append(table.append_column("map_ordinal", pyarrow.array(numpy.arange(offset, offset + len(table)))))
+    return pyarrow.concat_tables(tables)
+
+
+# STRING lists every interaction in both directions, keep the first row of each undirected pair
+DEDUPLICATE_QUERY = """
+CREATE TEMP TABLE unique_links AS
+SELECT * FROM links
+QUALIFY row_number() OVER (PARTITION BY least(protein1, protein2), greatest(protein1, protein2) ORDER BY ordinal) = 1
+"""
+
+
+def edges_query(evidence_codes: Dict[str, str], edge_columns: List[str]) -> str:
+    evidence = ", ".join(f"CASE WHEN {column} > 0 THEN '{code}' END" for column, code in evidence_codes.items())
+    values = {
+        "subject": "'NCBIGene:' || gene_a",
+        "predicate": "'biolink:interacts_with'",
+        "object": "'NCBIGene:' || gene_b",
+        "category": "'biolink:PairwiseGeneToGeneInteraction'",
+        "agent_type": "'not_provided'",
+        "aggregator_knowledge_source": "'infores:monarchinitiative'",
+        "has_evidence": "has_evidence",
+        "knowledge_level": "'knowledge_assertion'",
+        "primary_knowledge_source": "'infores:string'",
+    }
+    values["id"] = sql_edge_id(
+        [values["subject"], values["predicate"], values["object"], values["primary_knowledge_source"], "has_evidence"]
+    )
+    select = ",\n        ".join(f"{values[column]} AS {column}" for column in edge_columns)
+    return f"""
+    WITH entrez_2_string AS (
+        SELECT string, entrez FROM entrez_map
+        QUALIFY row_number() OVER (PARTITION BY string ORDER BY map_ordinal DESC) = 1
+    ), mapped AS (
+        SELECT
+            links.ordinal,
+            string_split(map_a.entrez, '|') AS genes_a,
+            string_split(map_b.entrez, '|') AS genes_b,
+            concat_ws('|', {evidence}) AS has_evidence
+        FROM unique_links links
+        JOIN entrez_2_string map_a ON links.protein1 = map_a.string
+        JOIN entrez_2_string map_b ON links.protein2 = map_b.string
+        WHERE map_a.entrez <> '' AND map_b.entrez <> ''
+    ), expanded_a AS (
+        SELECT ordinal, has_evidence, genes_b,
+            unnest(genes_a) AS gene_a, generate_subscripts(genes_a, 1) AS position_a
+        FROM mapped
+    ), expanded AS (
+        SELECT ordinal, has_evidence, gene_a, position_a,
+            unnest(genes_b) AS gene_b, generate_subscripts(genes_b, 1) AS position_b
+        FROM expanded_a
+    )
+    SELECT
+        {select}
+    FROM expanded
+    ORDER BY ordinal, position_a, position_b
+    """
+
+
+def transform(
+    output_dir: str, row_limit: Optional[int] = None, config_file: Path = CONFIG_FILE, output_format: str = "tsv"
+) -> int:
+    """Write <output_dir>/string_protein_links_edges.tsv, or .parquet, returns the number of edges written"""
+    config = load_config(config_file)
+    (map_file,) = config["depends_on"]
+    with open(map_file, "r") as map_fh:
+        map_config = yaml.load(map_fh, Loader=UniqueIncludeLoader)
+
+    links = read_links(config["files"], config.get("filters", []), row_limit=row_limit)
+    entrez_map = read_entrez_2_string(map_config)
+    edge_columns = list(TSVWriter._order_columns(set(config["edge_properties"]), "edge"))
+
+    con = duckdb.connect()
+    con.register("links", links)
+    con.register("entrez_map", entrez_map)
+    con.execute(DEDUPLICATE_QUERY)
+    unique_links = con.execute("SELECT count(*) FROM unique_links").fetchone()[0]
+    logger.info(f"Dropped {links.num_rows - unique_links} duplicate reversed protein pairs")
+    result = con.execute(edges_query(evidence_code_mappings(), edge_columns))
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    path = Path(output_dir) / f"{config['name']}_edges.{output_format}"
+    batches = result.fetch_record_batch()
+    return write_parquet(batches, path) if output_format == "parquet" else write_tsv(batches, path)
@@ -0,0 +1,47 @@
+import io
+import tarfile
+from pathlib import Path
+
+import pyarrow
+from pyarrow import csv as pa_csv
+
+
+class TarMemberReader(io.RawIOBase):
+    """Read one member of a gzipped tarball with Arrow's native gzip decoder instead of the tarfile module"""
+
+    def __init__(self, archive: str, member: str):
+        # a streaming tarfile only decompresses up to the member's header to find where its data starts
+        with tarfile.open(archive, "r|gz") as tar:
+            info = next((entry for entry in tar if entry.name == member), None)
+            if info is None:
+                raise FileNotFoundError(f"{member} not found in {archive}")
+            offset, self.remaining = info.offset_data, info.size
+        self.stream = pyarrow.input_stream(archive, compression="gzip")
+        while offset > 0:
+            offset -= len(self.stream.read(min(offset, 1024 * 1024)))
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.stream.read(min(len(buffer), self.remaining))
+        self.remaining -= len(data)
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.stream.close()
+        super().close()
+
+
+def write_tsv(batches: pyarrow.RecordBatchReader, path: Path) -> int:
+    """Write record batches the way Koza's TSVWriter does: tab separated, unquoted, nulls as empty strings"""
+    rows = 0
+    options = pa_csv.WriteOptions(include_header=False, delimiter="\t", quoting_style="none")
+    with open(path, "wb") as fh:
+        fh.write(("\t".join(batches.schema.names) + "\n").encode())
+        with pa_csv.CSVWriter(fh, batches.schema, write_options=options) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += len(batch)
+    return rows
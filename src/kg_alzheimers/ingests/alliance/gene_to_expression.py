@@ -1,11 +1,10 @@
-import uuid
-
 from koza.cli_utils import get_koza_app
 from source_translation import source_map
 
 from biolink_model.datamodel.pydanticmodel_v2 import GeneToExpressionSiteAssociation, KnowledgeLevelEnum, AgentTypeEnum
 
 from kg_alzheimers.ingests.alliance.utils import get_data
+from kg_alzheimers.utils.id_utils import edge_id
 
 from loguru import logger
 
@@ -34,6 +33,8 @@ while (row := koza_app.get_row()) is not None:
 
         publication_ids = [get_data(row, "evidence.publicationId")]
 
+        assay = get_data(row, "assay")
+
         xref = get_data(row, "crossReference.id")
         if xref:
             publication_ids.append(xref)
@@ -42,12 +43,20 @@ while (row := koza_app.get_row()) is not None:
         if anatomical_entity_id:
             koza_app.write(
                 GeneToExpressionSiteAssociation(
-                    id="uuid:" + str(uuid.uuid1()),
+                    id=edge_id(
+                        gene_id,
+                        "biolink:expressed_in",
+                        anatomical_entity_id,
+                        source,
+                        stage_term_id,
+                        assay,
+                        publication_ids,
+                    ),
                     subject=gene_id,
                     predicate="biolink:expressed_in",
                     object=anatomical_entity_id,
                     stage_qualifier=stage_term_id,
-                    qualifiers=([get_data(row, "assay")] if get_data(row, "assay") else None),
+                    qualifiers=([assay] if assay else None),
                     publications=publication_ids,
                     aggregator_knowledge_source=["infores:monarchinitiative", "infores:alliancegenome"],
                     primary_knowledge_source=source,
@@ -61,12 +70,20 @@ while (row := koza_app.get_row()) is not None:
             # (but ignore otherwise ignore it, if reported alongside in the record)
             koza_app.write(
                 GeneToExpressionSiteAssociation(
-                    id="uuid:" + str(uuid.uuid1()),
+                    id=edge_id(
+                        gene_id,
+                        "biolink:expressed_in",
+                        cellular_component_id,
+                        source,
+                        stage_term_id,
+                        assay,
+                        publication_ids,
+                    ),
                     subject=gene_id,
                     predicate="biolink:expressed_in",
                     object=cellular_component_id,
                     stage_qualifier=stage_term_id,
-                    qualifiers=([get_data(row, "assay")] if get_data(row, "assay") else None),
+                    qualifiers=([assay] if assay else None),
                     publications=publication_ids,
                     aggregator_knowledge_source=["infores:monarchinitiative", "infores:alliancegenome"],
                     primary_knowledge_source=source,
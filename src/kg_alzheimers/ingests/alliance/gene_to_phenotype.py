@@ -1,7 +1,5 @@
 from typing import List
 
-import uuid
-
 from koza.cli_utils import get_koza_app
 from source_translation import source_map
 
@@ -11,6 +9,7 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
     AgentTypeEnum,
 )
 
+from kg_alzheimers.utils.id_utils import edge_id
 
 from loguru import logger
 
@@ -38,18 +37,9 @@ while (row := koza_app.get_row()) is not None:
 
         source = source_map[row["objectId"].split(':')[0]]
 
-        association = GeneToPhenotypicFeatureAssociation(
-            id="uuid:" + str(uuid.uuid1()),
-            subject=gene_id,
-            predicate="biolink:has_phenotype",
-            object=phenotypic_feature_id,
-            publications=[row["evidence"]["publicationId"]],
-            aggregator_knowledge_source=["infores:monarchinitiative", "infores:alliancegenome"],
-            primary_knowledge_source=source,
-            knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
-            agent_type=AgentTypeEnum.manual_agent,
-        )
+        publications = [row["evidence"]["publicationId"]]
 
+        qualifiers = None
         if "conditionRelations" in row.keys() and row["conditionRelations"] is not None:
             qualifiers: List[str] = []
             for conditionRelation in row["conditionRelations"]:
@@ -58,6 +48,17 @@ while (row := koza_app.get_row()) is not None:
                         qualifier_term = condition["conditionClassId"]
                         qualifiers.append(qualifier_term)
 
-            association.qualifiers = qualifiers
+        association = GeneToPhenotypicFeatureAssociation(
+            id=edge_id(gene_id, "biolink:has_phenotype", phenotypic_feature_id, source, publications, qualifiers),
+            subject=gene_id,
+            predicate="biolink:has_phenotype",
+            object=phenotypic_feature_id,
+            publications=publications,
+            qualifiers=qualifiers,
+            aggregator_knowledge_source=["infores:monarchinitiative", "infores:alliancegenome"],
+            primary_knowledge_source=source,
+            knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+            agent_type=AgentTypeEnum.manual_agent,
+        )
 
         koza_app.write(association)
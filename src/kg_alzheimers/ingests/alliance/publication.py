@@ -5,6 +5,8 @@ from biolink_model.datamodel.pydanticmodel_v2 import Publication
 from source_translation import source_map
 
 koza_app = get_koza_app("alliance_publication")
+publication_type = koza_app.translation_table.resolve_term("publication")
+journal_article_type = koza_app.translation_table.resolve_term("journal article")
 
 while (row := koza_app.get_row()) is not None:
 
@@ -34,7 +36,7 @@ while (row := koza_app.get_row()) is not None:
         name=row["title"],
         summary=row["abstract"] if "abstract" in row.keys() else None,
         xref=xrefs,
-        type=[koza_app.translation_table.resolve_term("publication")],
+        type=[publication_type],
         creation_date=creation_date,
         provided_by=[source],
     )
@@ -59,6 +61,6 @@ while (row := koza_app.get_row()) is not None:
         pub.keywords = row["keywords"]
 
     if row["allianceCategory"] in ["Preprint", "Research Article", "Review Article"]:
-        pub.type = [koza_app.translation_table.resolve_term("journal article")]
+        pub.type = [journal_article_type]
 
     koza_app.write(pub)
@@ -1,9 +1,12 @@
-import uuid
-import pandas as pd
+import heapq
+from operator import itemgetter
 from typing import Dict, List, Union
 from koza.app import KozaApp
 from biolink_model.datamodel.pydanticmodel_v2 import GeneToExpressionSiteAssociation, KnowledgeLevelEnum, AgentTypeEnum
 
+from kg_alzheimers.utils.association_utils import association_factory
+from kg_alzheimers.utils.id_utils import edge_id
+
 
 def filter_group_by_rank(rows: List, col: str, largest_n: int = 0, smallest_n: int = 0) -> List[Dict]:
     """Function to filter a group of Koza rows by values largest or smallest values in column:
@@ -20,10 +23,19 @@ def filter_group_by_rank(rows: List, col: str, largest_n: int = 0, smallest_n: i
     Returns:
         List[Dict]: Returns a list of n rows in Koza dict format sorted by rank in column.
     """
-    df = pd.DataFrame(rows)
-    largest_df = df.nlargest(largest_n, col, keep="first")
-    smallest_df = df.nsmallest(smallest_n, col, keep="first")
-    return pd.concat([largest_df, smallest_df]).to_dict('records')
+    # heapq's nlargest/nsmallest are stable, so ties keep their input order like pandas' keep="first"
+    key = itemgetter(col)
+    return heapq.nlargest(largest_n, rows, key=key) + heapq.nsmallest(smallest_n, rows, key=key)
+
+
+gene_to_expression_site = association_factory(
+    GeneToExpressionSiteAssociation,
+    predicate='biolink:expressed_in',
+    primary_knowledge_source="infores:bgee",
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+    agent_type=AgentTypeEnum.not_provided,
+)
 
 
 def write_group(rows: List, koza_app: KozaApp):
@@ -45,15 +57,11 @@ def write_group(rows: List, koza_app: KozaApp):
             obj = anatomical_entities[0]
             object_specialization_qualifier = anatomical_entities[1]
 
-        association = GeneToExpressionSiteAssociation(
-            id="uuid:" + str(uuid.uuid1()),
-            subject="ENSEMBL:" + row['Gene ID'],
-            predicate='biolink:expressed_in',
+        subject = "ENSEMBL:" + row['Gene ID']
+        association = gene_to_expression_site(
+            id=edge_id(subject, 'biolink:expressed_in', obj, "infores:bgee", object_specialization_qualifier),
+            subject=subject,
             object=obj,
-            primary_knowledge_source="infores:bgee",
-            aggregator_knowledge_source=["infores:monarchinitiative"],
-            knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
-            agent_type=AgentTypeEnum.not_provided,
             object_specialization_qualifier=object_specialization_qualifier,
         )
 
@@ -89,17 +97,46 @@ def get_row_group(koza_app: KozaApp, col: str = 'Gene ID') -> Union[List, None]:
     return rows
 
 
-def process_koza_source(koza_app: KozaApp):
-    """Function to filter a group of Koza rows by values largest or smallest values in column:
+def process_koza_source(
+    koza_app: KozaApp, group_col: str = 'Gene ID', rank_col: str = 'Expression rank', smallest_n: int = 10
+):
+    """Function to write the smallest_n ranked rows of each group of Koza rows in a single pass:
 
-    Get the top and/or bottom n rows ranked based on column:
+    Rows are streamed once. The current group keeps a bounded max-heap of its smallest_n rows,
+    which is written out, smallest rank first, as soon as the group column changes.
 
     Args:
         koza_app (KozaApp): The Koza object to process for ingest.
+        group_col (str): The column that consecutive rows are grouped on.
+        rank_col (str): The column to rank rows within a group by.
+        smallest_n (int): The number of rows to keep for each group.
     """
-    while (row_group := get_row_group(koza_app)) is not None:
-        rank_filtered_rows = filter_group_by_rank(row_group, col='Expression rank', smallest_n=10)
-        write_group(rank_filtered_rows, koza_app)
+    group = None
+    # entries are (-rank, -position, row), so the root is the worst row kept and ties keep the earliest rows
+    heap: List = []
+    position = 0
+
+    def _flush():
+        if heap:
+            write_group([row for _, _, row in sorted(heap, reverse=True)], koza_app)
+            heap.clear()
+
+    try:
+        while True:
+            row = koza_app.get_row()
+            if row[group_col] != group:
+                _flush()
+                group = row[group_col]
+            entry = (-row[rank_col], -position, row)
+            position += 1
+            if len(heap) < smallest_n:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+    except StopIteration:
+        # Koza signals the end of the source with StopIteration, the last group still has to be written
+        _flush()
+        raise
 
 
 class CurieParsingError(Exception):
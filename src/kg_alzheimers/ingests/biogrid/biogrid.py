@@ -1,8 +1,9 @@
-import uuid
 from koza.cli_utils import get_koza_app
 from biolink_model.datamodel.pydanticmodel_v2 import PairwiseGeneToGeneInteraction, KnowledgeLevelEnum, AgentTypeEnum
 from biogrid_util import get_gene_id, get_evidence, get_publication_ids
 
+from kg_alzheimers.utils.id_utils import edge_id
+
 koza_app = get_koza_app("biogrid")
 
 while (row := koza_app.get_row()) is not None:
@@ -22,7 +23,7 @@ while (row := koza_app.get_row()) is not None:
         or gid_b.startswith("UniProtKB:")
     ):
         association = PairwiseGeneToGeneInteraction(
-            id="uuid:" + str(uuid.uuid1()),
+            id=edge_id(gid_a, "biolink:interacts_with", gid_b, "infores:biogrid", evidence, publications),
             subject=gid_a,
             predicate="biolink:interacts_with",
             object=gid_b,
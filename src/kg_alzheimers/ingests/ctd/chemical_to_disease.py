@@ -1,5 +1,3 @@
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import (
@@ -8,8 +6,17 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
     AgentTypeEnum,
 )
 from kg_alzheimers.constants import BIOLINK_TREATS_OR_APPLIED_OR_STUDIED_TO_TREAT
+from kg_alzheimers.utils.association_utils import association_factory
+from kg_alzheimers.utils.id_utils import edge_id
 
 koza_app = get_koza_app("ctd_chemical_to_disease")
+chemical_to_disease = association_factory(
+    ChemicalToDiseaseOrPhenotypicFeatureAssociation,
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:ctd",
+    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+    agent_type=AgentTypeEnum.manual_agent,
+)
 
 while (row := koza_app.get_row()) is not None:
 
@@ -22,16 +29,14 @@ while (row := koza_app.get_row()) is not None:
         # Update this if we start bringing in marker/mechanism records
         predicate = BIOLINK_TREATS_OR_APPLIED_OR_STUDIED_TO_TREAT
 
-        association = ChemicalToDiseaseOrPhenotypicFeatureAssociation(
-            id="uuid:" + str(uuid.uuid1()),
+        publications = ["PMID:" + p for p in row['PubMedIDs'].split("|")]
+
+        association = chemical_to_disease(
+            id=edge_id(chemical_id, predicate, disease_id, "infores:ctd", publications),
             subject=chemical_id,
             predicate=predicate,
             object=disease_id,
-            publications=["PMID:" + p for p in row['PubMedIDs'].split("|")],
-            aggregator_knowledge_source=["infores:monarchinitiative"],
-            primary_knowledge_source="infores:ctd",
-            knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
-            agent_type=AgentTypeEnum.manual_agent,
+            publications=publications,
         )
 
         koza_app.write(association)
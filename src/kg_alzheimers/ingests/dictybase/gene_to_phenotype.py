@@ -1,7 +1,6 @@
-import uuid
-
 from koza.cli_utils import get_koza_app
 from kg_alzheimers.ingests.dictybase.utils import parse_phenotypes
+from kg_alzheimers.utils.id_utils import edge_id
 
 from biolink_model.datamodel.pydanticmodel_v2 import (
     GeneToPhenotypicFeatureAssociation,
@@ -10,11 +9,10 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
 )
 
 koza_app = get_koza_app("dictybase_gene_to_phenotype")
+phenotype_names_to_ids = koza_app.get_map("dictybase_phenotype_names_to_ids")
 
 while (row := koza_app.get_row()) is not None:
 
-    phenotype_names_to_ids = koza_app.get_map("dictybase_phenotype_names_to_ids")
-
     gene_identifier = ['dictyBase:' + gene_id for gene_id in row['DDB_G_ID'].split("|")]
 
     if len(gene_identifier) == 1:
@@ -27,7 +25,7 @@ while (row := koza_app.get_row()) is not None:
             # TODO: how do we capture the 'Strain Descriptor' (genotype) context of
             #       Dictylostelium via which a (mutant) gene (allele) is tied to its phenotype?
             association = GeneToPhenotypicFeatureAssociation(
-                id="uuid:" + str(uuid.uuid1()),
+                id=edge_id(gene_identifier[0], "biolink:has_phenotype", phenotype_id, "infores:dictybase"),
                 subject=gene_identifier[0],  # gene[0] is the resolved gene ID
                 predicate='biolink:has_phenotype',
                 object=phenotype_id,
@@ -1,5 +1,3 @@
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import (
@@ -8,29 +6,33 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
     KnowledgeLevelEnum,
 )
 
+from kg_alzheimers.utils.association_utils import association_factory
+from kg_alzheimers.utils.id_utils import edge_id
+
 koza_app = get_koza_app("mgi_publication_to_gene")
+publication_to_gene = association_factory(
+    InformationContentEntityToNamedThingAssociation,
+    predicate="biolink:mentions",
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:mgi",
+    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+    agent_type=AgentTypeEnum.manual_agent,
+)
 
 while (row := koza_app.get_row()) is not None:
 
     gene_id = row["MGI Marker Accession ID"]
 
-    relation = koza_app.translation_table.resolve_term("mentions")
-
     pub_ids = row["PubMed IDs"].split("|")
 
     for pub_id in pub_ids:
 
         pmid = "PMID:" + pub_id
 
-        association = InformationContentEntityToNamedThingAssociation(
-            id="uuid:" + str(uuid.uuid1()),
+        association = publication_to_gene(
+            id=edge_id(pmid, "biolink:mentions", gene_id, "infores:mgi"),
             subject=pmid,
-            predicate="biolink:mentions",
             object=gene_id,
-            aggregator_knowledge_source=["infores:monarchinitiative"],
-            primary_knowledge_source="infores:mgi",
-            knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
-            agent_type=AgentTypeEnum.manual_agent,
         )
 
         koza_app.write(association)
@@ -2,16 +2,23 @@
 Ingest of Reference Genome Orthologs from Panther
 """
 
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import GeneToGeneHomologyAssociation, KnowledgeLevelEnum, AgentTypeEnum
 
 from kg_alzheimers.ingests.panther.orthology_utils import parse_gene, ncbitaxon_catalog
+from kg_alzheimers.utils.association_utils import association_factory
+from kg_alzheimers.utils.id_utils import edge_id
 
 
 koza_app = get_koza_app("panther_genome_orthologs")
+genome_ortholog = association_factory(
+    GeneToGeneHomologyAssociation,
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:panther",
+    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+    agent_type=AgentTypeEnum.not_provided,
+)
 
 while (row := koza_app.get_row()) is not None:
 
@@ -43,16 +50,12 @@ while (row := koza_app.get_row()) is not None:
 
             # Instantiate the instance of Gene-to-Gene Homology Association
             panther_ortholog_id = row["Panther Ortholog ID"]
-            association = GeneToGeneHomologyAssociation(
-                id=f"uuid:{str(uuid.uuid1())}",
+            association = genome_ortholog(
+                id=edge_id(gene_id, predicate, ortholog_id, "infores:panther", panther_ortholog_id),
                 subject=gene_id,
                 object=ortholog_id,
                 predicate=predicate,
                 has_evidence=[f"PANTHER.FAMILY:{panther_ortholog_id}"],
-                aggregator_knowledge_source=["infores:monarchinitiative"],
-                primary_knowledge_source="infores:panther",
-                knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
-                agent_type=AgentTypeEnum.not_provided,
             )
 
             # Write the captured Association out
@@ -1,5 +1,3 @@
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import (
@@ -8,6 +6,8 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
     AgentTypeEnum,
 )
 
+from kg_alzheimers.utils.id_utils import edge_id
+
 koza_app = get_koza_app("pombase_gene_to_phenotype")
 
 while (row := koza_app.get_row()) is not None:
@@ -17,7 +17,9 @@ while (row := koza_app.get_row()) is not None:
     phenotype_id = row["FYPO ID"]
 
     association = GeneToPhenotypicFeatureAssociation(
-        id="uuid:" + str(uuid.uuid1()),
+        id=edge_id(
+            gene_id, "biolink:has_phenotype", phenotype_id, "infores:pombase", row["Reference"], row["Condition"]
+        ),
         subject=gene_id,
         predicate="biolink:has_phenotype",
         object=phenotype_id,
@@ -1,9 +1,19 @@
-import uuid
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import GeneToPathwayAssociation, AgentTypeEnum, KnowledgeLevelEnum
 
+from kg_alzheimers.utils.association_utils import association_factory
+from kg_alzheimers.utils.id_utils import edge_id
+
 koza_app = get_koza_app("reactome_gene_to_pathway")
+gene_to_pathway = association_factory(
+    GeneToPathwayAssociation,
+    predicate="biolink:participates_in",
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:reactome",
+    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+    agent_type=AgentTypeEnum.not_provided,
+)
 
 while (row := koza_app.get_row()) is not None:
 
@@ -23,16 +33,11 @@ while (row := koza_app.get_row()) is not None:
         go_evidence_code = row["go_ecode"]
         evidence_code_term = koza_app.translation_table.resolve_term(go_evidence_code)
 
-        association = GeneToPathwayAssociation(
-            id="uuid:" + str(uuid.uuid1()),
+        association = gene_to_pathway(
+            id=edge_id(gene_id, "biolink:participates_in", pathway_id, "infores:reactome", evidence_code_term),
             subject=gene_id,
-            predicate="biolink:participates_in",
             object=pathway_id,
             has_evidence=[evidence_code_term],
-            aggregator_knowledge_source=["infores:monarchinitiative"],
-            primary_knowledge_source="infores:reactome",
-            knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
-            agent_type=AgentTypeEnum.not_provided,
         )
 
     koza_app.write(association)
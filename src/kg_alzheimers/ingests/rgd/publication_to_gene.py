@@ -1,5 +1,3 @@
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import (
@@ -8,7 +6,18 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
     KnowledgeLevelEnum,
 )
 
+from kg_alzheimers.utils.association_utils import association_factory
+from kg_alzheimers.utils.id_utils import edge_id
+
 koza_app = get_koza_app("rgd_publication_to_gene")
+publication_to_gene = association_factory(
+    InformationContentEntityToNamedThingAssociation,
+    predicate="biolink:mentions",
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:rgd",
+    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+    agent_type=AgentTypeEnum.manual_agent,
+)
 
 while (row := koza_app.get_row()) is not None:
 
@@ -22,15 +31,10 @@ while (row := koza_app.get_row()) is not None:
 
         publication_id = "PMID:" + each_id
 
-        association = InformationContentEntityToNamedThingAssociation(
-            id="uuid:" + str(uuid.uuid1()),
+        association = publication_to_gene(
+            id=edge_id(gene_id, "biolink:mentions", publication_id, "infores:rgd"),
             subject=gene_id,
-            predicate="biolink:mentions",
             object=publication_id,
-            aggregator_knowledge_source=["infores:monarchinitiative"],
-            primary_knowledge_source="infores:rgd",
-            knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
-            agent_type=AgentTypeEnum.manual_agent,
         )
 
         koza_app.write(association)
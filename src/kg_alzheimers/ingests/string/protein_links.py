@@ -1,66 +1,70 @@
-import uuid
 from typing import List
 
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import PairwiseGeneToGeneInteraction, KnowledgeLevelEnum, AgentTypeEnum
 
+from kg_alzheimers.utils.association_utils import association_factory
+from kg_alzheimers.utils.id_utils import edge_id
+
 from loguru import logger
 
-from string_utils import map_evidence_codes
+from string_utils import map_evidence_codes, seen_pairs
 
 koza_app = get_koza_app("string_protein_links")
-
-seen_rows = set([])
-
-
-def sorted_id_pair(row) -> str:
-    sorted([row['protein1'], row['protein2']])
-
-
-while (row := koza_app.get_row()) is not None and sorted_id_pair(row) not in seen_rows:
-
-    entrez_2_string = koza_app.get_map('entrez_2_string')
-
-    pid_a = row['protein1']
-    gene_ids_a = entrez_2_string[pid_a]['entrez']
-    if not gene_ids_a:
-        logger.debug(f"protein1 PID '{str(pid_a)}' has no Entrez mappings?")
-
-    pid_b = row['protein2']
-    gene_ids_b = entrez_2_string[pid_b]['entrez']
-    if not gene_ids_b:
-        logger.debug(f"protein2 PID '{str(pid_b)}' has no Entrez mappings?")
-
-    # Some proteins may not have gene Entrez ID mappings.
-    # Only process the record if both gene id's are found
-    if gene_ids_a and gene_ids_b:
-
-        entities = []
-
-        has_evidence: List[str] = map_evidence_codes(row)
-
-        for gid_a in gene_ids_a.split("|"):
-
-            for gid_b in gene_ids_b.split("|"):
-
-                gene_id_a = 'NCBIGene:' + gid_a
-
-                gene_id_b = 'NCBIGene:' + gid_b
-
-                association = PairwiseGeneToGeneInteraction(
-                    id="uuid:" + str(uuid.uuid1()),
-                    subject=gene_id_a,
-                    object=gene_id_b,
-                    predicate="biolink:interacts_with",
-                    # sanity check: set to 'None' if empty list
-                    has_evidence=has_evidence if has_evidence else None,
-                    aggregator_knowledge_source=["infores:monarchinitiative"],
-                    primary_knowledge_source="infores:string",
-                    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
-                    agent_type=AgentTypeEnum.not_provided,
-                )
-                seen_rows.add(sorted_id_pair(row))
-                entities.append(association)
-
-        koza_app.write(*entities)
+protein_interaction = association_factory(
+    PairwiseGeneToGeneInteraction,
+    predicate="biolink:interacts_with",
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:string",
+    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+    agent_type=AgentTypeEnum.not_provided,
+)
+entrez_2_string = koza_app.get_map('entrez_2_string')
+
+try:
+    while (row := koza_app.get_row()) is not None:
+
+        # STRING lists every interaction in both directions, only the first of the two is written
+        if seen_pairs.is_duplicate(koza_app, row['protein1'], row['protein2']):
+            continue
+
+        pid_a = row['protein1']
+        gene_ids_a = entrez_2_string[pid_a]['entrez']
+        if not gene_ids_a:
+            logger.debug(f"protein1 PID '{str(pid_a)}' has no Entrez mappings?")
+
+        pid_b = row['protein2']
+        gene_ids_b = entrez_2_string[pid_b]['entrez']
+        if not gene_ids_b:
+            logger.debug(f"protein2 PID '{str(pid_b)}' has no Entrez mappings?")
+
+        # Some proteins may not have gene Entrez ID mappings.
+        # Only process the record if both gene id's are found
+        if gene_ids_a and gene_ids_b:
+
+            entities = []
+
+            has_evidence: List[str] = map_evidence_codes(row)
+
+            for gid_a in gene_ids_a.split("|"):
+
+                for gid_b in gene_ids_b.split("|"):
+
+                    gene_id_a = 'NCBIGene:' + gid_a
+
+                    gene_id_b = 'NCBIGene:' + gid_b
+
+                    association = protein_interaction(
+                        id=edge_id(gene_id_a, "biolink:interacts_with", gene_id_b, "infores:string", has_evidence),
+                        subject=gene_id_a,
+                        object=gene_id_b,
+                        # sanity check: set to 'None' if empty list
+                        has_evidence=has_evidence if has_evidence else None,
+                    )
+                    entities.append(association)
+
+            koza_app.write(*entities)
+except StopIteration:
+    logger.info(f"Dropped {seen_pairs.dropped} duplicate reversed protein pairs")
+    raise
@@ -1,7 +1,7 @@
 ##########################################
 # STRING ingest utility functions
 ##########################################
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 #
 # Mapping of STRING evidence type score fields to evidence & conclusion codes (with definitions)
@@ -57,3 +57,47 @@ def map_evidence_codes(row: Dict) -> List[str]:
             eco_mappings.append(EVIDENCE_CODE_MAPPINGS[evidence_type])
 
     return eco_mappings
+
+
+class SymmetricPairFilter:
+    """
+    Remembers undirected protein pairs, so an A-B interaction and its B-A mirror are only written once.
+
+    Protein ids are interned to integers and each pair is kept as a single 64-bit key, with the
+    smaller id in the high 32 bits. STRING ids are prefixed with their taxon and every protein links
+    file covers one species, so the seen pairs are cleared whenever the taxon changes. That keeps
+    memory bounded by the largest species rather than growing across all the files.
+
+    Koza re-executes the transform module, so the filter lives here, in an imported module, and is
+    reset whenever it is used by a different KozaApp.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, owner: Optional[object] = None):
+        self.owner = owner
+        self.taxon: Optional[str] = None
+        self.ids: Dict[str, int] = {}
+        self.pairs = set()
+        self.dropped = 0
+
+    def is_duplicate(self, owner: object, protein_a: str, protein_b: str) -> bool:
+        if owner is not self.owner:
+            self.reset(owner)
+        taxon = protein_a.split(".", 1)[0]
+        if taxon != self.taxon:
+            self.taxon = taxon
+            self.ids.clear()
+            self.pairs.clear()
+        id_a = self.ids.setdefault(protein_a, len(self.ids))
+        id_b = self.ids.setdefault(protein_b, len(self.ids))
+        key = (id_a << 32) | id_b if id_a < id_b else (id_b << 32) | id_a
+        if key in self.pairs:
+            self.dropped += 1
+            return True
+        self.pairs.add(key)
+        return False
+
+
+seen_pairs = SymmetricPairFilter()
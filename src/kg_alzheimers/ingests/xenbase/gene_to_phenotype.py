@@ -1,5 +1,3 @@
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import (
@@ -10,6 +8,8 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
     AgentTypeEnum,
 )
 
+from kg_alzheimers.utils.id_utils import edge_id
+
 koza_app = get_koza_app("xenbase_gene_to_phenotype")
 
 while (row := koza_app.get_row()) is not None:
@@ -25,7 +25,7 @@ while (row := koza_app.get_row()) is not None:
 
     # relation = row["RELATION"].replace("_", ":"),
     association = GeneToPhenotypicFeatureAssociation(
-        id="uuid:" + str(uuid.uuid1()),
+        id=edge_id(gene.id, "biolink:has_phenotype", phenotype.id, "infores:xenbase", row["SOURCE"]),
         subject=gene.id,
         predicate="biolink:has_phenotype",
         object=phenotype.id,
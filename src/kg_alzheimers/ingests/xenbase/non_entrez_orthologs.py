@@ -2,12 +2,12 @@
 Ingest of Reference Genome Orthologs from Xenbase
 """
 
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import GeneToGeneHomologyAssociation, AgentTypeEnum, KnowledgeLevelEnum
 
+from kg_alzheimers.utils.id_utils import edge_id
+
 from loguru import logger
 
 koza_app = get_koza_app("xenbase_non_entrez_orthologs")
@@ -26,7 +26,7 @@ while (row := koza_app.get_row()) is not None:
         # Instantiate the instance of Gene-to-Gene Homology Associations for each ortholog
         if omim_id:
             association = GeneToGeneHomologyAssociation(
-                id=f"uuid:{str(uuid.uuid1())}",
+                id=edge_id(f"Xenbase:{gene_id}", predicate, f"OMIM:{omim_id}", "infores:xenbase"),
                 subject=f"Xenbase:{gene_id}",
                 predicate=predicate,
                 object=f"OMIM:{omim_id}",
@@ -41,7 +41,7 @@ while (row := koza_app.get_row()) is not None:
 
         if mgi_id:
             association = GeneToGeneHomologyAssociation(
-                id=f"uuid:{str(uuid.uuid1())}",
+                id=edge_id(f"Xenbase:{gene_id}", predicate, f"MGI:{mgi_id}", "infores:xenbase"),
                 subject=f"Xenbase:{gene_id}",
                 predicate=predicate,
                 object=f"MGI:{mgi_id}",
@@ -56,7 +56,7 @@ while (row := koza_app.get_row()) is not None:
 
         if zfin_id:
             association = GeneToGeneHomologyAssociation(
-                id=f"uuid:{str(uuid.uuid1())}",
+                id=edge_id(f"Xenbase:{gene_id}", predicate, f"ZFIN:{zfin_id}", "infores:xenbase"),
                 subject=f"Xenbase:{gene_id}",
                 predicate=predicate,
                 object=f"ZFIN:{zfin_id}",
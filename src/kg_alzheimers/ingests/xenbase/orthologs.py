@@ -2,12 +2,12 @@
 Ingest of Reference Genome Orthologs from Xenbase
 """
 
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import GeneToGeneHomologyAssociation, AgentTypeEnum, KnowledgeLevelEnum
 
+from kg_alzheimers.utils.id_utils import edge_id
+
 from loguru import logger
 
 koza_app = get_koza_app("xenbase_orthologs")
@@ -30,7 +30,7 @@ while (row := koza_app.get_row()) is not None:
         for gene_id in gene_ids:
             # Instantiate the instance of Gene-to-Gene Homology Association
             association = GeneToGeneHomologyAssociation(
-                id=f"uuid:{str(uuid.uuid1())}",
+                id=edge_id(f"Xenbase:{gene_id}", predicate, f"NCBIGene:{ortholog_id}", "infores:xenbase"),
                 subject=f"Xenbase:{gene_id}",
                 predicate=predicate,
                 object=f"NCBIGene:{ortholog_id}",
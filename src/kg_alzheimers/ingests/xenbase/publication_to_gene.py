@@ -1,5 +1,3 @@
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import (
@@ -8,12 +6,23 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
     KnowledgeLevelEnum,
 )
 
+from kg_alzheimers.utils.association_utils import association_factory
+from kg_alzheimers.utils.id_utils import edge_id
+
 from loguru import logger
 
 koza_app = get_koza_app("xenbase_publication_to_gene")
+publication_to_gene = association_factory(
+    InformationContentEntityToNamedThingAssociation,
+    predicate="biolink:mentions",
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:xenbase",
+    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+    agent_type=AgentTypeEnum.manual_agent,
+)
+genepage2gene = koza_app.get_map("genepage-2-gene")
 
 while (row := koza_app.get_row()) is not None:
-    genepage2gene = koza_app.get_map("genepage-2-gene")
 
     entities = []
 
@@ -32,15 +41,10 @@ while (row := koza_app.get_row()) is not None:
 
         for gene_id in gene_ids:
 
-            association = InformationContentEntityToNamedThingAssociation(
-                id="uuid:" + str(uuid.uuid1()),
+            association = publication_to_gene(
+                id=edge_id(gene_id, "biolink:mentions", publication_id, "infores:xenbase"),
                 subject=gene_id,
-                predicate="biolink:mentions",
                 object=publication_id,
-                aggregator_knowledge_source=["infores:monarchinitiative"],
-                primary_knowledge_source="infores:xenbase",
-                knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
-                agent_type=AgentTypeEnum.manual_agent,
             )
 
             entities.append(association)
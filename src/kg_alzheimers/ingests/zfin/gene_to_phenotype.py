@@ -1,5 +1,3 @@
-import uuid
-
 from koza.cli_utils import get_koza_app
 
 from biolink_model.datamodel.pydanticmodel_v2 import (
@@ -8,12 +6,14 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
     AgentTypeEnum,
 )
 
+from kg_alzheimers.utils.id_utils import edge_id
+
 from loguru import logger
 
 koza_app = get_koza_app("zfin_gene_to_phenotype")
+eqe2zp = koza_app.get_map("eqe2zp")
 
 while (row := koza_app.get_row()) is not None:
-    eqe2zp = koza_app.get_map("eqe2zp")
 
     if row["Phenotype Tag"] == "abnormal":
         zp_key_elements = [
@@ -37,7 +37,7 @@ while (row := koza_app.get_row()) is not None:
             gene_id = "ZFIN:" + row["Gene ID"]
 
             association = GeneToPhenotypicFeatureAssociation(
-                id="uuid:" + str(uuid.uuid1()),
+                id=edge_id(gene_id, "biolink:has_phenotype", zp_term, "infores:zfin", row["Publication ID"]),
                 subject=gene_id,
                 predicate="biolink:has_phenotype",
                 object=zp_term,
@@ -2,25 +2,11 @@ import sys
 from typing import List, Optional
 
 import yaml
-from kghub_downloader.download_utils import download_from_yaml
-from kg_alzheimers.cli_utils import (
-    apply_closure,
-    do_prepare_release,
-    export_tsv,
-    create_qc_reports,
-    get_data_versions,
-    get_pkg_versions,
-    load_jsonl,
-    load_sqlite,
-    load_solr,
-    merge_files,
-    transform_one,
-    transform_phenio,
-    transform_all,
-)
-
 import typer
 
+# commands import what they need when they run, see cli_utils
+from kg_alzheimers.utils.id_utils import DEFAULT_ID_STRATEGY
+
 typer_app = typer.Typer()
 
 OUTPUT_DIR = "output"
@@ -40,17 +26,17 @@ def download(
     ingests: Optional[List[str]] = typer.Option(None, help="Which ingests to download data for"),
     all: bool = typer.Option(False, help="Download all ingest datasets"),
     write_metadata: bool = typer.Option(False, help="Write versions of ingests to metadata.yaml"),
+    workers: int = typer.Option(8, "--workers", "-w", help="Number of files to download at once"),
+    force: bool = typer.Option(False, "--force", "-f", help="Download files again even if they haven't changed"),
 ):
-    """Downloads data defined in download.yaml"""
-    if ingests:
-        download_from_yaml(
-            yaml_file="src/kg_alzheimers/download.yaml",
-            output_dir=".",
-            tags=ingests,
-        )
-    elif all:
-        download_from_yaml(yaml_file="src/kg_alzheimers/download.yaml", output_dir=".")
+    """Downloads data defined in download.yaml, skipping files that haven't changed upstream"""
+    from kg_alzheimers.utils.download_utils import download_from_yaml
+
+    if ingests or all:
+        download_from_yaml(output_dir=".", tags=ingests or None, workers=workers, force=force)
     if write_metadata:
+        from kg_alzheimers.cli_utils import get_data_versions
+
         get_data_versions(output_dir="data")
 
 
@@ -62,7 +48,7 @@ def transform(
     phenio: bool = typer.Option(False, help="Run the phenio transform"),
     all: bool = typer.Option(False, "--all", "-a", help="Ingest all sources"),
     force: bool = typer.Option(
-        False, "--force", "-f", help="Force ingest, even if output exists (on by default for single ingests)"
+        False, "--force", "-f", help="Force ingest, even if output is up to date (on by default for single ingests)"
     ),
     rdf: bool = typer.Option(False, help="Output rdf files along with tsv"),
     verbose: Optional[bool] = typer.Option(
@@ -74,11 +60,48 @@ def transform(
     log: bool = typer.Option(False, "--log", "-l", help="Write DEBUG level logs to ./logs/ for each ingest"),
     row_limit: int = typer.Option(None, "--row-limit", "-n", help="Number of rows to process"),
     write_metadata: bool = typer.Option(False, help="Write data/package versions to output_dir/metadata.yaml"),
-    # parallel: int = typer.Option(None, "--parallel", "-p", help="Utilize Dask to perform multiple ingests in parallel"),
+    parallel: int = typer.Option(
+        None, "--parallel", "-p", help="Run up to N ingests in parallel worker processes (with --all)"
+    ),
+    plan: bool = typer.Option(False, "--plan", help="Print the schedule and estimated makespan for --all, then exit"),
+    engine: str = typer.Option(
+        "koza", "--engine", help="Use 'columnar' to run ingests that have a columnar engine without Koza"
+    ),
+    ids: str = typer.Option(
+        DEFAULT_ID_STRATEGY,
+        "--ids",
+        help="Edge ids: 'uuid1', 'counter' or 'hash' (stable, but identical rows share an id and are dropped at merge)",
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Profile each ingest, writing flamegraph stacks and a summary to output_dir/profile"
+    ),
+    output_format: str = typer.Option(
+        "tsv", "--format", help="Use 'parquet' to write transform_output as Parquet, with lists for multivalued slots"
+    ),
 ):
     """Run Koza transformation on specified Monarch ingests"""
+    from kg_alzheimers.cli_utils import (
+        get_pkg_versions,
+        plan_transforms,
+        transform_all,
+        transform_one,
+        transform_phenio,
+    )
+
+    if plan:
+        plan_transforms(
+            output_dir=output_dir,
+            force=force,
+            parallel=parallel,
+            output_format=output_format,
+            row_limit=row_limit,
+            engine=engine,
+        )
+        return
     if phenio:
-        transform_phenio(output_dir=output_dir, force=force, verbose=verbose)
+        transform_phenio(
+            output_dir=output_dir, force=force, verbose=verbose, profile=profile, output_format=output_format
+        )
     elif ingest:
         transform_one(
             ingest=ingest,
@@ -88,6 +111,10 @@ def transform(
             force=True if force is None else force,
             verbose=verbose,
             log=log,
+            engine=engine,
+            id_strategy=ids,
+            profile=profile,
+            output_format=output_format,
         )
     elif all:
         transform_all(
@@ -97,6 +124,11 @@ def transform(
             force=force,
             verbose=verbose,
             log=log,
+            parallel=parallel,
+            engine=engine,
+            id_strategy=ids,
+            profile=profile,
+            output_format=output_format,
         )
     if write_metadata:
         get_pkg_versions(output_dir=output_dir)
@@ -112,9 +144,17 @@ def merge(
     verbose: Optional[bool] = typer.Option(
         None, "--debug/--quiet", "-d/-q", help="Use --quiet to suppress log output, --debug for verbose"
     ),
+    engine: str = typer.Option(
+        "duckdb", "--engine", help="Use 'cat_merge' to merge TSV output in memory with cat-merge"
+    ),
+    memory_limit: str = typer.Option(
+        None, "--memory-limit", help="Memory the DuckDB merge may use before spilling to disk, e.g. 16GB (default 8GB)"
+    ),
 ):
     """Merge nodes and edges into kg"""
-    merge_files(input_dir=input_dir, output_dir=output_dir, verbose=verbose)
+    from kg_alzheimers.cli_utils import merge_files
+
+    merge_files(input_dir=input_dir, output_dir=output_dir, verbose=verbose, engine=engine, memory_limit=memory_limit)
 
     # load qc_report.yaml from output_dir
     qc_report = yaml.safe_load(open(f"{output_dir}/qc_report.yaml"))
@@ -142,47 +182,81 @@ def merge(
 
 @typer_app.command()
 def closure():
+    from kg_alzheimers.cli_utils import apply_closure
+
     apply_closure()
 
 
 @typer_app.command()
 def jsonl():
+    from kg_alzheimers.cli_utils import load_jsonl
+
     load_jsonl()
 
 
 @typer_app.command()
 def sqlite():
+    from kg_alzheimers.cli_utils import load_sqlite
+
     load_sqlite()
 
 
 @typer_app.command()
 def solr():
+    from kg_alzheimers.cli_utils import load_solr
+
     load_solr()
 
 
 @typer_app.command()
 def export():
+    from kg_alzheimers.cli_utils import export_tsv
+
     export_tsv()
 
+
 @typer_app.command()
 def report():
     """Run Koza QC on specified Monarch ingests"""
+    from kg_alzheimers.cli_utils import create_qc_reports
+
     create_qc_reports()
 
+
 @typer_app.command()
 def prepare_release():
+    from kg_alzheimers.cli_utils import do_prepare_release
+
     do_prepare_release()
 
 
 @typer_app.command()
-def release(
-    dir: str = typer.Option(f"{OUTPUT_DIR}", help="Directory with kg to be released")
-):
+def release(dir: str = typer.Option(f"{OUTPUT_DIR}", help="Directory with kg to be released")):
     """Copy data to Monarch GCP data buckets"""
     print("The release command functionality has been moved to the Jenkinsfile.")
     print("This command is deprecated and will be removed in a future version.")
 
 
+metrics_app = typer.Typer(help="Throughput metrics written by each ingest run to output/metrics")
+typer_app.add_typer(metrics_app, name="metrics")
+
+
+@metrics_app.command("compare")
+def metrics_compare(
+    baseline: str = typer.Argument(..., help="Metrics directory or file of the baseline run"),
+    current: str = typer.Argument(..., help="Metrics directory or file of the run to compare"),
+    threshold: float = typer.Option(0.1, help="Relative change in a metric that counts as a regression"),
+):
+    """Compare the metrics of two runs, exits with 1 if any ingest regressed"""
+    from kg_alzheimers.utils.metrics_utils import compare_metrics, format_comparison, load_metrics
+
+    before, after = load_metrics(baseline), load_metrics(current)
+    rows = compare_metrics(before, after, threshold=threshold)
+    print(format_comparison(rows, before, after))
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
 #######################################################
 
 if __name__ == "__main__":
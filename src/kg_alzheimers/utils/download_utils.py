@@ -0,0 +1,346 @@
+"""
+Parallel, resumable downloads of the files in download.yaml
+
+kghub_downloader fetches download.yaml's urls one at a time, and either skips a file that already exists or fetches
+it again. download_resources runs a bounded number of transfers at once, with fewer per host, and keeps a sidecar
+(.<name>.download.json) next to each file, or in a separate state directory, with the ETag, Last-Modified, size,
+sha256 and line count of what it downloaded:
+
+- a file that was downloaded before costs one conditional HEAD request, and is only fetched again if it changed
+  upstream or the local copy no longer matches its sidecar
+- a transfer is written to <name>.part, and an interrupted one is resumed with a range request, as long as the
+  server's validators show the file hasn't changed since
+- the size of every download is checked against the server's, and its sha256 against the entry's sha256 in
+  download.yaml if it has one, before the file is moved into place
+
+fetch_pass_through fetches the files of the pass-through `url` ingests in ingests.yaml the same way.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+import yaml
+from loguru import logger
+
+from kg_alzheimers.utils.manifest_utils import hash_file
+
+DOWNLOAD_YAML = "src/kg_alzheimers/download.yaml"
+DOWNLOAD_CONCURRENCY = 8
+PER_HOST_CONCURRENCY = 4
+RETRIES = 3
+TIMEOUT = 60
+CHUNK_SIZE = 1024 * 1024
+# ask for the bytes as stored, a range of a content-encoded response can't be appended to a partial file
+HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Encoding": "identity"}
+
+_sessions = threading.local()
+
+
+def load_resources(yaml_file: str = DOWNLOAD_YAML, tags: Optional[List[str]] = None) -> List[Dict]:
+    """The entries of a download.yaml, limited to the given tags, with local_name defaulting to the url's file name"""
+    with open(yaml_file, "r") as fh:
+        entries = yaml.safe_load(fh)
+    resources = []
+    for entry in entries:
+        if tags and entry.get("tag") not in tags:
+            continue
+        url = expand_url(entry["url"])
+        resources.append({**entry, "url": url, "local_name": entry.get("local_name") or url.split("/")[-1]})
+    return resources
+
+
+def expand_url(url: str) -> str:
+    """Fill in {VARIABLES} in a url from the environment, as kghub_downloader does"""
+    for name in re.findall(r"\{(.*?)\}", url):
+        if os.getenv(name) is None:
+            raise ValueError(f"Environment variable {name} is needed for {url}")
+        url = url.replace(f"{{{name}}}", os.environ[name])
+    return url
+
+
+def sidecar_path(path: Path, state_dir: Optional[str] = None) -> Path:
+    """Where a file's download metadata goes, next to it unless a state_dir is given"""
+    if state_dir:
+        return Path(state_dir) / f"{path.name}.download.json"
+    return path.with_name(f".{path.name}.download.json")
+
+
+def part_path(path: Path, state_dir: Optional[str] = None) -> Path:
+    if state_dir:
+        return Path(state_dir) / f"{path.name}.part"
+    return path.with_name(f"{path.name}.part")
+
+
+def read_sidecar(sidecar: Path) -> Dict:
+    try:
+        return json.loads(sidecar.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_sidecar(sidecar: Path, metadata: Dict):
+    tmp_file = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.{threading.get_ident()}")
+    tmp_file.write_text(json.dumps(metadata, indent=2))
+    tmp_file.replace(sidecar)
+
+
+def validators(headers) -> Dict:
+    """The ETag, Last-Modified and size a response gives for the file"""
+    size = headers.get("Content-Length")
+    content_range = headers.get("Content-Range", "")
+    if "/" in content_range and not content_range.endswith("/*"):
+        size = content_range.rsplit("/", 1)[1]
+    return {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "size": int(size) if size is not None else None,
+    }
+
+
+def unchanged(recorded: Dict, remote: Dict) -> bool:
+    """Whether the server's validators show the same file as recorded, False if it gives none to compare"""
+    if recorded.get("etag") and remote.get("etag"):
+        return recorded["etag"] == remote["etag"]
+    if recorded.get("last_modified") and remote.get("last_modified"):
+        return recorded["last_modified"] == remote["last_modified"] and (
+            remote.get("size") is None or recorded.get("size") == remote["size"]
+        )
+    return False
+
+
+def is_intact(path: Path, metadata: Dict) -> bool:
+    """Whether the local file is the one its sidecar describes, only rehashing it if its size or mtime changed"""
+    if not metadata.get("sha256") or not path.is_file():
+        return False
+    stat = path.stat()
+    if stat.st_size != metadata.get("size"):
+        return False
+    if stat.st_mtime_ns == metadata.get("mtime_ns"):
+        return True
+    return hash_file(path) == metadata["sha256"]
+
+
+def _if_range(remote: Dict) -> Optional[str]:
+    # weak etags can't be used to resume a transfer
+    if remote.get("etag") and not remote["etag"].startswith("W/"):
+        return remote["etag"]
+    return remote.get("last_modified")
+
+
+def _session() -> requests.Session:
+    if not hasattr(_sessions, "session"):
+        _sessions.session = requests.Session()
+        _sessions.session.headers.update(HEADERS)
+    return _sessions.session
+
+
+def _count_lines(chunk: bytes, counts: Dict):
+    counts["newlines"] += chunk.count(b"\n")
+    counts["last"] = chunk[-1:] or counts["last"]
+
+
+def _transfer(url: str, part: Path, remote: Dict, resumable: bool, conditional: Dict) -> Optional[Dict]:
+    """Download url to a .part file, resuming it if resumable, None if the server says it's unchanged"""
+    offset = part.stat().st_size if resumable and part.is_file() else 0
+    headers = dict(conditional)
+    if offset:
+        headers.update({"Range": f"bytes={offset}-", "If-Range": _if_range(remote)})
+
+    with _session().get(url, headers=headers, stream=True, timeout=TIMEOUT, allow_redirects=True) as response:
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        if response.status_code != 206:
+            offset = 0
+        remote = {key: value or remote.get(key) for key, value in validators(response.headers).items()}
+
+        sha256 = hashlib.sha256()
+        counts = {"newlines": 0, "last": b""}
+        if offset:
+            with open(part, "rb") as fh:
+                for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+                    sha256.update(chunk)
+                    _count_lines(chunk, counts)
+        size = offset
+        with open(part, "ab" if offset else "wb") as fh:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                fh.write(chunk)
+                sha256.update(chunk)
+                _count_lines(chunk, counts)
+                size += len(chunk)
+
+    if remote.get("size") is not None and size != remote["size"]:
+        raise IOError(f"incomplete download of {url}: {size} of {remote['size']} bytes")
+    lines = counts["newlines"] + (1 if counts["last"] not in (b"", b"\n") else 0)
+    return {**remote, "size": size, "sha256": sha256.hexdigest(), "lines": lines, "resumed_from": offset}
+
+
+def download_resource(
+    resource: Dict, output_dir: str = ".", force: bool = False, state_dir: Optional[str] = None
+) -> Dict:
+    """Bring one download.yaml entry up to date, returning its status: unchanged, downloaded, resumed or failed
+
+    The result also has the number of lines in the file, counted while it was downloaded.
+    """
+    url = resource["url"]
+    path = Path(output_dir) / resource["local_name"]
+    sidecar = sidecar_path(path, state_dir)
+    part = part_path(path, state_dir)
+    result = {"name": resource["local_name"], "url": url, "status": "failed", "bytes": 0, "lines": None, "error": None}
+    start = time.perf_counter()
+    try:
+        if urlparse(url).scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme for {url}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        recorded = read_sidecar(sidecar)
+        current = not force and is_intact(path, recorded)
+        conditional = {}
+        if current and recorded.get("etag"):
+            conditional["If-None-Match"] = recorded["etag"]
+        if current and recorded.get("last_modified"):
+            conditional["If-Modified-Since"] = recorded["last_modified"]
+
+        head = _session().head(url, headers=conditional, timeout=TIMEOUT, allow_redirects=True)
+        if head.status_code in (405, 501):
+            # no HEAD support, let the GET be conditional instead
+            remote = {}
+        elif head.status_code == 304:
+            result.update(status="unchanged", lines=recorded.get("lines"))
+            return result
+        else:
+            head.raise_for_status()
+            remote = validators(head.headers)
+            if current and unchanged(recorded, remote):
+                result.update(status="unchanged", lines=recorded.get("lines"))
+                return result
+
+        partial = recorded.get("partial") or {}
+        resumable = bool(remote) and _if_range(remote) is not None and unchanged(partial, remote)
+        write_sidecar(sidecar, {**recorded, "url": url, "partial": remote})
+
+        for attempt in range(1, RETRIES + 1):
+            try:
+                downloaded = _transfer(url, part, remote, resumable, conditional if not remote else {})
+                break
+            except (requests.HTTPError, ValueError):
+                raise
+            except IOError as e:
+                # connection errors and incomplete transfers, the next attempt resumes where this one stopped
+                if attempt == RETRIES:
+                    raise
+                logger.warning(f"Retrying {url} after: {e}")
+                resumable = bool(remote) and _if_range(remote) is not None
+        if downloaded is None:
+            result.update(status="unchanged", lines=recorded.get("lines"))
+            return result
+
+        expected = resource.get("sha256")
+        if expected and downloaded["sha256"] != expected:
+            part.unlink()
+            raise ValueError(f"sha256 mismatch for {url}: expected {expected}, got {downloaded['sha256']}")
+        part.replace(path)
+        write_sidecar(
+            sidecar,
+            {
+                "url": url,
+                "etag": downloaded["etag"],
+                "last_modified": downloaded["last_modified"],
+                "size": downloaded["size"],
+                "sha256": downloaded["sha256"],
+                "lines": downloaded["lines"],
+                "mtime_ns": path.stat().st_mtime_ns,
+            },
+        )
+        result["status"] = "resumed" if downloaded["resumed_from"] else "downloaded"
+        result["bytes"] = downloaded["size"] - downloaded["resumed_from"]
+        result["lines"] = downloaded["lines"]
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        logger.error(f"Failed to download {url}: {result['error']}")
+    finally:
+        result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def download_resources(
+    resources: List[Dict],
+    output_dir: str = ".",
+    workers: int = DOWNLOAD_CONCURRENCY,
+    per_host: int = PER_HOST_CONCURRENCY,
+    force: bool = False,
+    state_dir: Optional[str] = None,
+) -> List[Dict]:
+    """Download resources with up to workers transfers at once, and at most per_host to any one host"""
+    hosts = {urlparse(resource["url"]).netloc for resource in resources}
+    host_slots = {host: threading.Semaphore(per_host) for host in hosts}
+
+    def _download(resource: Dict) -> Dict:
+        with host_slots[urlparse(resource["url"]).netloc]:
+            result = download_resource(resource, output_dir=output_dir, force=force, state_dir=state_dir)
+        logger.info(f"{result['status']}: {result['name']}")
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(_download, resources))
+
+
+def format_download_summary(results: List[Dict], seconds: float) -> str:
+    counts = {status: 0 for status in ["downloaded", "resumed", "unchanged", "failed"]}
+    for result in results:
+        counts[result["status"]] += 1
+    mb = sum(result["bytes"] for result in results) / 1024 / 1024
+    lines = [f"Downloaded {mb:.1f} MB in {seconds:.1f}s"]
+    lines.extend(f"    {status + ':':12} {count}" for status, count in counts.items())
+    lines.extend(f"{result['name']}: {result['error']}" for result in results if result["status"] == "failed")
+    return "\n".join(lines)
+
+
+def download_from_yaml(
+    yaml_file: str = DOWNLOAD_YAML,
+    output_dir: str = ".",
+    tags: Optional[List[str]] = None,
+    workers: int = DOWNLOAD_CONCURRENCY,
+    force: bool = False,
+) -> List[Dict]:
+    start = time.perf_counter()
+    results = download_resources(load_resources(yaml_file, tags), output_dir=output_dir, workers=workers, force=force)
+    print(format_download_summary(results, time.perf_counter() - start))
+    return results
+
+
+def fetch_pass_through(ingest: str, urls: List[str], output_dir: str, force: bool = False) -> Dict[str, int]:
+    """Fetch a pass-through ingest's files into transform_output, returning the number of rows in each
+
+    The download state goes in output_dir/downloads rather than next to the files, since the merge picks up every
+    file in transform_output with _nodes or _edges in its name. The row counts are also written to
+    output_dir/qc/<ingest>_rows.yaml.
+    """
+    results = download_resources(
+        [{"url": url, "local_name": url.split("/")[-1]} for url in urls],
+        output_dir=f"{output_dir}/transform_output",
+        workers=len(urls),
+        force=force,
+        state_dir=f"{output_dir}/downloads",
+    )
+    failed = [result for result in results if result["status"] == "failed"]
+    if failed:
+        errors = ", ".join(f"{result['url']} ({result['error']})" for result in failed)
+        raise ValueError(f"Failed to download {errors}")
+
+    # every file has a header line
+    rows = {result["name"]: max(result["lines"] - 1, 0) for result in results if result["lines"] is not None}
+    qc_dir = Path(output_dir) / "qc"
+    qc_dir.mkdir(parents=True, exist_ok=True)
+    with open(qc_dir / f"{ingest}_rows.yaml", "w") as fh:
+        yaml.safe_dump(rows, fh)
+    return rows
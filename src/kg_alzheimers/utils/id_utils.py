@@ -0,0 +1,102 @@
+"""
+Edge identifiers
+
+Ingests get their edge ids from edge_id instead of calling uuid.uuid1 themselves. The strategy is chosen per run:
+
+- uuid1: a time-based uuid for each edge, as ingests have always done. The default.
+- counter: a random per-process prefix followed by a counter, unique within a release and very cheap.
+- hash: the md5 digest of the edge's subject, predicate, object, primary knowledge source and any other
+  distinguishing values, formatted as a uuid. Ids are stable across runs, so releases can be diffed directly,
+  but source rows that agree on all of those values get the same id, and the merge drops every edge with a
+  duplicated id. Only use it where that's acceptable.
+
+The columnar engines build the same hash ids in SQL through sql_edge_id.
+"""
+
+import hashlib
+import itertools
+import os
+import uuid
+from typing import Iterator, List, Optional
+
+ID_STRATEGIES = ["uuid1", "counter", "hash"]
+DEFAULT_ID_STRATEGY = "uuid1"
+
+_strategy = DEFAULT_ID_STRATEGY
+
+
+def _counter_prefix() -> str:
+    """The first 20 hex digits of a uuid, leaving 12 digits for a counter"""
+    random = uuid.uuid4().hex
+    return f"uuid:{random[:8]}-{random[8:12]}-{random[12:16]}-{random[16:20]}-"
+
+
+_prefix = _counter_prefix()
+_counter: Iterator[int] = itertools.count()
+
+
+def _reseed():
+    """Start the counter ids over with a new prefix"""
+    global _prefix, _counter
+    _prefix = _counter_prefix()
+    _counter = itertools.count()
+
+
+# forked --parallel workers would otherwise all count from the parent's prefix and give out the same ids
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed)
+
+
+def set_id_strategy(strategy: str):
+    global _strategy
+    if strategy not in ID_STRATEGIES:
+        raise ValueError(f"Unknown id strategy {strategy}, expected one of {', '.join(ID_STRATEGIES)}")
+    _strategy = strategy
+    _reseed()
+
+
+def get_id_strategy() -> str:
+    return _strategy
+
+
+def _key_part(part) -> str:
+    if part is None:
+        return ""
+    if isinstance(part, list):
+        return "|".join(part)
+    return str(part)
+
+
+def hash_id(*parts) -> str:
+    """The md5 digest of the tab separated parts formatted as a uuid
+
+    None is an empty string and lists are joined with |, like they are in the TSV output.
+    """
+    digest = hashlib.md5("\t".join(_key_part(part) for part in parts).encode()).hexdigest()
+    return f"uuid:{digest[:8]}-{digest[8:12]}-{digest[12:16]}-{digest[16:20]}-{digest[20:]}"
+
+
+def counter_id() -> str:
+    return f"{_prefix}{next(_counter):012x}"
+
+
+def edge_id(subject: str, predicate: str, object: str, source: Optional[str], *qualifiers) -> str:
+    """An id for an edge, the qualifiers distinguish edges that share a subject, predicate, object and source"""
+    if _strategy == "hash":
+        return hash_id(subject, predicate, object, source, *qualifiers)
+    if _strategy == "counter":
+        return counter_id()
+    return f"uuid:{uuid.uuid1()}"
+
+
+def sql_edge_id(parts: List[str]) -> str:
+    """A SQL expression for the edge id of each row, from SQL expressions for the values edge_id would hash
+
+    DuckDB has no uuid1, so the uuid1 strategy uses its random uuid() there.
+    """
+    if _strategy == "hash":
+        key = " || chr(9) || ".join(f"coalesce(({part})::VARCHAR, '')" for part in parts)
+        return f"'uuid:' || md5({key})::UUID::VARCHAR"
+    if _strategy == "counter":
+        return f"'{_counter_prefix()}' || lpad(lower(hex(row_number() OVER ())), 12, '0')"
+    return "'uuid:' || uuid()"
@@ -19,7 +19,7 @@ def file_exists(file):
     return Path(file).is_file() and os.stat(file).st_size > 1000
 
 
-def ingest_output_exists(source, output_dir):
+def ingest_output_exists(source, output_dir, output_format="tsv"):
     ingests = get_ingests()
 
     ingest_config = yaml.load(pkgutil.get_data("kg_alzheimers", ingests[source]["config"]), UniqueIncludeLoader)
@@ -27,8 +27,8 @@ def ingest_output_exists(source, output_dir):
     has_node_properties = "node_properties" in ingest_config
     has_edge_properties = "edge_properties" in ingest_config
 
-    nodes_file = f"{output_dir}/{ingest_config['name']}_nodes.tsv"
-    edges_file = f"{output_dir}/{ingest_config['name']}_edges.tsv"
+    nodes_file = f"{output_dir}/{ingest_config['name']}_nodes.{output_format}"
+    edges_file = f"{output_dir}/{ingest_config['name']}_edges.{output_format}"
 
     if has_node_properties and not file_exists(nodes_file):
         return False
@@ -0,0 +1,91 @@
+"""
+Streaming JSON reader for Koza sources
+
+Koza's JSONReader loads a whole json file with json.load before yielding the first row, and a Source
+builds the readers for all of its files up front. For the Alliance BGI, expression and phenotype files that
+means every file of an ingest is in memory at once. StreamingJSONReader yields the elements of the
+json_path array one at a time with ijson, so memory use is bounded by the largest record.
+"""
+
+from typing import IO, Any, Dict, Iterator, List, Optional, Union
+
+import ijson
+import koza.model.source
+from koza.io.reader.json_reader import JSONReader
+from koza.io.utils import check_data
+from loguru import logger
+
+_END = object()
+
+
+class StreamingJSONReader:
+    """A drop-in replacement for Koza's JSONReader that iterates over the json_path array incrementally"""
+
+    def __init__(
+        self,
+        io_str: IO[str],
+        json_path: List[str],
+        required_properties: Optional[List[str]] = None,
+        name: str = 'json file',
+        row_limit: Optional[int] = None,
+    ):
+        self.io_str = io_str
+        self.required_properties = required_properties
+        self.name = name
+        self._line_num = 0
+        self._line_limit = row_limit or None
+        # parse the underlying bytes, ijson would otherwise encode the decoded text back to utf-8
+        self._items = ijson.items(getattr(io_str, 'buffer', io_str), '.'.join(json_path + ['item']), use_float=True)
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        next_obj = _END
+        if self._line_num != self._line_limit:
+            next_obj = next(self._items, _END)
+        if next_obj is _END:
+            logger.info(f"Finished processing {self._line_num} rows for {self.name} from file {self.io_str.name}")
+            self.io_str.close()
+            raise StopIteration
+
+        self._line_num += 1
+
+        if self.required_properties:
+            properties = [check_data(next_obj, prop) for prop in self.required_properties]
+            if False in properties:
+                raise ValueError(
+                    f"Required properties defined for {self.name} are missing from {self.io_str.name}\n"
+                    f"Missing properties: {set(self.required_properties) - set(next_obj.keys())}\n"
+                    f"Row: {next_obj}"
+                )
+
+        return next_obj
+
+
+def json_reader(
+    io_str: IO[str],
+    required_properties: Optional[List[str]] = None,
+    json_path: Optional[List[Union[str, int]]] = None,
+    name: str = 'json file',
+    is_yaml: bool = False,
+    row_limit: Optional[int] = None,
+) -> Union[JSONReader, StreamingJSONReader]:
+    """Stream json files that iterate over an array under a json_path of keys, use Koza's reader for the rest"""
+    if is_yaml or not json_path or not all(isinstance(path, str) for path in json_path):
+        return JSONReader(
+            io_str,
+            required_properties=required_properties,
+            json_path=json_path,
+            name=name,
+            is_yaml=is_yaml,
+            row_limit=row_limit,
+        )
+    return StreamingJSONReader(
+        io_str, json_path, required_properties=required_properties, name=name, row_limit=row_limit
+    )
+
+
+def use_streaming_json_reader():
+    """Make Koza sources read json through json_reader"""
+    koza.model.source.JSONReader = json_reader
@@ -0,0 +1,235 @@
+"""
+Build manifest for incremental transforms
+
+After an ingest succeeds we record a content hash of everything its output depends on: the input files,
+the ingest yaml, its transform code, the package modules that code runs, the maps it loads, the translation table,
+the package versions and the settings of the run (row limit and engine).
+An ingest is up to date when its output exists and a fresh fingerprint matches the recorded one.
+Each ingest gets its own manifest file, so ingests running in parallel never write to the same file.
+"""
+
+import hashlib
+import json
+import re
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+from koza.io.yaml_loader import UniqueIncludeLoader
+
+from kg_alzheimers.columnar import COLUMNAR_INGESTS
+from kg_alzheimers.utils.id_utils import get_id_strategy
+from kg_alzheimers.utils.ingest_utils import get_ingests
+
+PACKAGE_DIR = Path(__file__).parent.parent
+PHENIO_TAR = "data/monarch/kg-phenio.tar.gz"
+# the phenio transform has no Koza ingest, it runs columnar/phenio.py with the Biolink sets from schema_utils
+PHENIO_MODULES = ["kg_alzheimers.columnar.phenio", "kg_alzheimers.utils.schema_utils"]
+VERSIONED_PACKAGES = ["kg-alzheimers", "koza", "biolink-model"]
+HASH_CHUNK_SIZE = 1024 * 1024
+# the package modules transform_one runs a Koza ingest with, besides the ingest's own code
+KOZA_MODULES = [
+    "kg_alzheimers.utils.association_utils",
+    "kg_alzheimers.utils.json_utils",
+    "kg_alzheimers.utils.map_utils",
+    "kg_alzheimers.utils.metrics_utils",
+    "kg_alzheimers.utils.parquet_utils",
+]
+FROM_IMPORT = re.compile(
+    r"^[ \t]*from[ \t]+(kg_alzheimers[\w.]*)[ \t]+import[ \t]+(?:\(([^)]*)\)|([\w \t,]+))", re.MULTILINE
+)
+IMPORT = re.compile(r"^[ \t]*import[ \t]+(kg_alzheimers[\w.]*)", re.MULTILINE)
+
+
+def manifest_path(name: str, output_dir: str) -> Path:
+    return Path(output_dir) / "manifest" / f"{name}.json"
+
+
+def package_versions() -> Dict[str, Optional[str]]:
+    versions = {}
+    for package in VERSIONED_PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def hash_file(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def module_file(module: str) -> Optional[Path]:
+    """The source file of a package module, None for names that aren't modules"""
+    path = PACKAGE_DIR.parent / module.replace(".", "/")
+    for candidate in [path.with_suffix(".py"), path / "__init__.py"]:
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def package_modules(modules: List[str]) -> List[str]:
+    """The files of package modules and of every package module they import, directly or not"""
+    files: List[str] = []
+    todo = [module_file(module) for module in modules]
+    while todo:
+        path = todo.pop()
+        if path is None or str(path) in files:
+            continue
+        files.append(str(path))
+        source = path.read_text()
+        imported = IMPORT.findall(source)
+        for package, parenthesized, names in FROM_IMPORT.findall(source):
+            # from kg_alzheimers.utils import id_utils imports a module too
+            imported.append(package)
+            imported.extend(
+                f"{package}.{name.split()[0]}" for name in (parenthesized or names).split(",") if name.strip()
+            )
+        for module in imported:
+            path = module_file(module)
+            if path is not None:
+                todo.append(path)
+    return sorted(files)
+
+
+PHENIO_INPUTS = [PHENIO_TAR] + package_modules(PHENIO_MODULES)
+
+
+def ingest_inputs(ingest: str, engine: str = "koza") -> List[str]:
+    """Every file an ingest's output depends on
+
+    That is the ingest yaml, the python modules next to it (the transform and its helpers), the package modules
+    the transform runs (the columnar engine's instead when engine is columnar and the ingest has one), the global
+    translation table, the data files, and for each map in depends_on its yaml, transform code and data files.
+    """
+    config_file = PACKAGE_DIR / get_ingests()[ingest]["config"]
+    with open(config_file, "r") as config_fh:
+        config = yaml.load(config_fh, Loader=UniqueIncludeLoader)
+
+    inputs = [str(config_file)]
+    inputs.extend(str(py) for py in sorted(config_file.parent.glob("*.py")))
+    if engine == "columnar" and ingest in COLUMNAR_INGESTS:
+        inputs.extend(package_modules([COLUMNAR_INGESTS[ingest]]))
+    else:
+        ingest_modules = [
+            ".".join(py.relative_to(PACKAGE_DIR.parent).with_suffix("").parts)
+            for py in sorted(config_file.parent.glob("*.py"))
+        ]
+        inputs.extend(package_modules(ingest_modules + KOZA_MODULES))
+    if config.get("transform_code"):
+        inputs.append(config["transform_code"])
+    if config.get("global_table"):
+        inputs.append(config["global_table"])
+    inputs.extend(config.get("files", []))
+    if config.get("file_archive"):
+        inputs.append(config["file_archive"])
+
+    for map_file in config.get("depends_on") or []:
+        with open(map_file, "r") as map_fh:
+            map_config = yaml.load(map_fh, Loader=UniqueIncludeLoader)
+        inputs.append(map_file)
+        map_code = map_config.get("transform_code") or str(Path(map_file).with_suffix(".py"))
+        if Path(map_code).is_file():
+            inputs.append(map_code)
+        inputs.extend(map_config.get("files", []))
+
+    return list(dict.fromkeys(inputs))
+
+
+def ingest_settings(ingest: str, row_limit: Optional[int] = None, engine: str = "koza") -> Dict:
+    """The settings of a run that change an ingest's output, a run with other settings is out of date"""
+    return {
+        "row_limit": row_limit,
+        "engine": "columnar" if engine == "columnar" and ingest in COLUMNAR_INGESTS else "koza",
+    }
+
+
+def fingerprint(inputs: List[str], previous: Optional[Dict] = None, settings: Optional[Dict] = None) -> Dict:
+    """Hash each input file, missing files are recorded with a null hash
+
+    Hashes from a previous fingerprint are reused for files whose size and modification time haven't changed,
+    so checking a large unchanged source doesn't mean reading it again.
+    """
+    previous_files = (previous or {}).get("inputs", {})
+    files = {}
+    for file in inputs:
+        path = Path(file)
+        if not path.is_file():
+            files[file] = {"sha256": None}
+            continue
+        stat = path.stat()
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        cached = previous_files.get(file, {})
+        if cached.get("size") == entry["size"] and cached.get("mtime_ns") == entry["mtime_ns"] and cached.get("sha256"):
+            entry["sha256"] = cached["sha256"]
+        else:
+            entry["sha256"] = hash_file(path)
+        files[file] = entry
+    # every edge id depends on the id strategy, so a run with another strategy is out of date too
+    return {
+        "versions": {**package_versions(), "id_strategy": get_id_strategy()},
+        "settings": settings or {},
+        "inputs": files,
+    }
+
+
+def load_manifest(name: str, output_dir: str) -> Optional[Dict]:
+    path = manifest_path(name, output_dir)
+    if not path.is_file():
+        return None
+    try:
+        with open(path, "r") as fh:
+            return json.load(fh)
+    except json.JSONDecodeError:
+        return None
+
+
+def _content(manifest: Dict) -> Dict:
+    return {
+        "versions": manifest.get("versions"),
+        "settings": manifest.get("settings"),
+        "inputs": {file: entry.get("sha256") for file, entry in manifest.get("inputs", {}).items()},
+    }
+
+
+def changed_inputs(name: str, inputs: List[str], output_dir: str, settings: Optional[Dict] = None) -> List[str]:
+    """Inputs whose content differs from the recorded manifest
+
+    ['<no manifest>'], ['<versions>'] or ['<settings>'] when there's no manifest, or it was recorded with other
+    package versions or run settings.
+    """
+    recorded = load_manifest(name, output_dir)
+    if recorded is None:
+        return ["<no manifest>"]
+    current = _content(fingerprint(inputs, previous=recorded, settings=settings))
+    recorded = _content(recorded)
+    if current["versions"] != recorded["versions"]:
+        return ["<versions>"]
+    if current["settings"] != recorded["settings"]:
+        return ["<settings>"]
+    return sorted(
+        file
+        for file in set(current["inputs"]) | set(recorded["inputs"])
+        if current["inputs"].get(file) != recorded["inputs"].get(file) or current["inputs"].get(file) is None
+    )
+
+
+def is_up_to_date(name: str, inputs: List[str], output_dir: str, settings: Optional[Dict] = None) -> bool:
+    return not changed_inputs(name, inputs, output_dir, settings)
+
+
+def record_manifest(name: str, inputs: List[str], output_dir: str, settings: Optional[Dict] = None) -> Dict:
+    """Write the fingerprint of an ingest's inputs after it has produced its output"""
+    manifest = fingerprint(inputs, previous=load_manifest(name, output_dir), settings=settings)
+    path = manifest_path(name, output_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    tmp_path.replace(path)
+    return manifest
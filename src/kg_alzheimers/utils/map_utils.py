@@ -0,0 +1,233 @@
+"""
+Compiled, memory-mapped Koza lookup maps
+
+Koza loads every map an ingest depends on into a dict of dicts, re-reading the map's source files on every run.
+compile_map reads a map once through Koza's own Source, so header, comment and filter handling are unchanged,
+and writes an on-disk index:
+
+- hashes.bin: the sorted 64-bit hashes of the keys
+- offsets.bin: where each key's record starts in data.bin, in the same order
+- data.bin: each record's key and values, separated by \\x1f
+
+A compiled map is stored under <cache_dir>/<map name>/<content hash>, where the content hash covers the map yaml
+and its source files, so it is rebuilt only when one of them changes. CompiledMap memory-maps the three files,
+so loading is instant, its pages are shared by every process that opens it, and only the pages that lookups
+touch are read in. Lookups binary search the hashes, which is slower than a dict but needs no memory per key.
+
+Maps with their own transform code are still loaded by Koza.
+
+Loaded maps are kept in a registry for the whole build, so a map that several ingests depend on is loaded
+once. `ingest transform --all --parallel` compiles each map in a task of its own, which the ingests that
+depend on the map wait for, and the ingest processes memory-map the compiled files.
+"""
+
+import dataclasses
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import yaml
+from koza.app import KozaApp
+from koza.io.yaml_loader import UniqueIncludeLoader
+from koza.model.config.source_config import MapFileConfig
+from koza.model.source import Source
+from koza.utils.exceptions import MapItemException
+from loguru import logger
+
+from kg_alzheimers.utils.manifest_utils import fingerprint
+from kg_alzheimers.utils.parallel_utils import current_rss_mb
+
+SEPARATOR = "\x1f"
+MAP_CACHE_DIR = "output/map_cache"
+
+_koza_load_map = KozaApp._load_map
+
+# every map loaded this build, by map name
+_registry: Dict[str, Dict] = {}
+
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def is_compilable(config: MapFileConfig) -> bool:
+    """Maps with transform code build their dict themselves, the rest are a key column and value columns"""
+    return bool(config.columns) and not (config.transform_code and Path(config.transform_code).is_file())
+
+
+def map_content_hash(config: MapFileConfig, cache_dir: Path) -> str:
+    """Hash the map's configuration and source files, reusing file hashes recorded at the previous compile"""
+    fingerprint_file = cache_dir / config.name / "fingerprint.json"
+    previous = json.loads(fingerprint_file.read_text()) if fingerprint_file.is_file() else None
+    current = fingerprint([str(file) for file in config.files], previous=previous)
+    fingerprint_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = fingerprint_file.with_name(f"fingerprint.json.{os.getpid()}")
+    tmp_file.write_text(json.dumps(current))
+    tmp_file.replace(fingerprint_file)
+
+    content = {
+        "config": {k: v for k, v in dataclasses.asdict(config).items() if k != "metadata"},
+        "files": {file: entry["sha256"] for file, entry in current["inputs"].items()},
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def compiled_map_path(config: MapFileConfig, cache_dir: str = MAP_CACHE_DIR) -> Path:
+    """The directory the map's current content is compiled into, it has a meta.json once it's compiled"""
+    return Path(cache_dir) / config.name / map_content_hash(config, Path(cache_dir))
+
+
+def compile_map(config: MapFileConfig, cache_dir: str = MAP_CACHE_DIR, source: Optional[Source] = None) -> Path:
+    """Compile a map into <cache_dir>/<name>/<content hash> unless it's already there, returns that directory"""
+    path = compiled_map_path(config, cache_dir)
+    if (path / "meta.json").is_file():
+        return path
+
+    value_columns = [column for column in config.columns if column in config.values]
+    records: Dict[str, str] = {}
+    # like Koza's map loader, the last row for a key wins
+    for row in source if source is not None else Source(config):
+        records[row[config.key]] = SEPARATOR.join([row[config.key]] + [row[column] for column in value_columns])
+
+    hashed = sorted((key_hash(key), record.encode()) for key, record in records.items())
+    hashes = array("Q", (h for h, _ in hashed))
+    data = [record for _, record in hashed]
+    offsets = array("Q", accumulate((len(record) for record in data), initial=0))
+
+    # build next to the final directory and rename it into place, parallel ingests may compile the same map
+    tmp_path = Path(tempfile.mkdtemp(prefix=f"{path.name}.", dir=path.parent))
+    for name, content in [("hashes.bin", [hashes.tobytes()]), ("offsets.bin", [offsets.tobytes()]), ("data.bin", data)]:
+        with open(tmp_path / name, "wb") as fh:
+            fh.writelines(content)
+    (tmp_path / "meta.json").write_text(json.dumps({"name": config.name, "columns": value_columns}))
+    try:
+        tmp_path.rename(path)
+    except OSError:
+        shutil.rmtree(tmp_path)
+    return path
+
+
+class CompiledMap(Mapping):
+    """A read-only map backed by a compiled map directory, values are dicts of the value columns like Koza's"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        meta = json.loads((self.path / "meta.json").read_text())
+        self.name = meta["name"]
+        self.columns: List[str] = meta["columns"]
+        self.hashes = self._map("hashes.bin").cast("Q")
+        self.offsets = self._map("offsets.bin").cast("Q")
+        self.data = self._map("data.bin")
+
+    def _map(self, name: str) -> memoryview:
+        with open(self.path / name, "rb") as fh:
+            # mmap can't map an empty file
+            if os.fstat(fh.fileno()).st_size == 0:
+                return memoryview(b"")
+            return memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _record(self, i: int) -> List[str]:
+        return bytes(self.data[self.offsets[i] : self.offsets[i + 1]]).decode().split(SEPARATOR)
+
+    def __getitem__(self, key: str) -> Dict[str, str]:
+        if isinstance(key, str):
+            h = key_hash(key)
+            i = bisect_left(self.hashes, h)
+            while i < len(self.hashes) and self.hashes[i] == h:
+                record = self._record(i)
+                if record[0] == key:
+                    return dict(zip(self.columns, record[1:]))
+                i += 1
+        raise MapItemException(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self.hashes)):
+            yield self._record(i)[0]
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def size_mb(self) -> float:
+        return sum(len(view) * view.itemsize for view in (self.hashes, self.offsets, self.data)) / (1024 * 1024)
+
+
+def map_config(map_file: str) -> MapFileConfig:
+    """The config Koza would build for a map yaml listed in an ingest's depends_on"""
+    with open(map_file, "r") as map_fh:
+        config = MapFileConfig(**yaml.load(map_fh, Loader=UniqueIncludeLoader))
+    config.transform_code = str(Path(map_file).parent / Path(map_file).stem) + ".py"
+    return config
+
+
+def registered_map(
+    map_file: Source, cache_dir: str = MAP_CACHE_DIR, user: Optional[str] = None, koza_app: Optional[KozaApp] = None
+) -> Mapping:
+    """Get a map from the build's map registry, loading it on first use
+
+    Compiled maps are memory-mapped and shared with forked worker processes through the page cache.
+    Maps with transform code are loaded by Koza, which needs the ingest's KozaApp to run that code.
+    """
+    name = map_file.config.name
+    if name not in _registry:
+        start = time.perf_counter()
+        if is_compilable(map_file.config):
+            loaded = CompiledMap(compile_map(map_file.config, cache_dir, map_file))
+            entry = {"map": loaded, "mb": loaded.size_mb(), "memory": "mapped"}
+        else:
+            rss = current_rss_mb()
+            _koza_load_map(koza_app, map_file)
+            entry = {"map": koza_app._map_cache[name], "mb": current_rss_mb() - rss, "memory": "heap"}
+        entry.update({"seconds": time.perf_counter() - start, "users": set()})
+        _registry[name] = entry
+    if user:
+        _registry[name]["users"].add(user)
+    return _registry[name]["map"]
+
+
+def preload_maps(map_files: Dict[str, List[str]], cache_dir: str = MAP_CACHE_DIR):
+    """Load the maps that ingests declare in depends_on, compiling them into cache_dir first where needed
+
+    map_files maps each ingest name to its depends_on list. Maps with transform code are left to the
+    ingests, and so are maps with missing source files, for the ingest to fail on.
+    """
+    for ingest, files in map_files.items():
+        for map_file in files:
+            config = map_config(map_file)
+            if not is_compilable(config):
+                continue
+            if not all(Path(file).is_file() for file in config.files):
+                logger.warning(f"Not preloading map {config.name} for {ingest}, its files are missing")
+                continue
+            registered_map(Source(config), cache_dir, user=ingest)
+
+
+def format_map_report() -> str:
+    lines = ["Maps loaded this build:"]
+    for name, entry in sorted(_registry.items()):
+        users = ", ".join(sorted(entry["users"])) or "-"
+        lines.append(f"  {name}: {entry['seconds']:.2f}s, {entry['mb']:.1f}MB {entry['memory']}, used by {users}")
+    return "\n".join(lines)
+
+
+def clear_map_registry():
+    _registry.clear()
+
+
+def _load_registered_map(koza_app: KozaApp, map_file: Source, cache_dir: str = MAP_CACHE_DIR):
+    user = koza_app.source.config.name if getattr(koza_app, "source", None) else None
+    koza_app._map_cache[map_file.config.name] = registered_map(map_file, cache_dir, user=user, koza_app=koza_app)
+
+
+def use_compiled_maps(cache_dir: str = MAP_CACHE_DIR):
+    """Make Koza get maps from the map registry, compiling them into cache_dir"""
+    KozaApp._load_map = lambda koza_app, map_file: _load_registered_map(koza_app, map_file, cache_dir)
@@ -0,0 +1,98 @@
+"""
+Compiled SSSOM mappings for the merge
+
+The merge maps edge subjects and objects from the object_id of an SSSOM mapping to its subject_id. compile_mappings
+reads the SSSOM files once into a single id -> canonical id table, a Parquet file of object_id, subject_id and the
+mapping's position in the files, which the merge joins the edges against. Keeping the position lets the merge repeat
+an edge for each mapping of its subject or object in the order cat_merge did.
+
+The table is stored as <cache_dir>/<content hash>.parquet, where the content hash covers the SSSOM files, so it is
+rebuilt only when one of them changes.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import List
+
+import duckdb
+import pyarrow
+import pyarrow.parquet as pq
+from loguru import logger
+
+from kg_alzheimers.utils.manifest_utils import fingerprint
+
+# the version of the compiled table, bump it when its columns change
+FORMAT_VERSION = 1
+
+
+def mappings_content_hash(mappings: List[str], cache_dir: Path) -> str:
+    """Hash the SSSOM files, reusing file hashes recorded at the previous compile"""
+    fingerprint_file = cache_dir / "fingerprint.json"
+    previous = json.loads(fingerprint_file.read_text()) if fingerprint_file.is_file() else None
+    current = fingerprint(mappings, previous=previous)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_file = fingerprint_file.with_name(f"fingerprint.json.{os.getpid()}")
+    tmp_file.write_text(json.dumps(current))
+    tmp_file.replace(fingerprint_file)
+
+    content = {
+        "format": FORMAT_VERSION,
+        "files": [[file, current["inputs"][file]["sha256"]] for file in mappings],
+    }
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()[:16]
+
+
+def _strip_comments(path: str, out: Path):
+    """The lines of an SSSOM file without its # comments, like pandas' comment='#'"""
+    with open(path, newline="\n") as fh, open(out, "w", newline="\n") as out_fh:
+        for line in fh:
+            line = line.split("#", 1)[0].rstrip("\n")
+            if line:
+                out_fh.write(line + "\n")
+
+
+def _read_mappings(path: str, scratch: Path) -> pyarrow.Table:
+    """The subject_id and object_id of an SSSOM file, every value a string and empty values null"""
+    stripped = scratch / "mappings.tsv"
+    _strip_comments(path, stripped)
+    con = duckdb.connect()
+    try:
+        # no quoting, like cat_merge's QUOTE_NONE
+        relation = con.read_csv(
+            str(stripped), sep="\t", header=True, quotechar="", escapechar="", all_varchar=True, null_padding=True
+        )
+        return relation.select("subject_id, object_id").arrow()
+    finally:
+        con.close()
+
+
+def compile_mappings(mappings: List[str], cache_dir: str) -> Path:
+    """Compile SSSOM files into <cache_dir>/<content hash>.parquet unless it's already there, returns that file"""
+    cache_dir = Path(cache_dir)
+    path = cache_dir / f"{mappings_content_hash(mappings, cache_dir)}.parquet"
+    if path.is_file():
+        logger.info(f"Using compiled mappings {path}")
+        return path
+
+    logger.info(f"Compiling {len(mappings)} SSSOM files into {path}")
+    with tempfile.TemporaryDirectory(dir=cache_dir, prefix=".compile-") as scratch:
+        table = pyarrow.concat_tables(_read_mappings(mapping, Path(scratch)) for mapping in mappings)
+        table = table.append_column("mapping", pyarrow.array(range(len(table)), pyarrow.int64()))
+        # a mapping without an object_id never matches an edge
+        table = table.filter(table.column("object_id").is_valid())
+        table = table.select(["object_id", "subject_id", "mapping"]).sort_by(
+            [("object_id", "ascending"), ("mapping", "ascending")]
+        )
+        # write next to the final file and rename it into place
+        tmp_path = Path(scratch) / path.name
+        pq.write_table(table, tmp_path, compression="zstd")
+        tmp_path.replace(path)
+    logger.info(f"Compiled {len(table)} mappings")
+
+    for stale in cache_dir.glob("*.parquet"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return path
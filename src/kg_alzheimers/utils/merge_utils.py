@@ -0,0 +1,394 @@
+"""
+DuckDB merge of the transform output into the KG
+
+Builds the same outputs cat_merge.merge did, without loading the graph into pandas:
+
+- {name}.tar.gz with {name}_nodes.tsv and {name}_edges.tsv
+- qc/{name}-duplicate-nodes.tsv.gz and qc/{name}-dangling-edges.tsv.gz
+- qc_report.yaml
+- qc/{name}-mapping-report.yaml, when there are mappings
+
+The node and edge files are loaded into a DuckDB database in a scratch directory under output_dir, with the union
+of their columns and a provided_by column from the file name. SSSOM mappings, compiled once into an id -> canonical
+id table by mapping_utils, are applied to edge subjects and objects with a hash join, and the ids they replaced are
+counted by prefix in qc/{name}-mapping-report.yaml. Nodes are deduplicated by id keeping the first, and edges with
+a duplicated id or a subject or object that isn't a node are dropped. DuckDB spills to the scratch directory past
+memory_limit, so the merge doesn't need the graph to fit in memory. The QC report is aggregated in SQL and only the
+summaries reach Python.
+
+Transform output written with --format parquet is read natively, its list columns joined with | as in the TSV.
+Files are read in name order, where cat_merge read them in directory listing order, so which duplicate node is kept
+no longer depends on the file system.
+"""
+
+import os
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import duckdb
+import pyarrow
+import pyarrow.parquet as pq
+import yaml
+from loguru import logger
+
+from kg_alzheimers.utils.mapping_utils import compile_mappings
+
+MEMORY_LIMIT = "8GB"
+# Koza writes some long lines, e.g. publications
+MAX_LINE_SIZE = 64 * 1024 * 1024
+
+
+def _identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _header(path: Path) -> List[str]:
+    if path.suffix == ".parquet":
+        return pq.read_schema(path).names
+    with open(path, newline="\n") as fh:
+        return fh.readline().rstrip("\n").split("\t")
+
+
+def _as_string(field: pyarrow.Field) -> str:
+    """A parquet column as the string TSVWriter would have written, lists joined with |, empty values as null"""
+    name = _identifier(field.name)
+    value = f"array_to_string({name}, '|')" if pyarrow.types.is_list(field.type) else f"CAST({name} AS VARCHAR)"
+    return f"nullif({value}, '') AS {name}"
+
+
+def _read(path: Path, columns: List[str]) -> str:
+    """A relation of a tsv or parquet file the way cat_merge read tsv: every column a string, empty values as null"""
+    if path.suffix == ".parquet":
+        select = ", ".join(_as_string(field) for field in pq.read_schema(path))
+        return f"(SELECT {select} FROM read_parquet({_literal(str(path))}))"
+    # no quoting, like cat_merge's QUOTE_NONE
+    types = "{" + ", ".join(f"{_literal(column)}: 'VARCHAR'" for column in columns) + "}"
+    return (
+        f"read_csv({_literal(str(path))}, delim='\\t', header=true, quote='', escape='', auto_detect=false, "
+        f"columns={types}, null_padding=true, max_line_size={MAX_LINE_SIZE})"
+    )
+
+
+def _load(con: duckdb.DuckDBPyConnection, table: str, files: List[Path]) -> List[str]:
+    """Concatenate files into table, with the union of their columns in order of appearance"""
+    headers = {path: _header(path) for path in files}
+    columns = []
+    for header in headers.values():
+        # provided_by replaces the file's own column, or comes after its columns
+        extra = ["provided_by"] if "provided_by" not in header else []
+        columns.extend(column for column in header + extra if column not in columns)
+    con.sql(f"CREATE TABLE {table} ({', '.join(f'{_identifier(column)} VARCHAR' for column in columns)})")
+    for path, header in headers.items():
+        select = [_identifier(column) for column in header if column != "provided_by"]
+        select.append(f"{_literal(path.stem)} AS provided_by")
+        con.sql(f"INSERT INTO {table} BY NAME SELECT {', '.join(select)} FROM {_read(path, header)}")
+    return columns
+
+
+def _copy(con: duckdb.DuckDBPyConnection, query: str, path: str):
+    """Write a query to a tsv like pandas' to_csv, gzipped if path ends with .gz"""
+    con.sql(f"COPY ({query}) TO {_literal(path)} (HEADER, DELIMITER '\\t')")
+
+
+def _sort_key(value):
+    # pandas sorts missing values last
+    return (value is None, value)
+
+
+def _distinct(con: duckdb.DuckDBPyConnection, query: str) -> Dict[tuple, List]:
+    """Sorted distinct values of the last column of query, by the values of the other columns"""
+    values: Dict[tuple, List] = {}
+    for row in con.sql(f"SELECT DISTINCT * FROM ({query})").fetchall():
+        values.setdefault(row[:-1], []).append(row[-1])
+    return {key: sorted(value, key=_sort_key) for key, value in values.items()}
+
+
+def _nodes_report(con: duckdb.DuckDBPyConnection, table: str, taxon: bool) -> List[Dict]:
+    groups = con.sql(
+        f"SELECT provided_by, count(*) FROM {table} WHERE provided_by IS NOT NULL GROUP BY ALL ORDER BY provided_by"
+    ).fetchall()
+    namespaces = _distinct(con, f"SELECT provided_by, split_part(id, ':', 1) FROM {table}")
+    categories = _distinct(con, f"SELECT provided_by, category FROM {table}")
+    taxa = _distinct(con, f"SELECT provided_by, in_taxon FROM {table}") if taxon else {}
+    report = []
+    for name, total in groups:
+        node_object = {
+            "name": name,
+            "namespaces": namespaces[(name,)],
+            "categories": categories[(name,)],
+            "total_number": total,
+        }
+        if taxon:
+            node_object["taxon"] = taxa[(name,)]
+        report.append(node_object)
+    return report
+
+
+def _edges_report(con: duckdb.DuckDBPyConnection, table: str, taxon: bool) -> List[Dict]:
+    """The edges of table by provided_by, against the (filled in) nodes in report_nodes"""
+    groups = con.sql(
+        f"SELECT provided_by, count(*) FROM {table} WHERE provided_by IS NOT NULL GROUP BY ALL ORDER BY provided_by"
+    ).fetchall()
+    if not groups:
+        return []
+    not_a_node = "NOT EXISTS (SELECT 1 FROM node_ids WHERE node_ids.id = {})"
+    con.sql(
+        f"""
+        CREATE OR REPLACE TEMP TABLE endpoints AS
+        SELECT provided_by, id, bool_or(is_subject) AS is_subject, bool_or(NOT is_subject) AS is_object
+        FROM (
+            SELECT provided_by, subject AS id, true AS is_subject FROM {table}
+            UNION ALL
+            SELECT provided_by, object AS id, false AS is_subject FROM {table}
+        )
+        GROUP BY ALL
+        """
+    )
+    namespaces = _distinct(con, "SELECT provided_by, split_part(id, ':', 1) FROM endpoints")
+    categories = _distinct(con, f"SELECT provided_by, category FROM {table}")
+    missing = dict(
+        con.sql(
+            f"SELECT provided_by, count(*) FROM endpoints WHERE {not_a_node.format('endpoints.id')} GROUP BY ALL"
+        ).fetchall()
+    )
+
+    predicates: Dict[str, List[Dict]] = {}
+    for name, predicate, total in con.sql(
+        f"SELECT provided_by, predicate, count(*) FROM {table} WHERE predicate IS NOT NULL "
+        "GROUP BY ALL ORDER BY provided_by, predicate"
+    ).fetchall():
+        predicates.setdefault(name, []).append({"uri": predicate, "total_number": total})
+    for role in ["subject", "object"]:
+        missing_ids = f"{table}.{role} IS NOT NULL AND {not_a_node.format(f'{table}.{role}')}"
+        counts = {
+            (name, predicate): count
+            for name, predicate, count in con.sql(
+                f"SELECT provided_by, predicate, count(DISTINCT {role}) FROM {table} WHERE {missing_ids} GROUP BY ALL"
+            ).fetchall()
+        }
+        role_namespaces = _distinct(
+            con, f"SELECT provided_by, predicate, split_part({role}, ':', 1) FROM {table} WHERE {missing_ids}"
+        )
+        for name, group_predicates in predicates.items():
+            for predicate_object in group_predicates:
+                key = (name, predicate_object["uri"])
+                predicate_object[f"missing_{role}s"] = counts.get(key, 0)
+                predicate_object[f"missing_{role}_namespaces"] = role_namespaces.get(key, [])
+
+    # the nodes that are a subject or object of each group's edges, by the nodes' provided_by
+    con.sql(
+        f"""
+        CREATE OR REPLACE TEMP TABLE endpoint_nodes AS
+        SELECT endpoints.provided_by AS edge_group, report_nodes.provided_by AS node_group, report_nodes.id,
+            report_nodes.category, {'report_nodes.in_taxon' if taxon else 'NULL'} AS in_taxon,
+            endpoints.is_subject, endpoints.is_object
+        FROM endpoints JOIN report_nodes ON report_nodes.id = endpoints.id
+        WHERE report_nodes.provided_by IS NOT NULL
+        """
+    )
+    node_types: Dict[str, List[Dict]] = {}
+    node_categories = _distinct(con, "SELECT edge_group, node_group, category FROM endpoint_nodes")
+    node_namespaces = _distinct(con, "SELECT edge_group, node_group, split_part(id, ':', 1) FROM endpoint_nodes")
+    node_taxa = _distinct(con, "SELECT edge_group, node_group, in_taxon FROM endpoint_nodes")
+    for edge_group, node_group, total, node_missing in con.sql(
+        """
+        SELECT edge_group, node_group, count(*),
+            count(*) FILTER (WHERE NOT is_subject) + count(*) FILTER (WHERE NOT is_object)
+        FROM endpoint_nodes GROUP BY ALL ORDER BY edge_group, node_group
+        """
+    ).fetchall():
+        key = (edge_group, node_group)
+        node_type_object = {
+            "name": node_group,
+            "categories": node_categories[key],
+            "namespaces": node_namespaces[key],
+            "total_number": total,
+            "missing": node_missing,
+        }
+        if taxon:
+            node_type_object["taxon"] = node_taxa[key]
+        node_types.setdefault(edge_group, []).append(node_type_object)
+
+    return [
+        {
+            "name": name,
+            "namespaces": namespaces[(name,)],
+            "categories": categories[(name,)],
+            "total_number": total,
+            "missing_old": missing.get(name, 0),
+            "missing": missing.get(name, 0),
+            "predicates": predicates.get(name, []),
+            "node_types": node_types.get(name, []),
+        }
+        for name, total in groups
+    ]
+
+
+def _apply_mappings(con: duckdb.DuckDBPyConnection, edge_columns: List[str], mappings: Path) -> List[str]:
+    """Map edge subjects and objects to the subject_id of the compiled mappings with their object_id
+
+    Like cat_merge, the original subject or object is kept in original_subject or original_object when it was
+    mapped, an edge is repeated for each mapping of its subject or object, and the mapped subject and object
+    columns come last.
+    """
+    select, columns = [], []
+    for column in edge_columns:
+        if column in ("subject", "object"):
+            mapped = f"coalesce({column}_mappings.subject_id, edges.{column})"
+            select.append(f"CASE WHEN {mapped} = edges.{column} THEN NULL ELSE edges.{column} END")
+            columns.append(f"original_{column}")
+        else:
+            select.append(f"edges.{_identifier(column)}")
+            columns.append(column)
+    for column in ("subject", "object"):
+        select.append(f"coalesce({column}_mappings.subject_id, edges.{column})")
+        columns.append(column)
+    con.sql(f"CREATE TABLE mappings AS SELECT * FROM read_parquet({_literal(str(mappings))})")
+    con.sql(
+        f"""
+        CREATE TABLE all_edges AS
+        SELECT {', '.join(f'{expression} AS {_identifier(column)}' for expression, column in zip(select, columns))}
+        FROM loaded_edges AS edges
+        LEFT JOIN mappings AS subject_mappings ON subject_mappings.object_id = edges.subject
+        LEFT JOIN mappings AS object_mappings ON object_mappings.object_id = edges.object
+        ORDER BY edges.rowid, subject_mappings.mapping, object_mappings.mapping
+        """
+    )
+    return columns
+
+
+def _mapping_report(con: duckdb.DuckDBPyConnection) -> Dict:
+    """The ids the mappings replaced, by prefix: how many distinct ids, and how many edge subjects and objects"""
+    remapped = [
+        {"prefix": prefix, "ids": ids, "subjects": subjects, "objects": objects}
+        for prefix, ids, subjects, objects in con.sql(
+            """
+            SELECT split_part(id, ':', 1) AS prefix, count(DISTINCT id),
+                count(*) FILTER (WHERE is_subject), count(*) FILTER (WHERE NOT is_subject)
+            FROM (
+                SELECT original_subject AS id, true AS is_subject FROM all_edges
+                UNION ALL
+                SELECT original_object AS id, false AS is_subject FROM all_edges
+            )
+            WHERE id IS NOT NULL
+            GROUP BY ALL ORDER BY prefix
+            """
+        ).fetchall()
+    ]
+    mappings = con.sql("SELECT count(*) FROM mappings").fetchone()[0]
+    return {"mappings": mappings, "remapped": remapped}
+
+
+def merge(
+    name: str,
+    input_dir: str,
+    output_dir: str,
+    mappings: Optional[List[str]] = None,
+    memory_limit: Optional[str] = None,
+    mapping_cache_dir: Optional[str] = None,
+):
+    """Merge the *_nodes and *_edges tsv or parquet files in input_dir into the KG, its QC files and qc_report.yaml
+
+    memory_limit is the memory DuckDB may use before it spills to disk, e.g. 16GB, MEMORY_LIMIT by default.
+    The mappings are compiled into mapping_cache_dir, output_dir/mapping_cache by default, see mapping_utils.
+    """
+    files = sorted(Path(input_dir).iterdir())
+    node_files = [path for path in files if "_nodes" in path.name]
+    edge_files = [path for path in files if "_nodes" not in path.name and "_edges" in path.name]
+    logger.info(f"Merging {len(node_files)} node files and {len(edge_files)} edge files with DuckDB")
+    Path(f"{output_dir}/qc").mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=output_dir, prefix=".merge-") as scratch:
+        con = duckdb.connect(
+            f"{scratch}/merge.duckdb",
+            config={
+                "memory_limit": memory_limit or MEMORY_LIMIT,
+                "temp_directory": scratch,
+                "preserve_insertion_order": True,
+            },
+        )
+        node_columns = _load(con, "all_nodes", node_files)
+        edge_columns = _load(con, "loaded_edges", edge_files)
+        if mappings:
+            compiled = compile_mappings(mappings, mapping_cache_dir or f"{output_dir}/mapping_cache")
+            logger.info("Applying mappings to edge subjects and objects")
+            edge_columns = _apply_mappings(con, edge_columns, compiled)
+            mapping_report = _mapping_report(con)
+            for prefix in mapping_report["remapped"]:
+                logger.info(
+                    f"Mapped {prefix['ids']} {prefix['prefix']} ids, "
+                    f"in {prefix['subjects']} edge subjects and {prefix['objects']} edge objects"
+                )
+            with open(f"{output_dir}/qc/{name}-mapping-report.yaml", "w") as report_file:
+                yaml.dump(mapping_report, report_file)
+        else:
+            con.sql("ALTER TABLE loaded_edges RENAME TO all_edges")
+
+        logger.info("Removing duplicate nodes and edges, and dangling edges")
+        con.sql("CREATE TABLE node_ids AS SELECT DISTINCT id FROM all_nodes")
+        con.sql(
+            """
+            CREATE TABLE flagged_nodes AS
+            SELECT *, rowid AS _row,
+                row_number() OVER (PARTITION BY id ORDER BY rowid) = 1 AS _first,
+                count(*) OVER (PARTITION BY id) > 1 AS _duplicate
+            FROM all_nodes
+            ORDER BY _row
+            """
+        )
+        con.sql(
+            """
+            CREATE TABLE flagged_edges AS
+            SELECT *, rowid AS _row,
+                count(*) OVER (PARTITION BY id) > 1 AS _duplicate,
+                NOT EXISTS (SELECT 1 FROM node_ids WHERE node_ids.id = all_edges.subject)
+                OR NOT EXISTS (SELECT 1 FROM node_ids WHERE node_ids.id = all_edges.object) AS _dangling
+            FROM all_edges
+            ORDER BY _row
+            """
+        )
+        nodes = f"SELECT {', '.join(map(_identifier, node_columns))} FROM flagged_nodes WHERE {{}} ORDER BY _row"
+        edges = f"SELECT {', '.join(map(_identifier, edge_columns))} FROM flagged_edges WHERE {{}} ORDER BY _row"
+
+        logger.info(f"Writing {output_dir}/{name}.tar.gz")
+        kg_files = [f"{output_dir}/{name}_nodes.tsv", f"{output_dir}/{name}_edges.tsv"]
+        _copy(con, nodes.format("_first"), kg_files[0])
+        _copy(con, edges.format("NOT _duplicate AND NOT _dangling"), kg_files[1])
+        with tarfile.open(f"{output_dir}/{name}.tar.gz", "w:gz") as tar:
+            for kg_file in kg_files:
+                tar.add(kg_file, arcname=os.path.basename(kg_file))
+        for kg_file in kg_files:
+            os.remove(kg_file)
+        _copy(con, nodes.format("_duplicate"), f"{output_dir}/qc/{name}-duplicate-nodes.tsv.gz")
+        _copy(con, edges.format("_dangling"), f"{output_dir}/qc/{name}-dangling-edges.tsv.gz")
+
+        logger.info("Generating QC report")
+        taxon = "in_taxon" in node_columns
+        fill_taxon = ", coalesce(in_taxon, 'missing taxon') AS in_taxon" if taxon else ""
+        con.sql(
+            "CREATE TEMP TABLE report_nodes AS SELECT * REPLACE "
+            f"(coalesce(category, 'missing category') AS category{fill_taxon}) FROM flagged_nodes WHERE _first"
+        )
+        con.sql("CREATE TEMP VIEW duplicate_nodes AS SELECT * FROM flagged_nodes WHERE _duplicate")
+        for view, condition in [
+            ("edges", "NOT _duplicate AND NOT _dangling"),
+            ("dangling_edges", "_dangling"),
+            ("duplicate_edges", "_duplicate"),
+        ]:
+            con.sql(f"CREATE TEMP VIEW {view} AS SELECT * FROM flagged_edges WHERE {condition}")
+        qc_report = {
+            "nodes": _nodes_report(con, "report_nodes", taxon),
+            "duplicate_nodes": _nodes_report(con, "duplicate_nodes", taxon),
+            "edges": _edges_report(con, "edges", taxon),
+            "dangling_edges": _edges_report(con, "dangling_edges", taxon),
+            "duplicate_edges": _edges_report(con, "duplicate_edges", taxon),
+        }
+        con.close()
+    with open(f"{output_dir}/qc_report.yaml", "w") as report_file:
+        yaml.dump(qc_report, report_file)
@@ -0,0 +1,233 @@
+"""
+Throughput metrics for each ingest run
+
+collect_metrics wraps an ingest and writes output/metrics/<ingest>.json with:
+
+- rows_read: rows the source's readers produced, before Koza's row filters
+- rows_filtered: rows dropped by Koza's row filters
+- nodes, edges and rows_written: data rows in the ingest's nodes and edges files, tsv or parquet
+- wall_seconds and cpu_seconds
+- rows_per_second (rows read) and written_per_second (rows written)
+- peak_rss_mb: the peak resident memory during the ingest, the process' high-water mark when the ingest raised it
+  and otherwise the largest of samples taken every RSS_SAMPLE_SECONDS, since a serial --all run shares one process
+
+Koza doesn't count rows itself, so use_row_counts counts them in Source for primary files (not maps). Engines that
+don't read through Koza report rows_read themselves, or leave it empty.
+
+compare_metrics diffs two runs' metrics, for `ingest metrics compare`.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from kg_alzheimers.utils.parallel_utils import current_rss_mb, peak_rss_mb
+
+LOWER_IS_BETTER = ["wall_seconds", "cpu_seconds", "peak_rss_mb"]
+HIGHER_IS_BETTER = ["rows_per_second", "written_per_second"]
+REGRESSION_THRESHOLD = 0.1
+RSS_SAMPLE_SECONDS = 0.1
+
+_row_counts = {"read": 0, "kept": 0}
+
+
+def _counted_get_row(self):
+    """Source._get_row, counting the rows read from primary files and the rows that pass the filters"""
+    from koza.model.config.source_config import PrimaryFileConfig
+
+    counted = isinstance(self.config, PrimaryFileConfig)
+    while True:
+        row = next(self._reader)
+        if counted:
+            _row_counts["read"] += 1
+        if not self._filter or self._filter.include_row(row):
+            break
+    if counted:
+        _row_counts["kept"] += 1
+    self.last_row = row
+    return row
+
+
+def use_row_counts():
+    """Make Koza sources count the rows they read"""
+    import koza.model.source
+
+    koza.model.source.Source._get_row = _counted_get_row
+
+
+def reset_row_counts():
+    _row_counts.update(read=0, kept=0)
+
+
+def count_rows(path: Path) -> Optional[int]:
+    """Data rows in a tsv with a header or a parquet file, None if it doesn't exist"""
+    if not path.is_file():
+        return None
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    lines = 0
+    last = b""
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last not in (b"", b"\n"):
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def output_rows(transform_output: Path, ingest: str, kind: str) -> Optional[int]:
+    """Data rows in the ingest's nodes or edges file, whichever of tsv or parquet it wrote"""
+    for suffix in ["tsv", "parquet"]:
+        rows = count_rows(transform_output / f"{ingest}_{kind}.{suffix}")
+        if rows is not None:
+            return rows
+    return None
+
+
+def _sample_rss(stop: threading.Event, rss: Dict):
+    """Keep the largest resident set size seen in rss['mb'] until stop is set"""
+    while True:
+        rss["mb"] = max(rss["mb"], current_rss_mb())
+        if stop.wait(RSS_SAMPLE_SECONDS):
+            return
+
+
+def metrics_path(ingest: str, output_dir: str) -> Path:
+    return Path(output_dir) / "metrics" / f"{ingest}.json"
+
+
+@contextmanager
+def collect_metrics(ingest: str, output_dir: str, engine: str = "koza"):
+    """Measure the ingest run in the with block and write its metrics
+
+    Yields a dict the block can add to, rows_read in particular for engines that don't read through Koza.
+    """
+    reset_row_counts()
+    metrics: Dict = {"ingest": ingest, "engine": engine}
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_peak = peak_rss_mb()
+    rss = {"mb": current_rss_mb()}
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_rss, args=(stop, rss), daemon=True)
+    sampler.start()
+    try:
+        yield metrics
+    finally:
+        stop.set()
+        sampler.join()
+    wall = time.perf_counter() - start_wall
+    cpu = time.process_time() - start_cpu
+    # the process' high-water mark is exact if this ingest raised it, otherwise it belongs to an earlier ingest
+    peak = peak_rss_mb()
+    peak_rss = peak if peak > start_peak else max(rss["mb"], current_rss_mb())
+
+    transform_output = Path(output_dir) / "transform_output"
+    nodes, edges = (output_rows(transform_output, ingest, kind) for kind in ["nodes", "edges"])
+    if "rows_read" in metrics:
+        rows_read, rows_filtered = metrics["rows_read"], metrics.get("rows_filtered")
+    elif _row_counts["read"]:
+        rows_read, rows_filtered = _row_counts["read"], _row_counts["read"] - _row_counts["kept"]
+    else:
+        rows_read = rows_filtered = None
+    rows_written = (nodes or 0) + (edges or 0)
+    metrics.update(
+        {
+            "rows_read": rows_read,
+            "rows_filtered": rows_filtered,
+            "nodes": nodes,
+            "edges": edges,
+            "rows_written": rows_written,
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu, 3),
+            "rows_per_second": round(rows_read / wall, 1) if rows_read and wall else None,
+            "written_per_second": round(rows_written / wall, 1) if wall else None,
+            "peak_rss_mb": round(peak_rss, 1),
+        }
+    )
+    path = metrics_path(ingest, output_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f"{path.name}.{os.getpid()}")
+    tmp_file.write_text(json.dumps(metrics, indent=2))
+    tmp_file.replace(path)
+
+
+def load_metrics(path: str) -> Dict[str, Dict]:
+    """The metrics of a run, from its metrics directory or a single metrics file, by ingest"""
+    path = Path(path)
+    files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+    return {metrics["ingest"]: metrics for metrics in (json.loads(file.read_text()) for file in files)}
+
+
+def compare_metrics(
+    baseline: Dict[str, Dict], current: Dict[str, Dict], threshold: float = REGRESSION_THRESHOLD
+) -> List[Dict]:
+    """One row per ingest and metric in both runs, with the relative change and whether it's a regression"""
+    rows = []
+    for ingest in sorted(set(baseline) & set(current)):
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER + ["rows_read", "rows_written"]:
+            before, after = baseline[ingest].get(metric), current[ingest].get(metric)
+            if before is None or after is None:
+                continue
+            if before:
+                change = (after - before) / before
+            else:
+                # any change from 0 is an infinite relative change, not none at all
+                change = 0.0 if after == before else math.copysign(math.inf, after)
+            if metric in LOWER_IS_BETTER:
+                regression = change > threshold
+            elif metric in HIGHER_IS_BETTER:
+                regression = change < -threshold
+            else:
+                # a change in the row counts isn't a performance regression, but it's worth seeing
+                regression = False
+            rows.append(
+                {
+                    "ingest": ingest,
+                    "metric": metric,
+                    "before": before,
+                    "after": after,
+                    "change": change,
+                    "regression": regression,
+                }
+            )
+    return rows
+
+
+def format_comparison(rows: List[Dict], baseline: Dict[str, Dict], current: Dict[str, Dict]) -> str:
+    """A fixed-width table of the comparison, plus the ingests only in one of the runs"""
+    header = ("ingest", "metric", "before", "after", "change", "")
+    table = [
+        (
+            row["ingest"],
+            row["metric"],
+            f"{row['before']:g}",
+            f"{row['after']:g}",
+            f"{row['change']:+.1%}" if math.isfinite(row["change"]) else f"{row['change']:+}",
+            "REGRESSION" if row["regression"] else "",
+        )
+        for row in rows
+    ]
+    widths = [max(len(line[i]) for line in table + [header]) for i in range(len(header))]
+
+    def _line(cells) -> str:
+        return "  ".join(
+            cell.ljust(width) if i < 2 else cell.rjust(width) for i, (cell, width) in enumerate(zip(cells, widths))
+        ).rstrip()
+
+    lines = [_line(header), "  ".join("-" * width for width in widths)]
+    lines.extend(_line(line) for line in table)
+    for label, names in [("only in baseline", set(baseline) - set(current)), ("new", set(current) - set(baseline))]:
+        if names:
+            lines.append(f"{label}: {', '.join(sorted(names))}")
+    regressions = sum(row["regression"] for row in rows)
+    lines.append(f"{regressions} regression(s)")
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+"""
+Run independent ingest tasks in separate worker processes and collect per-task resource usage.
+"""
+
+import mmap
+import multiprocessing
+import resource
+import sys
+import time
+from multiprocessing.connection import wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process, in MB"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+def current_rss_mb() -> float:
+    """Resident set size of the current process in MB, the peak where /proc isn't available"""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * mmap.PAGESIZE / (1024 * 1024)
+    except OSError:
+        return peak_rss_mb()
+
+
+def _run_task(conn, name: str, func: Callable, kwargs: Dict):
+    """Worker process entry point: run one task and send its status and resource usage back to the parent"""
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    result = {"name": name, "status": "ok", "error": None}
+    try:
+        func(**kwargs)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["wall_time"] = time.perf_counter() - start_wall
+    result["cpu_time"] = time.process_time() - start_cpu
+    result["max_rss_mb"] = peak_rss_mb()
+    conn.send(result)
+    conn.close()
+
+
+def run_parallel(
+    tasks: List[Dict], max_workers: int, logger=None, lanes: Optional[Dict[str, int]] = None
+) -> List[Dict]:
+    """Run each task in its own process, at most max_workers at a time.
+
+    A task is a dict with a name, a func and its kwargs, and optionally the lane it runs in
+    (default 'cpu') and the names of tasks that must finish first (depends_on).
+    Every task gets a fresh process, so a crash, an exception or leftover Koza state in one ingest
+    can't affect the others. Ready tasks are started in the order given, each lane has its own
+    worker limit: 'cpu' is limited by max_workers, other lanes by the lanes argument.
+
+    Returns:
+        List[Dict]: one result per task, in completion order, with status, error, wall_time, cpu_time and max_rss_mb
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+    limits = {"cpu": max_workers, **(lanes or {})}
+    ctx = multiprocessing.get_context()
+    pending = list(tasks)
+    running: Dict[int, Tuple[Dict, multiprocessing.Process, object, float]] = {}
+    busy = {lane: 0 for lane in limits}
+    status: Dict[str, str] = {}
+    results = []
+
+    def _failed_result(name: str, error: str, wall_time: float = 0.0) -> Dict:
+        return {
+            "name": name,
+            "status": "failed",
+            "error": error,
+            "wall_time": wall_time,
+            "cpu_time": None,
+            "max_rss_mb": None,
+        }
+
+    while pending or running:
+        for task in list(pending):
+            deps = task.get("depends_on", [])
+            failed_deps = [dep for dep in deps if status.get(dep, "ok") != "ok"]
+            if failed_deps:
+                pending.remove(task)
+                status[task["name"]] = "failed"
+                results.append(_failed_result(task["name"], f"dependency failed: {', '.join(failed_deps)}"))
+                continue
+            lane = task.get("lane", "cpu")
+            if busy[lane] >= limits[lane] or not all(status.get(dep) == "ok" for dep in deps):
+                continue
+            pending.remove(task)
+            receiver, sender = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=_run_task,
+                args=(sender, task["name"], task["func"], task["kwargs"]),
+                name=f"ingest-{task['name']}",
+            )
+            process.start()
+            sender.close()
+            busy[lane] += 1
+            running[process.sentinel] = (task, process, receiver, time.perf_counter())
+            if logger:
+                logger.info(f"Started {task['name']} (pid {process.pid})")
+
+        if not running:
+            if pending:
+                raise ValueError(f"Unknown or circular dependencies among: {[task['name'] for task in pending]}")
+            break
+
+        for sentinel in wait(list(running)):
+            task, process, receiver, started = running.pop(sentinel)
+            name = task["name"]
+            try:
+                result: Optional[Dict] = receiver.recv()
+            except EOFError:
+                result = None
+            receiver.close()
+            process.join()
+            busy[task.get("lane", "cpu")] -= 1
+            if result is None:
+                # the worker died without reporting back (e.g. killed by the OOM killer)
+                result = _failed_result(
+                    name, f"worker process exited with code {process.exitcode}", time.perf_counter() - started
+                )
+            status[name] = result["status"]
+            if logger:
+                if result["status"] == "ok":
+                    logger.info(f"Finished {name} in {result['wall_time']:.1f}s")
+                else:
+                    logger.error(f"Error running {name}: {result['error']}")
+            results.append(result)
+
+    return results
+
+
+def format_summary(results: List[Dict]) -> str:
+    """Format task results as a fixed-width table, slowest task first"""
+
+    def _fmt(value: Optional[float], precision: int = 1) -> str:
+        return "-" if value is None else f"{value:.{precision}f}"
+
+    rows = [
+        (r["name"], r["status"], _fmt(r["wall_time"]), _fmt(r["cpu_time"]), _fmt(r["max_rss_mb"]))
+        for r in sorted(results, key=lambda r: r["wall_time"], reverse=True)
+    ]
+    header = ("ingest", "status", "wall (s)", "cpu (s)", "max rss (MB)")
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+
+    def _line(row) -> str:
+        return "  ".join(
+            str(cell).ljust(width) if i < 2 else str(cell).rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        )
+
+    lines = [_line(header), "  ".join("-" * width for width in widths)]
+    lines.extend(_line(row) for row in rows)
+    failed = [r for r in results if r["status"] != "ok"]
+    if failed:
+        lines.append("")
+        lines.extend(f"{r['name']}: {r['error']}" for r in failed)
+    return "\n".join(lines)
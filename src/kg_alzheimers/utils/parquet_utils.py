@@ -0,0 +1,163 @@
+"""
+Parquet transform output, for `ingest transform --format parquet`
+
+Ingests write <name>_nodes.parquet and <name>_edges.parquet to transform_output instead of TSV: zstd compressed,
+with the same columns in the same order, and multivalued Biolink slots (publications, has_evidence, xref...) as
+lists of strings rather than |-joined strings. The other columns stay strings, so the merge, which reads either
+format, writes the same KG TSV from both. category is left a string, as there is a single category per row.
+
+use_parquet_writer swaps Koza's TSVWriter for ParquetWriter, and write_parquet writes the record batches of the
+columnar engines.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Literal, Set, Union
+
+import pyarrow
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from koza.app import KozaApp
+from koza.converter.kgx_converter import KGXConverter
+from koza.io.utils import build_export_row
+from koza.io.writer.tsv_writer import TSVWriter
+from koza.io.writer.writer import KozaWriter
+from koza.model.config.sssom_config import SSSOMConfig
+
+OUTPUT_FORMATS = ["tsv", "parquet"]
+BATCH_ROWS = 65536
+COMPRESSION = "zstd"
+
+_tsv_get_writer = KozaApp._get_writer
+
+
+def multivalued_columns(columns: Iterable[str]) -> Set[str]:
+    """The columns that are multivalued Biolink slots, written as lists"""
+    from kg_alzheimers.utils.schema_utils import biolink_sets
+
+    multivalued_slots = set(biolink_sets()["multivalued_slots"])
+    return {
+        column for column in columns if column != "category" and column.lower().replace("_", " ") in multivalued_slots
+    }
+
+
+def parquet_schema(columns: List[str], list_columns: Set[str]) -> pyarrow.Schema:
+    return pyarrow.schema(
+        [
+            (column, pyarrow.list_(pyarrow.string()) if column in list_columns else pyarrow.string())
+            for column in columns
+        ]
+    )
+
+
+def remove_other_formats(directory: str, name: str, output_format: str):
+    """Remove the output of an earlier run in another format, so the merge doesn't read both"""
+    for other in OUTPUT_FORMATS:
+        if other != output_format:
+            for kind in ["nodes", "edges"]:
+                Path(directory, f"{name}_{kind}.{other}").unlink(missing_ok=True)
+
+
+def write_parquet(batches: pyarrow.RecordBatchReader, path: Path) -> int:
+    """Write batches of string columns, splitting the multivalued ones on |, returns the number of rows written"""
+    names = batches.schema.names
+    list_columns = multivalued_columns(names)
+    rows = 0
+    with pq.ParquetWriter(path, parquet_schema(names, list_columns), compression=COMPRESSION) as writer:
+        for batch in batches:
+            arrays = [
+                pc.split_pattern(batch.column(i), "|") if name in list_columns else batch.column(i)
+                for i, name in enumerate(names)
+            ]
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=writer.schema))
+            rows += len(batch)
+    return rows
+
+
+class ParquetWriter(KozaWriter):
+    """Koza's TSVWriter, writing Parquet: the same columns and values, with lists for multivalued slots"""
+
+    def __init__(
+        self,
+        output_dir: Union[str, Path],
+        source_name: str,
+        node_properties: List[str] = None,
+        edge_properties: List[str] = None,
+        sssom_config: SSSOMConfig = None,
+    ):
+        self.converter = KGXConverter()
+        self.sssom_config = sssom_config
+        self.writers: Dict[str, pq.ParquetWriter] = {}
+        self.columns: Dict[str, List[str]] = {}
+        self.list_columns: Dict[str, Set[str]] = {}
+        self.buffers: Dict[str, List[Dict]] = {}
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+        if node_properties:
+            self.nodes_file_name = Path(output_dir, f"{source_name}_nodes.parquet")
+            self._open("node", list(TSVWriter._order_columns(node_properties, "node")), self.nodes_file_name)
+        if edge_properties:
+            if sssom_config:
+                edge_properties = TSVWriter.add_sssom_columns(edge_properties)
+            self.edges_file_name = Path(output_dir, f"{source_name}_edges.parquet")
+            self._open("edge", list(TSVWriter._order_columns(edge_properties, "edge")), self.edges_file_name)
+
+    def _open(self, record_type: str, columns: List[str], path: Path):
+        self.columns[record_type] = columns
+        self.list_columns[record_type] = multivalued_columns(columns)
+        schema = parquet_schema(columns, self.list_columns[record_type])
+        self.writers[record_type] = pq.ParquetWriter(path, schema, compression=COMPRESSION)
+        self.buffers[record_type] = []
+
+    def write(self, entities: Iterable) -> None:
+        nodes, edges = self.converter.convert(entities)
+        for node in nodes or []:
+            self.write_row(node, record_type="node")
+        for edge in edges or []:
+            if self.sssom_config:
+                edge = self.sssom_config.apply_mapping(edge)
+            self.write_row(edge, record_type="edge")
+
+    def write_row(self, record: Dict, record_type: Literal["node", "edge"]) -> None:
+        row = build_export_row(record)
+        if record_type == "node":
+            row["id"] = record["id"]
+        list_columns = self.list_columns[record_type]
+        values = {}
+        for column in self.columns[record_type]:
+            value = row.get(column)
+            if value is None:
+                values[column] = None
+            elif column in list_columns:
+                values[column] = [str(v) for v in value] if isinstance(value, list) else [str(value)]
+            else:
+                # what TSVWriter would have written
+                values[column] = "|".join(str(v) for v in value) if isinstance(value, list) else str(value)
+        self.buffers[record_type].append(values)
+        if len(self.buffers[record_type]) >= BATCH_ROWS:
+            self._flush(record_type)
+
+    def _flush(self, record_type: str):
+        writer = self.writers[record_type]
+        if self.buffers[record_type]:
+            writer.write_batch(pyarrow.RecordBatch.from_pylist(self.buffers[record_type], schema=writer.schema))
+            self.buffers[record_type] = []
+
+    def finalize(self):
+        for record_type, writer in self.writers.items():
+            self._flush(record_type)
+            writer.close()
+
+
+def _get_writer(self):
+    return ParquetWriter(
+        self.output_dir,
+        self.source.config.name,
+        self.source.config.node_properties,
+        self.source.config.edge_properties,
+        self.source.config.sssom_config,
+    )
+
+
+def use_parquet_writer(enabled: bool = True):
+    """Make Koza write Parquet, or TSV again"""
+    KozaApp._get_writer = _get_writer if enabled else _tsv_get_writer
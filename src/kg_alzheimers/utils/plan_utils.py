@@ -0,0 +1,269 @@
+"""
+Dependency-aware planning for `ingest transform --all`
+
+Every ingest becomes a task in a DAG. Koza ingests and Phenio are CPU-bound and share the
+worker pool, pass-through `url` ingests only download files, so they run in a separate
+I/O lane alongside them. Each compilable map an ingest declares in `depends_on` becomes a task of
+its own, map:<name>, that the ingests using the map depend on, so the map is compiled once before
+they start. Durations are estimated from the size of each task's input files, a map already compiled
+for its current content costs nothing.
+"""
+
+import heapq
+import pkgutil
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+from koza.io.yaml_loader import UniqueIncludeLoader
+
+from kg_alzheimers.utils.ingest_utils import get_ingest, get_ingests, ingest_output_exists, file_exists
+from kg_alzheimers.utils.manifest_utils import (
+    PHENIO_INPUTS,
+    PHENIO_TAR,
+    ingest_inputs,
+    ingest_settings,
+    is_up_to_date,
+)
+
+# Rough single-core Koza throughput on uncompressed input, and the typical gzip ratio of our sources
+KOZA_BYTES_PER_SECOND = 4 * 1024 * 1024
+GZIP_EXPANSION = 5
+# Pass-through files are fetched from GitHub releases, their size isn't known before the download
+SECONDS_PER_DOWNLOAD = 30
+DOWNLOAD_WORKERS = 4
+
+
+def get_downloads() -> List[Dict]:
+    return yaml.safe_load(pkgutil.get_data("kg_alzheimers", "download.yaml"))
+
+
+def get_map_config(map_file: str) -> Dict:
+    with open(map_file, "r") as map_fh:
+        return yaml.load(map_fh, Loader=UniqueIncludeLoader)
+
+
+def estimate_seconds(files: List[str]) -> float:
+    """Estimate Koza transform time from the size of the input files that exist on disk"""
+    total = 0
+    for file in files:
+        path = Path(file)
+        if not path.is_file():
+            continue
+        size = path.stat().st_size
+        total += size * GZIP_EXPANSION if path.suffix in (".gz", ".zip") else size
+    return total / KOZA_BYTES_PER_SECOND
+
+
+def build_ingest_graph(
+    output_dir: str = "output",
+    force: bool = False,
+    output_format: str = "tsv",
+    row_limit: Optional[int] = None,
+    engine: str = "koza",
+) -> Dict[str, Dict]:
+    """Describe phenio and every ingest in ingests.yaml as a task node
+
+    Each node records its lane ('cpu' or 'io'), the tasks it depends on, the maps it loads,
+    the input files it reads, the download.yaml entries tagged with its name that are not on disk yet,
+    whether its output is up to date so it will be skipped, and its estimated duration in seconds.
+    Map nodes also record their map_file and the ingests that use them, and are skipped when the map
+    is already compiled or none of those ingests will run.
+    """
+    from kg_alzheimers.utils.map_utils import compiled_map_path, is_compilable, map_config
+
+    downloads_by_tag: Dict[str, List[str]] = {}
+    for download in get_downloads():
+        downloads_by_tag.setdefault(download.get("tag"), []).append(download["local_name"])
+
+    def _missing(tag: str) -> List[str]:
+        return [local_name for local_name in downloads_by_tag.get(tag, []) if not Path(local_name).exists()]
+
+    phenio_outputs = [f"{output_dir}/transform_output/phenio_{kind}.{output_format}" for kind in ("nodes", "edges")]
+    phenio_skipped = (
+        not force and all(file_exists(f) for f in phenio_outputs) and is_up_to_date("phenio", PHENIO_INPUTS, output_dir)
+    )
+    map_nodes: Dict[str, Dict] = {}
+    graph = {
+        "phenio": {
+            "lane": "cpu",
+            "depends_on": [],
+            "maps": [],
+            "files": [PHENIO_TAR],
+            "missing": _missing("phenio"),
+            "skipped": phenio_skipped,
+            "estimate": 0.0 if phenio_skipped else estimate_seconds([PHENIO_TAR]),
+        }
+    }
+
+    for ingest, entry in get_ingests().items():
+        if "url" in entry:
+            files = [f"{output_dir}/transform_output/{url.split('/')[-1]}" for url in entry["url"]]
+            skipped = not force and all(Path(f).is_file() for f in files)
+            graph[ingest] = {
+                "lane": "io",
+                "depends_on": [],
+                "maps": [],
+                "files": entry["url"],
+                "missing": [],
+                "skipped": skipped,
+                "estimate": 0.0 if skipped else SECONDS_PER_DOWNLOAD * len(entry["url"]),
+            }
+            continue
+
+        config = get_ingest(ingest)
+        files = list(config.get("files", []))
+        if config.get("file_archive"):
+            files = [config["file_archive"]]
+        # maps with transform code are loaded by the ingest itself, so they count towards its own estimate
+        own_files = list(files)
+        maps, map_tasks = [], []
+        for map_file in config.get("depends_on") or []:
+            map_yaml = get_map_config(map_file)
+            maps.append(map_yaml["name"])
+            files.extend(map_yaml.get("files", []))
+            if is_compilable(map_config(map_file)):
+                map_tasks.append(f"map:{map_yaml['name']}")
+                map_nodes.setdefault(f"map:{map_yaml['name']}", {"map_file": map_file, "users": []})["users"].append(
+                    ingest
+                )
+            else:
+                own_files.extend(map_yaml.get("files", []))
+
+        skipped = (
+            not force
+            and ingest_output_exists(ingest, f"{output_dir}/transform_output", output_format)
+            and is_up_to_date(
+                ingest, ingest_inputs(ingest, engine), output_dir, ingest_settings(ingest, row_limit, engine)
+            )
+        )
+        graph[ingest] = {
+            "lane": "cpu",
+            "depends_on": map_tasks,
+            "maps": maps,
+            "files": files,
+            "missing": _missing(ingest),
+            "skipped": skipped,
+            "estimate": 0.0 if skipped else estimate_seconds(own_files),
+        }
+
+    for name, map_node in map_nodes.items():
+        config = map_config(map_node["map_file"])
+        files = [str(file) for file in config.files]
+        skipped = all(graph[user]["skipped"] for user in map_node["users"]) or (
+            all(Path(file).is_file() for file in files)
+            and (compiled_map_path(config, f"{output_dir}/map_cache") / "meta.json").is_file()
+        )
+        graph[name] = {
+            "lane": "cpu",
+            "depends_on": [],
+            "maps": [],
+            "files": files,
+            "missing": [],
+            "skipped": skipped,
+            "estimate": 0.0 if skipped else estimate_seconds(files),
+            **map_node,
+        }
+
+    return graph
+
+
+def critical_path(graph: Dict[str, Dict]) -> Tuple[List[str], float]:
+    """Longest chain of dependent tasks, weighted by estimated duration"""
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+
+    def _finish(name: str) -> float:
+        if name not in finish:
+            deps = graph[name]["depends_on"]
+            longest = max(deps, key=_finish) if deps else None
+            previous[name] = longest
+            finish[name] = graph[name]["estimate"] + (_finish(longest) if longest else 0.0)
+        return finish[name]
+
+    if not graph:
+        return [], 0.0
+    end = max(graph, key=_finish)
+    path = [end]
+    while previous[path[-1]]:
+        path.append(previous[path[-1]])
+    return list(reversed(path)), finish[end]
+
+
+def schedule(graph: Dict[str, Dict], cpu_workers: int, io_workers: int = DOWNLOAD_WORKERS) -> List[Dict]:
+    """Simulate a longest-first list schedule of the graph
+
+    Tasks are prioritised by the longest chain of work they start (their own estimate plus
+    their longest chain of dependents), so the critical path and the longest ingests start first.
+
+    Returns:
+        List[Dict]: one entry per task with name, lane, slot, start and end, ordered by start time
+    """
+    workers = {"cpu": cpu_workers, "io": io_workers}
+    free = {lane: [(0.0, slot) for slot in range(count)] for lane, count in workers.items()}
+    end_times: Dict[str, float] = {}
+    remaining = dict(graph)
+    planned = []
+
+    dependents: Dict[str, List[str]] = {name: [] for name in graph}
+    for name, node in graph.items():
+        for dep in node["depends_on"]:
+            dependents.setdefault(dep, []).append(name)
+    priority: Dict[str, float] = {}
+
+    def _priority(name: str, visiting: Tuple[str, ...] = ()) -> float:
+        if name in visiting:
+            raise ValueError(f"Dependency cycle among: {sorted(visiting)}")
+        if name not in priority:
+            downstream = [_priority(d, visiting + (name,)) for d in dependents.get(name, []) if d in graph]
+            priority[name] = graph[name]["estimate"] + max(downstream, default=0.0)
+        return priority[name]
+
+    while remaining:
+        ready = [name for name, node in remaining.items() if all(dep in end_times for dep in node["depends_on"])]
+        if not ready:
+            raise ValueError(f"Dependency cycle or unknown dependency among: {sorted(remaining)}")
+        name = max(ready, key=lambda n: (_priority(n), n))
+        node = remaining.pop(name)
+        free_at, slot = heapq.heappop(free[node["lane"]])
+        start = max([free_at] + [end_times[dep] for dep in node["depends_on"]])
+        end = start + node["estimate"]
+        heapq.heappush(free[node["lane"]], (end, slot))
+        end_times[name] = end
+        planned.append({"name": name, "lane": node["lane"], "slot": slot, "start": start, "end": end})
+
+    return sorted(planned, key=lambda task: (task["start"], -task["end"]))
+
+
+def format_plan(graph: Dict[str, Dict], planned: List[Dict], cpu_workers: int) -> str:
+    def _duration(seconds: float) -> str:
+        minutes, secs = divmod(int(round(seconds)), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+
+    name_width = max(len(task["name"]) for task in planned)
+    lines = [f"{'ingest'.ljust(name_width)}  lane  slot    start      end  notes"]
+    for task in planned:
+        node = graph[task["name"]]
+        notes = []
+        if node["skipped"]:
+            notes.append("up to date, skipped")
+        if node["maps"]:
+            notes.append(f"maps: {', '.join(node['maps'])}")
+        if node.get("users"):
+            notes.append(f"for: {', '.join(node['users'])}")
+        if node["missing"]:
+            notes.append(f"{len(node['missing'])} download(s) missing")
+        lines.append(
+            f"{task['name'].ljust(name_width)}  {task['lane'].ljust(4)}  {task['slot']:>4}  "
+            f"{_duration(task['start']):>7}  {_duration(task['end']):>7}  {'; '.join(notes)}"
+        )
+
+    path, length = critical_path(graph)
+    makespan = max((task["end"] for task in planned), default=0.0)
+    cpu_work = sum(node["estimate"] for node in graph.values() if node["lane"] == "cpu")
+    lines.append("")
+    lines.append(f"Critical path: {' -> '.join(path)} ({_duration(length)})")
+    lines.append(f"CPU work: {_duration(cpu_work)} over {cpu_workers} worker(s)")
+    lines.append(f"Estimated makespan: {_duration(makespan)}")
+    return "\n".join(lines)
@@ -0,0 +1,174 @@
+"""
+Sampling profiler for `ingest transform --profile`
+
+While an ingest runs, a background thread samples the stack of the thread running it every few milliseconds.
+Each sample is attributed to the phase of the innermost frame that belongs to one:
+
+- read: Koza's readers and sources, and the streaming JSON reader
+- pydantic: building and validating Biolink model instances
+- write: Koza's writers
+- transform: the ingest's own transform code
+- other: everything else, like loading maps
+
+Each ingest gets output/profile/<ingest>.folded, its stacks in the collapsed format that flamegraph.pl and
+speedscope read, and output/profile/<ingest>.json with the time per phase and the functions with the most
+samples. output/profile/profile.json collects the summaries of every profiled ingest.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 25
+PHASES = {
+    "read": [
+        "koza/io/reader/",
+        "koza/io/utils.py",
+        "koza/model/source.py",
+        "kg_alzheimers/utils/json_utils.py",
+        "/csv.py",
+        "/gzip.py",
+        "/ijson/",
+    ],
+    "pydantic": [
+        "/pydantic/",
+        "/pydantic_core/",
+        "biolink_model/datamodel/",
+        "kg_alzheimers/utils/association_utils.py",
+    ],
+    "write": ["koza/io/writer/"],
+}
+TRANSFORM_PATH = "kg_alzheimers/ingests/"
+
+Frame = Tuple[str, str, int]
+
+
+def frame_label(frame: Frame) -> str:
+    """function (path:line), with the path relative to site-packages or src"""
+    filename, function, line = frame
+    filename = re.sub(r".*/(site-packages|src|lib/python\d+\.\d+)/", "", filename.replace(os.sep, "/"))
+    return f"{function} ({filename}:{line})"
+
+
+def phase(stack: Tuple[Frame, ...]) -> str:
+    """The phase a sampled stack, outermost frame first, belongs to"""
+    for filename, _, _ in reversed(stack):
+        filename = filename.replace(os.sep, "/")
+        for name, paths in PHASES.items():
+            if any(path in filename for path in paths):
+                return name
+    if any(TRANSFORM_PATH in filename.replace(os.sep, "/") for filename, _, _ in stack):
+        return "transform"
+    return "other"
+
+
+class SamplingProfiler:
+    """Samples the stack of the thread that starts it from a background thread"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.seconds = 0.0
+        self._stop = threading.Event()
+
+    def _sample(self, thread_id: int):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append((frame.f_code.co_filename, frame.f_code.co_name, frame.f_code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, args=(threading.get_ident(),), daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self._start
+
+    def folded(self) -> List[str]:
+        """The sampled stacks in collapsed format, one 'outer;...;inner count' line per distinct stack"""
+        lines = Counter()
+        for stack, count in self.stacks.items():
+            lines[";".join(frame_label(frame) for frame in stack)] += count
+        return [f"{stack} {count}" for stack, count in sorted(lines.items())]
+
+    def summary(self) -> Dict:
+        total = sum(self.stacks.values())
+        phases = Counter()
+        functions = Counter()
+        for stack, count in self.stacks.items():
+            phases[phase(stack)] += count
+            functions[frame_label(stack[-1])] += count
+
+        def _seconds(count: int) -> float:
+            return round(self.seconds * count / total, 3) if total else 0.0
+
+        return {
+            "seconds": round(self.seconds, 3),
+            "samples": total,
+            "phases": {
+                name: {"seconds": _seconds(phases[name]), "share": round(phases[name] / total, 3) if total else 0.0}
+                for name in ["read", "transform", "pydantic", "write", "other"]
+            },
+            "top_functions": [
+                {"function": label, "seconds": _seconds(count), "samples": count}
+                for label, count in functions.most_common(TOP_FUNCTIONS)
+            ],
+        }
+
+
+def _write_text(path: Path, text: str):
+    """Write next to path and rename into place, ingests running in parallel read each other's summaries"""
+    tmp_file = path.with_name(f"{path.name}.{os.getpid()}")
+    tmp_file.write_text(text)
+    tmp_file.replace(path)
+
+
+def collect_profiles(profile_dir: str) -> Dict:
+    """Combine the summaries of every profiled ingest into profile_dir/profile.json"""
+    profiles = {}
+    for path in sorted(Path(profile_dir).glob("*.json")):
+        if path.name != "profile.json":
+            profiles[path.stem] = json.loads(path.read_text())
+    _write_text(Path(profile_dir) / "profile.json", json.dumps(profiles, indent=2))
+    return profiles
+
+
+@contextmanager
+def profile_ingest(ingest: str, profile_dir: Optional[str]):
+    """Profile the body of the with block as ingest, does nothing if profile_dir is None"""
+    if profile_dir is None:
+        yield
+        return
+    with SamplingProfiler() as profiler:
+        yield
+    Path(profile_dir).mkdir(parents=True, exist_ok=True)
+    _write_text(Path(profile_dir, f"{ingest}.folded"), "\n".join(profiler.folded()) + "\n")
+    summary = profiler.summary()
+    _write_text(Path(profile_dir, f"{ingest}.json"), json.dumps(summary, indent=2))
+    collect_profiles(profile_dir)
+    logger.info(format_profile(ingest, summary))
+
+
+def format_profile(ingest: str, summary: Dict) -> str:
+    phases = ", ".join(
+        f"{name} {values['seconds']:.1f}s ({values['share']:.0%})" for name, values in summary["phases"].items()
+    )
+    return f"{ingest}: {summary['seconds']:.1f}s - {phases}"
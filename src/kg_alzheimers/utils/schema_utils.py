@@ -0,0 +1,75 @@
+"""
+Biolink schema lookups, cached per Biolink model version
+
+The Phenio transform and the JSONL export only need a few sets derived from the Biolink schema. Building them
+means parsing the whole LinkML schema, so they're computed once per model version, from the schema that ships
+with the installed biolink_model package, and kept in a JSON file:
+
+- named_thing_descendants: valid node categories, e.g. biolink:Gene
+- association_descendants: valid edge categories
+- related_to_descendants: valid predicates, e.g. biolink:has_phenotype
+- class_ancestors: the ancestor categories of each category, itself first
+- multivalued_slots: the names of multivalued slots, e.g. "has evidence"
+"""
+
+import json
+from functools import lru_cache
+from importlib.resources import files
+from pathlib import Path
+from typing import Dict
+
+from biolink_model.datamodel import model
+from loguru import logger
+
+SCHEMA_CACHE_DIR = "data/biolink"
+
+
+def schema_file() -> Path:
+    return Path(str(files("biolink_model") / "schema" / "biolink_model.yaml"))
+
+
+def biolink_schema():
+    """A SchemaView of the installed Biolink model"""
+    from linkml_runtime import SchemaView
+
+    return SchemaView(str(schema_file()))
+
+
+def derive_sets(schema) -> Dict:
+    from linkml.utils.helpers import convert_to_snake_case
+    from linkml_runtime.utils.formatutils import camelcase
+
+    def _categories(classes):
+        return sorted(f"biolink:{camelcase(name)}" for name in classes)
+
+    return {
+        "version": model.version,
+        "named_thing_descendants": _categories(schema.class_descendants("named thing")),
+        "association_descendants": _categories(schema.class_descendants("association")),
+        "related_to_descendants": sorted(
+            f"biolink:{convert_to_snake_case(name)}" for name in schema.slot_descendants("related to")
+        ),
+        "class_ancestors": {
+            f"biolink:{camelcase(name)}": [
+                f"biolink:{camelcase(ancestor)}" for ancestor in schema.class_ancestors(name)
+            ]
+            for name in schema.all_classes()
+        },
+        "multivalued_slots": sorted(name for name, slot in schema.all_slots().items() if slot.multivalued),
+    }
+
+
+@lru_cache
+def biolink_sets(cache_dir: str = SCHEMA_CACHE_DIR) -> Dict:
+    """The derived Biolink sets for the installed model version, computing and caching them on first use"""
+    cache_file = Path(cache_dir) / f"biolink-{model.version}.json"
+    if cache_file.is_file():
+        return json.loads(cache_file.read_text())
+
+    logger.info(f"Caching Biolink {model.version} schema lookups in {cache_file}")
+    sets = derive_sets(biolink_schema())
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(".json.tmp")
+    tmp_file.write_text(json.dumps(sets))
+    tmp_file.replace(cache_file)
+    return sets
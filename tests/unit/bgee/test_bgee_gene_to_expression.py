@@ -1,3 +1,4 @@
+import itertools
 import types
 from typing import Dict, List
 
@@ -10,7 +11,12 @@ from koza.io.yaml_loader import UniqueIncludeLoader
 from koza.model.config.source_config import OutputFormat, PrimaryFileConfig
 from koza.model.source import Source
 
-from kg_alzheimers.ingests.bgee.gene_to_expression_utils import filter_group_by_rank, get_row_group, write_group
+from kg_alzheimers.ingests.bgee.gene_to_expression_utils import (
+    filter_group_by_rank,
+    get_row_group,
+    process_koza_source,
+    write_group,
+)
 
 
 def get_mock_koza(
@@ -215,6 +221,40 @@ def test_get_row_group_inter_split(bgee_mock_koza_2, row_group_3, filter_col) ->
 
     assert row_group == row_group_3
 
-# Ignoring process_koza_sources for now as it depends completely on above tested functions but goes deeper into Koza.
-# def test_process_koza_source(bgee_mock_koza):
-#     pass
+def pandas_filter_group_by_rank(rows: List, col: str, largest_n: int = 0, smallest_n: int = 0) -> List[Dict]:
+    """The original per-group DataFrame implementation of filter_group_by_rank"""
+    df = pd.DataFrame(rows)
+    largest_df = df.nlargest(largest_n, col, keep="first")
+    smallest_df = df.nsmallest(smallest_n, col, keep="first")
+    return pd.concat([largest_df, smallest_df]).to_dict('records')
+
+
+def test_filter_group_by_rank_ties_match_pandas(filter_col):
+    ranks = [3.0, 1.0, 3.0, 2.0, 1.0, 3.0, 5.0, 2.0]
+    rows = [{'Gene ID': 'G', filter_col: rank, 'row': i} for i, rank in enumerate(ranks)]
+    for largest_n, smallest_n in [(0, 3), (2, 0), (3, 4)]:
+        expected = pandas_filter_group_by_rank(rows, filter_col, largest_n=largest_n, smallest_n=smallest_n)
+        assert filter_group_by_rank(rows, filter_col, largest_n=largest_n, smallest_n=smallest_n) == expected
+
+    # pandas falls back to an unstable sort once n covers the whole group, ties now keep their input order
+    assert [row['row'] for row in filter_group_by_rank(rows, filter_col, smallest_n=10)] == [1, 4, 3, 7, 0, 2, 5, 6]
+
+
+def test_process_koza_source(bgee_mock_koza, bgee_mock_koza_rows, filter_col, smallest_n):
+    rows = []
+    with pytest.raises(StopIteration):
+        while True:
+            rows.append(bgee_mock_koza_rows.get_row())
+    groups = [list(group) for _, group in itertools.groupby(rows, key=lambda row: row['Gene ID'])]
+    write_group(
+        [row for group in groups for row in pandas_filter_group_by_rank(group, filter_col, smallest_n=smallest_n)],
+        bgee_mock_koza_rows,
+    )
+
+    with pytest.raises(StopIteration):
+        process_koza_source(bgee_mock_koza)
+
+    expected = [(item.subject, item.object) for item in bgee_mock_koza_rows._entities]
+    assert [(item.subject, item.object) for item in bgee_mock_koza._entities] == expected
+    # the last gene in the file is written too
+    assert bgee_mock_koza._entities[-1].subject == f"ENSEMBL:{groups[-1][0]['Gene ID']}"
@@ -0,0 +1,99 @@
+"""
+The columnar Panther engine should write the same edges as the Koza ingest
+"""
+
+import csv
+import io
+import shutil
+import tarfile
+
+import pyarrow
+import pytest
+import yaml
+from koza.cli_utils import transform_source
+from koza.model.config.source_config import OutputFormat
+
+from kg_alzheimers.columnar.panther_genome_orthologs import parse_genes, transform
+from kg_alzheimers.utils.id_utils import get_id_strategy, set_id_strategy
+
+EDGE_CASES = [
+    ["HUMAN|HGNC=11477|UniProtKB=Q6GZX4", "RAT|RGD=1564893|UniProtKB=Q6GZX2", "LDO", "Euarchontoglires", "PTHR12434"],
+    ["HUMAN|HGNC=11477|UniProtKB=Q15528", "MOUSE|MGI=MGI=98446|UniProtKB=Q62276", "LDO", "Euarch", "PTHR12434"],
+    ["HUMAN|HGNC=11477|UniProtKB=Q6GZX4", "DROME|FlyBase=FBgn0040339|", "LDO", "Bilateria", "PTHR12434"],
+    ["HUMAN|HGNC=11477|UniProtKB=Q15528", "AARDV|AVD=98446|UniProtKB=Q62276", "LDO", "Euarch", "PTHR12434"],
+    ["HUMANOID|HGNC=1|UniProtKB=Q1", "MOUSE|MGI=MGI=98446|UniProtKB=Q62276", "LDO", "Euarch", "PTHR12434"],
+    ["HUMAN|HGNC=11477&UniProtKB=Q15528", "MOUSE|MGI=MGI=98446|UniProtKB=Q62276", "LDO", "Euarch", "PTHR12434"],
+    ["HUMAN|Gene=SYMBOL|UniProtKB=Q15528", "MOUSE|MGI=MGI=98446|UniProtKB=Q62276", "LDO", "Euarch", "PTHR12434"],
+    ["HUMAN|=11477|UniProtKB=Q15528", "MOUSE|MGI=MGI=98446|UniProtKB=Q62276", "LDO", "Euarch", "PTHR12434"],
+    ["HUMAN|HGNC=1=2|UniProtKB=Q15528", "MOUSE|MGI=MGI=98446|UniProtKB=Q62276", "LDO", "Euarch", "PTHR12434"],
+    ["CHICK|GeneID=395772|UniProtKB=Q1", "PIG|Ensembl=ENSSSCG00000002799|UniProtKB=I3LIC6", "O", "Amniota", "PTHR1"],
+]
+
+
+@pytest.fixture(autouse=True)
+def hash_ids():
+    # both engines give an edge the same id only with hash ids
+    previous = get_id_strategy()
+    set_id_strategy("hash")
+    yield
+    set_id_strategy(previous)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    with tarfile.open("tests/unit/panther/test_data.tar.gz") as tar:
+        test_data = tar.extractfile("test_data").read()
+    test_data += "".join("\t".join(row) + "\n" for row in EDGE_CASES).encode()
+
+    archive = tmp_path / "AllOrthologs.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        info = tarfile.TarInfo("AllOrthologs")
+        info.size = len(test_data)
+        tar.addfile(info, io.BytesIO(test_data))
+
+    with open("src/kg_alzheimers/ingests/panther/genome_orthologs.yaml") as fh:
+        config = yaml.safe_load(fh)
+    config["file_archive"] = str(archive)
+    config_file = tmp_path / "genome_orthologs.yaml"
+    config_file.write_text(yaml.safe_dump(config))
+    shutil.copy("src/kg_alzheimers/ingests/panther/genome_orthologs.py", tmp_path)
+    return config_file
+
+
+def read_edges(path):
+    with open(path) as fh:
+        return list(csv.DictReader(fh, delimiter="\t"))
+
+
+def test_same_edges_as_koza(tmp_path, config_file):
+    transform_source(
+        source=str(config_file), output_dir=str(tmp_path / "koza"), output_format=OutputFormat.tsv, verbose=False
+    )
+    count = transform(output_dir=str(tmp_path / "columnar"), config_file=config_file)
+
+    koza_edges = read_edges(tmp_path / "koza" / "panther_genome_orthologs_edges.tsv")
+    columnar_edges = read_edges(tmp_path / "columnar" / "panther_genome_orthologs_edges.tsv")
+    assert count == len(columnar_edges)
+    assert list(columnar_edges[0]) == list(koza_edges[0])
+    assert columnar_edges == koza_edges
+    assert all(edge["id"].startswith("uuid:") for edge in columnar_edges)
+
+
+def test_parse_genes():
+    assert parse_genes(
+        pyarrow.array(
+            [
+                "HUMAN|HGNC=11477|UniProtKB=Q6GZX4",
+                "MOUSE|MGI=MGI=98446|UniProtKB=Q62276",
+                "WORM|WormBase=WBGene00007022|UniProtKB=Q197F5",
+                "HUMAN|Gene=SYMBOL|UniProtKB=Q15528",
+                "HUMAN|HGNC=11477&UniProtKB=Q15528",
+            ]
+        )
+    ).to_pylist() == ["HGNC:11477", "MGI:98446", "WB:WBGene00007022", None, None]
+
+
+def test_row_limit(tmp_path, config_file):
+    transform(output_dir=str(tmp_path / "columnar"), row_limit=10, config_file=config_file)
+    with open(tmp_path / "columnar" / "panther_genome_orthologs_edges.tsv") as fh:
+        assert len(fh.readlines()) <= 11
@@ -0,0 +1,244 @@
+import csv
+import io
+import tarfile
+
+import pandas
+import pytest
+
+from kg_alzheimers.columnar import phenio
+
+NODES = [
+    ["id", "category", "name", "provided_by"],
+    ["HP:0000001", "biolink:PhenotypicFeature", "All", "phenio"],
+    ["OBO:FBbt_00000001", "biolink:AnatomicalEntity", 'organism "fly"', "phenio"],
+    ["OBO:ZFA_0000001", "biolink:AnatomicalEntity", "zebrafish anatomy", "phenio"],
+    ["GO:0008150", "biolink:Occurrent", "biological_process", "phenio"],
+    ["MGI:97490", "biolink:Gene", "Pax6", "phenio"],
+    ["http://omim.org/entry/1", "biolink:Disease", "omim", "phenio"],
+    ["HGNC:5", "biolink:Gene", "A1BG", "phenio"],
+    ["biolink:Gene", "biolink:Gene", "", "phenio"],
+    ["UPHENO:0000001", "biolink:OntologyClass|biolink:Fake", "affected", "phenio"],
+    ["CHEBI:1", "", "no category", "NA"],
+    ["MONDO:0000001", "biolink:Disease", "disease", "phenio"],
+]
+EDGES = [
+    [
+        "id",
+        "subject",
+        "predicate",
+        "object",
+        "category",
+        "relation",
+        "aggregator_knowledge_source",
+        "primary_knowledge_source",
+    ],
+    [
+        "e1",
+        "HP:0000002",
+        "biolink:subclass_of",
+        "HP:0000001",
+        "biolink:Association",
+        "rdfs:subClassOf",
+        "infores:phenio",
+        "infores:hpo",
+    ],
+    [
+        "e2",
+        "OBO:WBbt_0000001",
+        "biolink:part_of",
+        "OBO:XAO_0000001",
+        "",
+        "BFO:0000050",
+        "infores:monarchinitiative|infores:phenio",
+        "infores:wbbt",
+    ],
+    ["e3", "HGNC:5", "biolink:subclass_of", "HP:0000001", "biolink:Association", "", "infores:phenio", ""],
+    [
+        "e4",
+        "HP:0000003",
+        "biolink:subclass_of",
+        "http://example.org/x",
+        "biolink:Association",
+        "",
+        "infores:phenio",
+        "",
+    ],
+    ["e5", "HP:0000004", "subclass_of", "HP:0000001", "biolink:Association", "", "infores:phenio", ""],
+    ["e6", "HP:0000005", "biolink:not_a_predicate", "HP:0000001", "biolink:Association", "", "infores:phenio", ""],
+    ["e7", "HP:0000006", "biolink:subclass_of", "HP:0000001", "biolink:NotAnAssociation", "", "infores:phenio", ""],
+    ["e8", "", "biolink:subclass_of", "HP:0000001", "biolink:Association", "", "infores:phenio", ""],
+    [
+        "e9",
+        "MONDO:0000002",
+        "biolink:subclass_of",
+        "MONDO:0000001",
+        "biolink:Association",
+        "",
+        "infores:phenio",
+        'infores:"mondo"',
+    ],
+]
+VALID_NODE_CATEGORIES = {
+    "biolink:PhenotypicFeature",
+    "biolink:AnatomicalEntity",
+    "biolink:BiologicalProcessOrActivity",
+    "biolink:Gene",
+    "biolink:Disease",
+}
+VALID_PREDICATES = {"biolink:subclass_of", "biolink:part_of"}
+VALID_EDGE_CATEGORIES = {"biolink:Association"}
+
+
+def pandas_transform(nodefile, edgefile, output_dir, qc_dir):
+    """The pandas version of the Phenio transform, before it was moved to the columnar engine"""
+    nodes_df = pandas.read_csv(nodefile, sep="\t", dtype="string", quoting=csv.QUOTE_NONE, lineterminator="\n")
+    nodes_df = nodes_df[~nodes_df["id"].str.contains("omim.org|hgnc_id")]
+    nodes_df = nodes_df[~nodes_df["id"].str.startswith("MGI:")]
+    obo_prefixes_to_repair = ["FBbt", "WBbt", "ZFA", "XAO"]
+    for prefix in obo_prefixes_to_repair:
+        nodes_df["id"] = nodes_df["id"].str.replace(f"OBO:{prefix}_", f"{prefix}:")
+    exclude_prefixes = ["HGNC", "FlyBase", "http", "biolink"]
+    excluded_nodes = nodes_df[nodes_df["id"].str.startswith(tuple(exclude_prefixes))]
+    nodes_df = nodes_df[~nodes_df["id"].str.startswith(tuple(exclude_prefixes))]
+    nodes_df["category"] = nodes_df["category"].str.replace("biolink:Occurrent", "biolink:BiologicalProcessOrActivity")
+    invalid_node_categories = set(nodes_df["category"].unique()) - VALID_NODE_CATEGORIES
+    if invalid_node_categories:
+        invalid_node_categories_df = nodes_df[nodes_df["category"].isin(invalid_node_categories)]
+        excluded_nodes = pandas.concat([excluded_nodes, invalid_node_categories_df])
+        nodes_df = nodes_df[~nodes_df["category"].isin(invalid_node_categories)]
+    excluded_nodes.to_csv(qc_dir / "excluded_phenio_nodes.tsv", sep="\t", index=False)
+    nodes_df.to_csv(output_dir / "phenio_nodes.tsv", sep="\t", index=False)
+
+    edges_df = pandas.read_csv(edgefile, sep="\t", dtype="string", quoting=csv.QUOTE_NONE, lineterminator="\n")
+    edges_df.drop(edges_df.columns.difference(phenio.EDGE_COLUMNS), axis=1, inplace=True)
+    if "knowledge_level" not in edges_df.columns:
+        edges_df["knowledge_level"] = "knowledge_assertion"
+    if "agent_type" not in edges_df.columns:
+        edges_df["agent_type"] = "manual_agent"
+    edges_df["aggregator_knowledge_source"] = edges_df["aggregator_knowledge_source"].apply(
+        lambda x: f"infores:monarchinitiative|{x}" if not x.startswith("infores:monarchinitiative") else x
+    )
+    edges_df = edges_df[edges_df["predicate"].str.contains(":")]
+    edges_df["category"] = edges_df["category"].fillna("biolink:Association")
+    for prefix in obo_prefixes_to_repair:
+        for field in ["subject", "object"]:
+            edges_df[field] = edges_df[field].str.replace(f"OBO:{prefix}_", f"{prefix}:")
+    edges_df = edges_df[~edges_df["subject"].isna() & ~edges_df["object"].isna()]
+    edges_df = edges_df[
+        ~edges_df["subject"].str.startswith(tuple(exclude_prefixes))
+        & ~edges_df["object"].str.startswith(tuple(exclude_prefixes))
+    ]
+    edges_df = edges_df[edges_df["predicate"].isin(VALID_PREDICATES)]
+    edges_df = edges_df[edges_df["category"].isin(VALID_EDGE_CATEGORIES)]
+    edges_df.to_csv(output_dir / "phenio_edges.tsv", sep="\t", index=False)
+
+
+def _tsv(rows):
+    return "".join("\t".join(row) + "\n" for row in rows).encode()
+
+
+@pytest.fixture
+def phenio_tar(tmp_path):
+    path = tmp_path / "kg-phenio.tar.gz"
+    with tarfile.open(path, "w:gz") as tar:
+        for name, rows in [(phenio.NODES_MEMBER, NODES), (phenio.EDGES_MEMBER, EDGES)]:
+            data = _tsv(rows)
+            (tmp_path / name).write_bytes(data)
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+def test_same_output_as_pandas(phenio_tar, tmp_path):
+    expected = tmp_path / "pandas"
+    expected.mkdir()
+    pandas_transform(tmp_path / phenio.NODES_MEMBER, tmp_path / phenio.EDGES_MEMBER, expected, expected)
+
+    output = tmp_path / "columnar"
+    counts = phenio.transform(
+        output_dir=str(output),
+        qc_dir=str(output / "qc"),
+        valid_node_categories=VALID_NODE_CATEGORIES,
+        valid_predicates=VALID_PREDICATES,
+        valid_edge_categories=VALID_EDGE_CATEGORIES,
+        archive=str(phenio_tar),
+        cache_dir=str(tmp_path / "cache"),
+    )
+    assert counts == {"nodes": 5, "edges": 3, "excluded_nodes": 4, "rows_read": 20}
+    for name in ["phenio_nodes.tsv", "phenio_edges.tsv"]:
+        assert (output / name).read_text() == (expected / name).read_text()
+    assert (output / "qc" / "excluded_phenio_nodes.tsv").read_text() == (
+        expected / "excluded_phenio_nodes.tsv"
+    ).read_text()
+
+
+def test_small_batches(phenio_tar, tmp_path, monkeypatch):
+    monkeypatch.setattr(phenio, "BLOCK_SIZE", 256)
+    monkeypatch.setattr(phenio, "BATCH_ROWS", 2)
+    output = tmp_path / "columnar"
+    counts = phenio.transform(
+        output_dir=str(output),
+        qc_dir=str(output / "qc"),
+        valid_node_categories=VALID_NODE_CATEGORIES,
+        valid_predicates=VALID_PREDICATES,
+        valid_edge_categories=VALID_EDGE_CATEGORIES,
+        archive=str(phenio_tar),
+        cache_dir=str(tmp_path / "cache"),
+    )
+    assert counts == {"nodes": 5, "edges": 3, "excluded_nodes": 4, "rows_read": 20}
+    excluded = (output / "qc" / "excluded_phenio_nodes.tsv").read_text().splitlines()
+    # excluded for their prefix first, then for their category
+    assert [line.split("\t")[0] for line in excluded[1:]] == ["HGNC:5", "biolink:Gene", "UPHENO:0000001", "CHEBI:1"]
+
+
+def test_parquet_output(phenio_tar, tmp_path):
+    import pyarrow.parquet as pq
+
+    kwargs = dict(
+        valid_node_categories=VALID_NODE_CATEGORIES,
+        valid_predicates=VALID_PREDICATES,
+        valid_edge_categories=VALID_EDGE_CATEGORIES,
+        archive=str(phenio_tar),
+        cache_dir=str(tmp_path / "cache"),
+    )
+    phenio.transform(output_dir=str(tmp_path / "tsv"), qc_dir=str(tmp_path / "qc"), **kwargs)
+    counts = phenio.transform(
+        output_dir=str(tmp_path / "parquet"), qc_dir=str(tmp_path / "qc"), output_format="parquet", **kwargs
+    )
+    assert counts == {"nodes": 5, "edges": 3, "excluded_nodes": 4, "rows_read": 20}
+    for name in ["phenio_nodes", "phenio_edges"]:
+        expected = pandas.read_csv(tmp_path / "tsv" / f"{name}.tsv", sep="\t", dtype=str, keep_default_na=False)
+        table = pq.read_table(tmp_path / "parquet" / f"{name}.parquet")
+        assert table.column_names == list(expected.columns)
+        assert table.num_rows == len(expected)
+    assert (
+        pq.read_table(tmp_path / "parquet" / "phenio_nodes.parquet").column("name").to_pylist()[1] == 'organism "fly"'
+    )
+
+
+def test_members_cached_per_release(phenio_tar, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    members = phenio.cached_members(str(phenio_tar), str(cache), tag="v2024-01-01")
+    assert members[phenio.NODES_MEMBER] == cache / "v2024-01-01" / "merged-kg_nodes.parquet"
+    schema, batches = phenio.read_cached(members[phenio.EDGES_MEMBER])
+    assert schema.names == EDGES[0]
+    assert sum(len(batch) for batch in batches) == len(EDGES) - 1
+
+    def _no_tar(archive, member):
+        raise AssertionError("read the tarball again")
+
+    monkeypatch.setattr(phenio, "open_member", _no_tar)
+    assert phenio.cached_members(str(phenio_tar), str(cache), tag="v2024-01-01") == members
+
+    monkeypatch.undo()
+    phenio_tar.touch()
+    phenio.cached_members(str(phenio_tar), str(cache), tag="v2024-02-01")
+    assert [path.name for path in cache.iterdir()] == ["v2024-02-01"]
+
+
+def test_phenio_release_tag(tmp_path):
+    metadata = tmp_path / "metadata.yaml"
+    assert phenio.phenio_release_tag(str(metadata)) is None
+    metadata.write_text("data:\n  phenio: v2024-03-01\n  alliance: 7.0.0\n")
+    assert phenio.phenio_release_tag(str(metadata)) == "v2024-03-01"
@@ -0,0 +1,171 @@
+"""
+The columnar STRING engine should write the same edges as the Koza ingest
+"""
+
+import csv
+import gzip
+
+import pytest
+import yaml
+from koza.utils.testing_utils import mock_koza  # noqa: F401
+
+from kg_alzheimers.columnar.string_protein_links import transform
+from kg_alzheimers.utils.id_utils import get_id_strategy, set_id_strategy
+
+COLUMNS = [
+    "protein1",
+    "protein2",
+    "neighborhood",
+    "fusion",
+    "cooccurence",
+    "coexpression",
+    "experimental",
+    "database",
+    "textmining",
+    "combined_score",
+]
+
+ENTREZ_2_STRING = [
+    ("10090", "14679", "10090.ENSMUSP00000000001"),
+    ("10090", "56480", "10090.ENSMUSP00000020316"),
+    ("9606", "801|805|808", "9606.ENSP00000349467"),
+    ("9606", "123|381", "9606.ENSP00000000233"),
+    ("9606", "", "9606.ENSP00000000005"),
+]
+
+ROWS = [
+    ["10090.ENSMUSP00000000001", "10090.ENSMUSP00000020316", 0, 0, 0, 116, 90, 0, 67, 783],
+    # reversed duplicate of the first row
+    ["10090.ENSMUSP00000020316", "10090.ENSMUSP00000000001", 0, 0, 0, 116, 90, 0, 67, 783],
+    ["9606.ENSP00000349467", "9606.ENSP00000000233", 12, 0, 5, 0, 0, 900, 0, 950],
+    # filtered out by combined_score
+    ["9606.ENSP00000000233", "9606.ENSP00000349467", 12, 0, 5, 0, 0, 900, 0, 650],
+    # no evidence scores
+    ["9606.ENSP00000000233", "10090.ENSMUSP00000000001", 0, 0, 0, 0, 0, 0, 0, 701],
+    # no entrez mapping
+    ["9606.ENSP00000000005", "9606.ENSP00000000233", 0, 0, 0, 0, 300, 0, 0, 800],
+    # not in the map file
+    ["9606.ENSP00000099999", "9606.ENSP00000000233", 0, 0, 0, 0, 300, 0, 0, 800],
+]
+
+
+@pytest.fixture(autouse=True)
+def hash_ids():
+    # both engines give an edge the same id only with hash ids
+    previous = get_id_strategy()
+    set_id_strategy("hash")
+    yield
+    set_id_strategy(previous)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    links = tmp_path / "9606.protein_links.txt.gz"
+    with gzip.open(links, "wt") as fh:
+        fh.write(" ".join(COLUMNS) + "\n")
+        for row in ROWS:
+            fh.write(" ".join(str(value) for value in row) + "\n")
+
+    entrez_2_string = tmp_path / "entrez_2_string.tsv"
+    with open(entrez_2_string, "w") as fh:
+        fh.write("#NCBI taxid / entrez / STRING\n")
+        fh.writelines("\t".join(entry) + "\n" for entry in ENTREZ_2_STRING)
+
+    map_file = tmp_path / "entrez-2-string.yaml"
+    with open("src/kg_alzheimers/maps/entrez-2-string.yaml") as fh:
+        map_config = yaml.safe_load(fh)
+    map_config["files"] = [str(entrez_2_string)]
+    map_file.write_text(yaml.safe_dump(map_config))
+
+    config = tmp_path / "protein_links.yaml"
+    with open("src/kg_alzheimers/ingests/string/protein_links.yaml") as fh:
+        ingest_config = yaml.safe_load(fh)
+    ingest_config["files"] = [str(links)]
+    ingest_config["depends_on"] = [str(map_file)]
+    config.write_text(yaml.safe_dump(ingest_config))
+    return config
+
+
+@pytest.fixture
+def columnar_edges(tmp_path, config_file):
+    transform(output_dir=str(tmp_path / "output"), config_file=config_file)
+    with open(tmp_path / "output" / "string_protein_links_edges.tsv") as fh:
+        return list(csv.DictReader(fh, delimiter="\t"))
+
+
+@pytest.fixture
+def koza_edges(mock_koza, global_table):
+    map_cache = {"entrez_2_string": {string: {"entrez": entrez} for _, entrez, string in ENTREZ_2_STRING}}
+    # Koza drops rows below the combined_score filter, and rows with a protein that isn't in the map
+    rows = [
+        {column: str(value) for column, value in zip(COLUMNS, row)}
+        for row in ROWS
+        if row[-1] > 700 and all(protein in map_cache["entrez_2_string"] for protein in row[:2])
+    ]
+    return mock_koza(
+        name="string_protein_links",
+        data=rows,
+        transform_code="./src/kg_alzheimers/ingests/string/protein_links.py",
+        global_table=global_table,
+        map_cache=map_cache,
+    )
+
+
+def test_header_matches_koza_column_order(tmp_path, config_file):
+    transform(output_dir=str(tmp_path / "output"), config_file=config_file)
+    with open(tmp_path / "output" / "string_protein_links_edges.tsv") as fh:
+        header = fh.readline().rstrip("\n").split("\t")
+    assert header == [
+        "id",
+        "subject",
+        "predicate",
+        "object",
+        "category",
+        "agent_type",
+        "aggregator_knowledge_source",
+        "has_evidence",
+        "knowledge_level",
+        "primary_knowledge_source",
+    ]
+
+
+def test_same_edges_as_koza(columnar_edges, koza_edges):
+    expected = [
+        (
+            edge.id,
+            edge.subject,
+            edge.object,
+            "|".join(edge.has_evidence or []),
+            edge.agent_type,
+            edge.knowledge_level,
+            edge.primary_knowledge_source,
+            "|".join(edge.aggregator_knowledge_source),
+        )
+        for edge in koza_edges
+    ]
+    actual = [
+        (
+            edge["id"],
+            edge["subject"],
+            edge["object"],
+            edge["has_evidence"],
+            edge["agent_type"],
+            edge["knowledge_level"],
+            edge["primary_knowledge_source"],
+            edge["aggregator_knowledge_source"],
+        )
+        for edge in columnar_edges
+    ]
+    assert actual == expected
+    assert len(actual) == 1 + 3 * 2 + 2
+
+
+def test_edges_have_ids_and_category(columnar_edges):
+    assert all(edge["id"].startswith("uuid:") for edge in columnar_edges)
+    assert len({edge["id"] for edge in columnar_edges}) == len(columnar_edges)
+    assert all(edge["category"] == "biolink:PairwiseGeneToGeneInteraction" for edge in columnar_edges)
+    assert all(edge["predicate"] == "biolink:interacts_with" for edge in columnar_edges)
+
+
+def test_row_limit(tmp_path, config_file):
+    assert transform(output_dir=str(tmp_path / "output"), row_limit=1, config_file=config_file) == 1
@@ -2,6 +2,8 @@
 Unit tests for STRING protein links ingest
 """
 
+import importlib.util
+
 import pytest
 from biolink_model.datamodel.pydanticmodel_v2 import PairwiseGeneToGeneInteraction
 from koza.utils.testing_utils import mock_koza  # noqa: F401
@@ -216,3 +218,48 @@ def test_duplicates_are_removed(duplicate_row_entities):
         association for association in duplicate_row_entities if isinstance(association, PairwiseGeneToGeneInteraction)
     ]
     assert len(associations) == 1
+
+
+def test_duplicates_are_removed_across_runs(
+    mock_koza, source_name, inverse_duplicate_rows, script, global_table, map_cache
+):
+    for _ in range(2):
+        entities = mock_koza(
+            name=source_name,
+            data=inverse_duplicate_rows,
+            transform_code=script,
+            global_table=global_table,
+            map_cache=map_cache,
+        )
+        assert len(entities) == 1
+
+
+@pytest.fixture
+def pair_filter():
+    spec = importlib.util.spec_from_file_location("string_utils", "./src/kg_alzheimers/ingests/string/string_utils.py")
+    string_utils = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(string_utils)
+    return string_utils.SymmetricPairFilter()
+
+
+def test_pair_filter_drops_reversed_pairs(pair_filter):
+    owner = object()
+    assert not pair_filter.is_duplicate(owner, "9606.A", "9606.B")
+    assert pair_filter.is_duplicate(owner, "9606.B", "9606.A")
+    assert pair_filter.is_duplicate(owner, "9606.A", "9606.B")
+    assert not pair_filter.is_duplicate(owner, "9606.A", "9606.C")
+    assert pair_filter.dropped == 2
+
+
+def test_pair_filter_is_cleared_per_taxon(pair_filter):
+    owner = object()
+    assert not pair_filter.is_duplicate(owner, "9606.A", "9606.B")
+    assert not pair_filter.is_duplicate(owner, "10090.A", "10090.B")
+    assert pair_filter.ids == {"10090.A": 0, "10090.B": 1}
+    assert len(pair_filter.pairs) == 1
+
+
+def test_pair_filter_is_reset_for_a_new_koza_app(pair_filter):
+    assert not pair_filter.is_duplicate(object(), "9606.A", "9606.B")
+    assert not pair_filter.is_duplicate(object(), "9606.B", "9606.A")
+    assert pair_filter.dropped == 0
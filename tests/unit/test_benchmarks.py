@@ -0,0 +1,40 @@
+import gzip
+import sys
+from pathlib import Path
+
+import yaml
+
+from kg_alzheimers.utils.ingest_utils import get_ingests
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "benchmarks"))
+
+from ingest_suite import parse_scale, write_config  # noqa: E402
+from synthetic_sources import GENERATORS, generate  # noqa: E402
+
+
+def test_every_ingest_has_a_generator():
+    configured = {name for name, ingest in get_ingests().items() if "config" in ingest}
+    assert set(GENERATORS) == configured
+
+
+def test_synthetic_configs(tmp_path):
+    for ingest in GENERATORS:
+        directory = tmp_path / ingest
+        config_file = write_config(ingest, generate(ingest, directory / "data", 100), directory)
+        config = yaml.safe_load(config_file.read_text())
+        for path in config.get("files", []) if "file_archive" not in config else [config["file_archive"]]:
+            assert Path(path).stat().st_size > 0, ingest
+        for map_file in config.get("depends_on", []):
+            (data,) = yaml.safe_load(Path(map_file).read_text())["files"]
+            assert Path(data).is_file(), ingest
+        assert (config_file.parent / config_file.with_suffix(".py").name).is_file()
+
+
+def test_generators_are_deterministic(tmp_path):
+    first = generate("ctd_chemical_to_disease", tmp_path / "a", 50)["files"][0]
+    second = generate("ctd_chemical_to_disease", tmp_path / "b", 50)["files"][0]
+    assert gzip.decompress(Path(first).read_bytes()) == gzip.decompress(Path(second).read_bytes())
+
+
+def test_parse_scale():
+    assert [parse_scale(scale) for scale in ["10k", "1M", "2.5k", "500"]] == [10000, 1000000, 2500, 500]
@@ -0,0 +1,26 @@
+"""
+Lazy imports of the ingest CLI
+
+main.py and cli_utils import their heavy dependencies inside the commands that use them, so `ingest --help`,
+`ingest download` and the parallel transform workers don't pay for duckdb, pandas, kgx and the rest. These run
+`python -X importtime` in a fresh interpreter and check what was imported. benchmarks/cli_startup.py times it.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "benchmarks"))
+
+from cli_startup import RUN_CLI, heavy_modules, import_times  # noqa: E402
+
+
+@pytest.mark.parametrize("command", [["--help"], ["--version"], ["download", "--help"], ["transform", "--help"]])
+def test_cli_startup(command):
+    assert heavy_modules(import_times(["-c", RUN_CLI, *command])) == []
+
+
+def test_cli_utils_imports_lazily():
+    # the commands' own dependencies are imported when the command runs
+    assert heavy_modules(import_times(["-c", "import kg_alzheimers.cli_utils"])) == []
@@ -0,0 +1,98 @@
+"""
+Static check for per-row work in ingest loops that could be done once
+
+Koza calls a transform's row loop for every row of the source, so anything in it that doesn't depend on
+the row is repeated millions of times. This flags, inside any loop of an ingest module:
+
+- koza_app.get_map("...") of a constant map name
+- resolve_term("...") of a constant term
+- a list, set or dict of constants assigned to a name
+
+Bind these once before the loop instead.
+"""
+
+import ast
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+import kg_alzheimers
+
+INGESTS_DIR = Path(kg_alzheimers.__file__).parent / "ingests"
+INGEST_MODULES = sorted(INGESTS_DIR.rglob("*.py"))
+
+
+def _is_constant(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant)
+
+
+def _is_constant_container(node: ast.AST) -> bool:
+    if isinstance(node, (ast.List, ast.Set)):
+        return bool(node.elts) and all(_is_constant(element) for element in node.elts)
+    if isinstance(node, ast.Dict):
+        return bool(node.keys) and all(
+            key is not None and _is_constant(key) and _is_constant(value) for key, value in zip(node.keys, node.values)
+        )
+    return False
+
+
+def _loop_invariant(node: ast.AST) -> str:
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.args:
+        if node.func.attr in ("get_map", "resolve_term") and all(_is_constant(arg) for arg in node.args):
+            return f"{node.func.attr}({ast.unparse(node.args[0])})"
+    if isinstance(node, ast.Assign) and _is_constant_container(node.value):
+        return f"constant {type(node.value).__name__.lower()} {ast.unparse(node.targets[0])}"
+    return ""
+
+
+def find_loop_invariants(source: str) -> List[Tuple[int, str]]:
+    """Line numbers and descriptions of loop-invariant work inside loops, functions defined in a loop are skipped"""
+    found = []
+
+    def _visit(node: ast.AST, in_loop: bool):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            in_loop = False
+        if in_loop and (description := _loop_invariant(node)):
+            found.append((node.lineno, description))
+        for child in ast.iter_child_nodes(node):
+            # a for loop's iterable is evaluated once, everything else in a loop on every iteration
+            in_body = isinstance(node, ast.While) or (isinstance(node, ast.For) and child is not node.iter)
+            _visit(child, in_loop or in_body)
+
+    _visit(ast.parse(source), False)
+    return sorted(found)
+
+
+def test_ingest_modules_are_found():
+    assert any(path.name == "protein_links.py" for path in INGEST_MODULES)
+
+
+@pytest.mark.parametrize("path", INGEST_MODULES, ids=lambda path: str(path.relative_to(INGESTS_DIR)))
+def test_no_per_row_invariants(path):
+    found = find_loop_invariants(path.read_text())
+    assert not found, "\n".join(f"{path}:{line}: {description} in a loop" for line, description in found)
+
+
+def test_find_loop_invariants():
+    source = """
+taxon_labels = koza_app.get_map("taxon-labels")
+while (row := koza_app.get_row()) is not None:
+    genes = koza_app.get_map("genes")
+    relation = koza_app.translation_table.resolve_term("mentions")
+    evidence = koza_app.translation_table.resolve_term(row["evidence"])
+    columns = ["a", "b"]
+    ids = [row["a"], "b"]
+    if row["type"] in ["a", "b"]:
+        for name in ["a", "b"]:
+            sources = {"a": "b"}
+
+    def parse(row):
+        return koza_app.get_map("genes")
+"""
+    assert find_loop_invariants(source) == [
+        (4, "get_map('genes')"),
+        (5, "resolve_term('mentions')"),
+        (7, "constant list columns"),
+        (11, "constant dict sources"),
+    ]
@@ -0,0 +1,80 @@
+import pytest
+from biolink_model.datamodel.pydanticmodel_v2 import (
+    AgentTypeEnum,
+    InformationContentEntityToNamedThingAssociation,
+    KnowledgeLevelEnum,
+)
+from pydantic import ValidationError
+
+from kg_alzheimers.utils.association_utils import AssociationFactory, association_factory, pop_factory_reports
+
+CONSTANTS = dict(
+    predicate="biolink:mentions",
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:zfin",
+    knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+    agent_type=AgentTypeEnum.manual_agent,
+)
+
+
+@pytest.fixture
+def factory():
+    return AssociationFactory(InformationContentEntityToNamedThingAssociation, **CONSTANTS)
+
+
+def row_fields(i):
+    fields = dict(id=f"uuid:{i}", subject=f"ZFIN:ZDB-PUB-{i}", object=f"ZFIN:ZDB-GENE-{i}")
+    if i % 3 == 0:
+        fields["publications"] = [f"PMID:{i}"]
+    return fields
+
+
+def test_same_associations_as_validation(factory):
+    for i in range(250):
+        association = factory(**row_fields(i))
+        expected = InformationContentEntityToNamedThingAssociation(**CONSTANTS, **row_fields(i))
+        assert isinstance(association, InformationContentEntityToNamedThingAssociation)
+        assert dict(association) == dict(expected)
+        assert association.model_fields_set == expected.model_fields_set
+    assert factory.fast_path
+    assert factory.validated == 3
+
+
+def test_lists_are_not_shared(factory):
+    first = factory(**row_fields(1))
+    second = factory(**row_fields(2))
+    second.aggregator_knowledge_source.append("infores:other")
+    second.category.append("biolink:Association")
+    assert factory(**row_fields(4)).aggregator_knowledge_source == ["infores:monarchinitiative"]
+    assert (
+        first.category
+        == factory(**row_fields(5)).category
+        == ["biolink:InformationContentEntityToNamedThingAssociation"]
+    )
+
+
+def test_invalid_rows_still_raise(factory):
+    factory(**row_fields(1))
+    with pytest.raises(ValidationError):
+        factory(id="uuid:2", subject="ZFIN:1")
+
+
+def test_mismatch_turns_off_fast_path():
+    factory = AssociationFactory(InformationContentEntityToNamedThingAssociation, sample_rate=1, **CONSTANTS)
+    factory(**row_fields(1))
+    # a tuple is coerced to a list by validation, but would be kept as is by the fast path
+    factory(**row_fields(2), publications=("PMID:1",))
+    assert not factory.fast_path
+    assert factory(**row_fields(4), publications=("PMID:1",)).publications == ["PMID:1"]
+
+
+def test_factories_are_cached_and_report_savings():
+    factory = association_factory(InformationContentEntityToNamedThingAssociation, **CONSTANTS)
+    assert association_factory(InformationContentEntityToNamedThingAssociation, **CONSTANTS) is factory
+    pop_factory_reports()
+    for i in range(300):
+        factory(**row_fields(i))
+    (report,) = pop_factory_reports()
+    assert "300 rows, 4 validated" in report
+    assert "saved" in report
+    assert factory.rows == 0
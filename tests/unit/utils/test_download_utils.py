@@ -0,0 +1,293 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import yaml
+
+from kg_alzheimers.utils import download_utils
+from kg_alzheimers.utils.download_utils import (
+    download_resource,
+    download_resources,
+    fetch_pass_through,
+    load_resources,
+    read_sidecar,
+    sidecar_path,
+)
+
+
+class FileServer(ThreadingHTTPServer):
+    """A stand-in for the upstream servers, serving files from a dict with ETag, Last-Modified and range support"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FileHandler)
+        self.files = {}
+        self.requests = []
+        self.drop_after = {}  # path -> bytes to send before dropping the connection, once
+        self.allow_head = True
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def put(self, path: str, body: bytes):
+        self.files[path] = {
+            "body": body,
+            "etag": f'"{hashlib.md5(body).hexdigest()}"',
+            "last_modified": formatdate(time.time(), usegmt=True),
+        }
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+    def counts(self) -> Counter:
+        return Counter(method for method, _, _ in self.requests)
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def _respond(self, send_body: bool):
+        server = self.server
+        server.requests.append((self.command, self.path, dict(self.headers)))
+        if not send_body and not server.allow_head:
+            self.send_error(405)
+            return
+        file = server.files.get(self.path)
+        if file is None:
+            self.send_error(404)
+            return
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.delay)
+            self._send(file, send_body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, file, send_body: bool):
+        body = file["body"]
+        if self.headers.get("If-None-Match") == file["etag"]:
+            self.send_response(304)
+            self.end_headers()
+            return
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") in (file["etag"], file["last_modified"]):
+            start = int(range_header.split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.send_header("ETag", file["etag"])
+        self.send_header("Last-Modified", file["last_modified"])
+        self.end_headers()
+        if not send_body:
+            return
+        drop_after = self.server.drop_after.pop(self.path, None)
+        if drop_after is not None:
+            self.wfile.write(body[start : start + drop_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body[start:])
+
+
+@pytest.fixture
+def server():
+    server = FileServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _resource(server, path, **kwargs):
+    return {"url": server.url(path), "local_name": f"data{path}", **kwargs}
+
+
+def test_download_then_head_only(server, tmp_path):
+    server.put("/a.tsv", b"a\tb\n" * 1000)
+    server.put("/b.tsv", b"c\td\n" * 10)
+    resources = [_resource(server, "/a.tsv"), _resource(server, "/b.tsv")]
+
+    results = download_resources(resources, output_dir=str(tmp_path))
+    assert [r["status"] for r in results] == ["downloaded", "downloaded"]
+    assert (tmp_path / "data/a.tsv").read_bytes() == server.files["/a.tsv"]["body"]
+    sidecar = read_sidecar(sidecar_path(tmp_path / "data/a.tsv"))
+    assert sidecar["etag"] == server.files["/a.tsv"]["etag"]
+    assert sidecar["sha256"] == hashlib.sha256(server.files["/a.tsv"]["body"]).hexdigest()
+    assert sorted(p.name for p in (tmp_path / "data").iterdir()) == [
+        ".a.tsv.download.json",
+        ".b.tsv.download.json",
+        "a.tsv",
+        "b.tsv",
+    ]
+
+    # nothing changed upstream: one conditional HEAD request per file
+    server.requests.clear()
+    results = download_resources(resources, output_dir=str(tmp_path))
+    assert [r["status"] for r in results] == ["unchanged", "unchanged"]
+    assert server.counts() == {"HEAD": 2}
+    assert all(headers["If-None-Match"] for _, _, headers in server.requests)
+
+
+def test_changed_upstream(server, tmp_path):
+    server.put("/a.tsv", b"old\n")
+    resource = _resource(server, "/a.tsv")
+    download_resource(resource, output_dir=str(tmp_path))
+    server.put("/a.tsv", b"new\n")
+    assert download_resource(resource, output_dir=str(tmp_path))["status"] == "downloaded"
+    assert (tmp_path / "data/a.tsv").read_bytes() == b"new\n"
+
+
+def test_local_copy_changed(server, tmp_path):
+    server.put("/a.tsv", b"original\n")
+    resource = _resource(server, "/a.tsv")
+    download_resource(resource, output_dir=str(tmp_path))
+    (tmp_path / "data/a.tsv").write_bytes(b"edited!!!\n")
+    assert download_resource(resource, output_dir=str(tmp_path))["status"] == "downloaded"
+    assert (tmp_path / "data/a.tsv").read_bytes() == b"original\n"
+
+    # touched, but the same content
+    (tmp_path / "data/a.tsv").touch()
+    assert download_resource(resource, output_dir=str(tmp_path))["status"] == "unchanged"
+
+
+def test_resume_interrupted_transfer(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_utils, "CHUNK_SIZE", 1000)
+    body = bytes(range(256)) * 400
+    server.put("/big.bin", body)
+    server.drop_after["/big.bin"] = 30000
+
+    result = download_resource(_resource(server, "/big.bin"), output_dir=str(tmp_path))
+    assert result["status"] == "resumed"
+    assert result["bytes"] == len(body) - 30000
+    assert (tmp_path / "data/big.bin").read_bytes() == body
+    assert not (tmp_path / "data/big.bin.part").exists()
+    gets = [headers for method, _, headers in server.requests if method == "GET"]
+    assert "Range" not in gets[0]
+    assert gets[1]["Range"] == "bytes=30000-"
+
+
+def test_resume_partial_file_from_previous_run(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_utils, "CHUNK_SIZE", 1000)
+    body = b"x" * 5000
+    server.put("/big.bin", body)
+    server.drop_after["/big.bin"] = 2000
+    monkeypatch.setattr(download_utils, "RETRIES", 1)
+    resource = _resource(server, "/big.bin")
+    assert download_resource(resource, output_dir=str(tmp_path))["status"] == "failed"
+    assert (tmp_path / "data/big.bin.part").stat().st_size == 2000
+
+    assert download_resource(resource, output_dir=str(tmp_path))["status"] == "resumed"
+    assert (tmp_path / "data/big.bin").read_bytes() == body
+
+    # the file changed upstream since the partial download, so it starts over
+    server.put("/big.bin", b"y" * 5000)
+    server.drop_after["/big.bin"] = 2000
+    assert download_resource(resource, output_dir=str(tmp_path))["status"] == "failed"
+    server.put("/big.bin", b"z" * 5000)
+    assert download_resource(resource, output_dir=str(tmp_path))["status"] == "downloaded"
+    assert (tmp_path / "data/big.bin").read_bytes() == b"z" * 5000
+
+
+def test_checksum(server, tmp_path):
+    server.put("/a.tsv", b"content\n")
+    good = _resource(server, "/a.tsv", sha256=hashlib.sha256(b"content\n").hexdigest())
+    assert download_resource(good, output_dir=str(tmp_path))["status"] == "downloaded"
+
+    bad = _resource(server, "/a.tsv", sha256="0" * 64, local_name="data/bad.tsv")
+    result = download_resource(bad, output_dir=str(tmp_path))
+    assert result["status"] == "failed"
+    assert "sha256 mismatch" in result["error"]
+    assert not (tmp_path / "data/bad.tsv").exists()
+    assert not (tmp_path / "data/bad.tsv.part").exists()
+
+
+def test_no_head_support(server, tmp_path):
+    server.allow_head = False
+    server.put("/a.tsv", b"content\n")
+    resource = _resource(server, "/a.tsv")
+    assert download_resource(resource, output_dir=str(tmp_path))["status"] == "downloaded"
+    server.requests.clear()
+    assert download_resource(resource, output_dir=str(tmp_path))["status"] == "unchanged"
+    assert server.counts() == {"HEAD": 1, "GET": 1}
+
+
+def test_missing_file(server, tmp_path):
+    result = download_resource(_resource(server, "/missing.tsv"), output_dir=str(tmp_path))
+    assert result["status"] == "failed"
+    assert "404" in result["error"]
+    assert server.counts() == {"HEAD": 1}
+
+
+def test_bounded_concurrency(server, tmp_path):
+    server.delay = 0.05
+    resources = []
+    for i in range(12):
+        server.put(f"/{i}.tsv", b"row\n")
+        resources.append(_resource(server, f"/{i}.tsv"))
+    results = download_resources(resources, output_dir=str(tmp_path), workers=8, per_host=3)
+    assert {r["status"] for r in results} == {"downloaded"}
+    assert 1 < server.max_active <= 3
+
+
+def test_load_resources(tmp_path, monkeypatch):
+    yaml_file = tmp_path / "download.yaml"
+    yaml_file.write_text(
+        """
+- url: https://example.org/files/a.tsv
+  local_name: data/a/a.tsv
+  tag: a
+- url: https://example.org/files/b.tsv?key={EXAMPLE_KEY}
+  tag: b
+- url: https://example.org/files/c.tsv
+"""
+    )
+    monkeypatch.setenv("EXAMPLE_KEY", "secret")
+    resources = load_resources(str(yaml_file))
+    assert [r["local_name"] for r in resources] == ["data/a/a.tsv", "b.tsv?key=secret", "c.tsv"]
+    assert resources[1]["url"] == "https://example.org/files/b.tsv?key=secret"
+    assert [r["local_name"] for r in load_resources(str(yaml_file), tags=["a"])] == ["data/a/a.tsv"]
+    assert sidecar_path(tmp_path / "data/a/a.tsv").name == ".a.tsv.download.json"
+
+
+def test_download_yaml_is_loadable():
+    resources = load_resources()
+    assert len(resources) > 50
+    assert all(r["url"].startswith(("http://", "https://")) for r in resources)
+
+
+def test_fetch_pass_through(server, tmp_path):
+    server.put("/x_nodes.tsv", b"id\tcategory\nA:1\tbiolink:Gene\nA:2\tbiolink:Gene\n")
+    server.put("/x_edges.tsv", b"id\tsubject\tobject\ne1\tA:1\tA:2")
+    urls = [server.url("/x_nodes.tsv"), server.url("/x_edges.tsv")]
+
+    rows = fetch_pass_through("x", urls, output_dir=str(tmp_path))
+    assert rows == {"x_nodes.tsv": 2, "x_edges.tsv": 1}
+    assert yaml.safe_load((tmp_path / "qc" / "x_rows.yaml").read_text()) == rows
+    # nothing but the files themselves in transform_output, for the merge
+    assert sorted(p.name for p in (tmp_path / "transform_output").iterdir()) == ["x_edges.tsv", "x_nodes.tsv"]
+
+    server.requests.clear()
+    assert fetch_pass_through("x", urls, output_dir=str(tmp_path)) == rows
+    assert server.counts() == {"HEAD": 2}
+
+    server.files.pop("/x_edges.tsv")
+    with pytest.raises(ValueError, match="x_edges.tsv"):
+        fetch_pass_through("x", urls, output_dir=str(tmp_path), force=True)
@@ -0,0 +1,102 @@
+import multiprocessing
+import re
+
+import duckdb
+import pytest
+
+from kg_alzheimers.utils import id_utils
+from kg_alzheimers.utils.id_utils import edge_id, get_id_strategy, hash_id, set_id_strategy, sql_edge_id
+
+UUID = re.compile(r"^uuid:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+@pytest.fixture
+def strategy():
+    previous = get_id_strategy()
+    yield set_id_strategy
+    set_id_strategy(previous)
+
+
+def test_hash_ids_are_stable(strategy):
+    strategy("hash")
+    first = edge_id("HGNC:1", "biolink:interacts_with", "HGNC:2", "infores:string", ["ECO:1", "ECO:2"])
+    assert UUID.match(first)
+    assert first == edge_id("HGNC:1", "biolink:interacts_with", "HGNC:2", "infores:string", ["ECO:1", "ECO:2"])
+    assert first == hash_id("HGNC:1", "biolink:interacts_with", "HGNC:2", "infores:string", "ECO:1|ECO:2")
+    assert first != edge_id("HGNC:1", "biolink:interacts_with", "HGNC:2", "infores:string", ["ECO:1"])
+    assert first != edge_id("HGNC:2", "biolink:interacts_with", "HGNC:1", "infores:string", ["ECO:1", "ECO:2"])
+
+
+def test_none_is_an_empty_part():
+    assert hash_id("a", None, "b") == hash_id("a", "", "b")
+    assert hash_id("a", None, "b") != hash_id("a", "b")
+
+
+def test_counter_ids(strategy):
+    strategy("counter")
+    ids = [edge_id("HGNC:1", "biolink:interacts_with", "HGNC:2", "infores:string") for _ in range(1000)]
+    assert len(set(ids)) == 1000
+    assert all(UUID.match(id) for id in ids)
+
+
+def test_uuid1_ids(strategy):
+    strategy("uuid1")
+    ids = {edge_id("HGNC:1", "biolink:interacts_with", "HGNC:2", "infores:string") for _ in range(100)}
+    assert len(ids) == 100
+    assert all(UUID.match(id) for id in ids)
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="Unknown id strategy"):
+        set_id_strategy("random")
+
+
+def test_sql_hash_ids_match(strategy):
+    strategy("hash")
+    rows = [("HGNC:1", "HGNC:2", "ECO:1|ECO:2"), ("HGNC:3", "HGNC:4", None), ("HGNC:5", "HGNC:6", "")]
+    expression = sql_edge_id(["subject", "'biolink:interacts_with'", "object", "'infores:string'", "evidence"])
+    result = duckdb.sql(
+        f"SELECT {expression} FROM (VALUES {', '.join('(?, ?, ?)' for _ in rows)}) t(subject, object, evidence)",
+        params=[value for row in rows for value in row],
+    ).fetchall()
+    assert [id for (id,) in result] == [
+        edge_id(subject, "biolink:interacts_with", object, "infores:string", evidence)
+        for subject, object, evidence in rows
+    ]
+
+
+@pytest.mark.parametrize("name", ["counter", "uuid1"])
+def test_sql_ids_are_unique(strategy, name):
+    strategy(name)
+    result = duckdb.sql(f"SELECT {sql_edge_id(['i'])} FROM range(1000) t(i)").fetchall()
+    assert len({id for (id,) in result}) == 1000
+    assert all(UUID.match(id) for (id,) in result)
+
+
+def test_counter_prefix_is_per_process():
+    assert id_utils._prefix != id_utils._counter_prefix()
+
+
+def _counter_ids(queue):
+    queue.put([edge_id("HGNC:1", "biolink:interacts_with", "HGNC:2", "infores:string") for _ in range(100)])
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_forked_workers_have_their_own_counter_ids(strategy):
+    strategy("counter")
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    workers = [context.Process(target=_counter_ids, args=(queue,)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    ids = [id for _ in workers for id in queue.get(timeout=30)]
+    for worker in workers:
+        worker.join()
+    assert len(set(ids)) == len(ids) == 300
+
+
+def test_set_id_strategy_reseeds_the_counter(strategy):
+    strategy("counter")
+    first = edge_id("HGNC:1", "biolink:interacts_with", "HGNC:2", "infores:string")
+    strategy("counter")
+    assert edge_id("HGNC:1", "biolink:interacts_with", "HGNC:2", "infores:string") != first
@@ -0,0 +1,98 @@
+import gzip
+import json
+
+import pytest
+import yaml
+from koza.io.reader.json_reader import JSONReader
+from koza.io.utils import open_resource
+from koza.model.config.source_config import PrimaryFileConfig
+from koza.model.source import Source
+
+from kg_alzheimers.utils.json_utils import StreamingJSONReader, json_reader, use_streaming_json_reader
+
+GENES = [
+    {
+        "basicGeneticEntity": {"primaryId": "MGI:1", "taxonId": "NCBITaxon:10090", "crossReferences": []},
+        "symbol": "Abc1",
+        "soTermId": "SO:0001217",
+        "score": 0.5,
+    },
+    {
+        "basicGeneticEntity": {"primaryId": "MGI:2", "taxonId": "NCBITaxon:10090", "crossReferences": []},
+        "symbol": "Abc2",
+        "soTermId": "SO:0001217",
+        "score": 1,
+    },
+    {
+        "basicGeneticEntity": {"primaryId": "MGI:3", "taxonId": "NCBITaxon:10090"},
+        "symbol": "Abc3 α",
+        "soTermId": "SO:0001217",
+        "score": 2.25,
+    },
+]
+
+
+@pytest.fixture
+def bgi_file(tmp_path):
+    path = tmp_path / "BGI_MGI.json.gz"
+    with gzip.open(path, "wt") as fh:
+        json.dump({"metaData": {"dataProvider": "MGI"}, "data": GENES}, fh)
+    return path
+
+
+def read_all(reader):
+    return list(reader)
+
+
+def test_same_rows_as_koza(bgi_file):
+    koza_rows = read_all(JSONReader(open_resource(bgi_file), json_path=["data"]))
+    rows = read_all(StreamingJSONReader(open_resource(bgi_file), ["data"]))
+    assert rows == koza_rows == GENES
+    assert isinstance(rows[0]["score"], float)
+
+
+def test_row_limit(bgi_file):
+    assert read_all(StreamingJSONReader(open_resource(bgi_file), ["data"], row_limit=2)) == GENES[:2]
+
+
+def test_required_properties(bgi_file):
+    reader = StreamingJSONReader(
+        open_resource(bgi_file), ["data"], required_properties=["basicGeneticEntity.crossReferences"]
+    )
+    next(reader)
+    next(reader)
+    with pytest.raises(ValueError, match="Required properties"):
+        next(reader)
+
+
+def test_nested_json_path(tmp_path):
+    path = tmp_path / "nested.json"
+    path.write_text(json.dumps({"outer": {"data": GENES}}))
+    assert read_all(StreamingJSONReader(open_resource(path), ["outer", "data"])) == GENES
+
+
+def test_reads_incrementally(tmp_path):
+    path = tmp_path / "large.json"
+    path.write_text(json.dumps({"data": GENES * 10000}))
+    fh = open_resource(path)
+    reader = StreamingJSONReader(fh, ["data"])
+    assert next(reader) == GENES[0]
+    assert fh.buffer.tell() < path.stat().st_size / 10
+
+
+def test_json_reader_falls_back_to_koza(tmp_path):
+    path = tmp_path / "object.yaml"
+    path.write_text(yaml.safe_dump({"data": GENES}))
+    assert isinstance(json_reader(open_resource(path), json_path=["data"], is_yaml=True), JSONReader)
+    assert isinstance(json_reader(open_resource(path), json_path=None, is_yaml=True), JSONReader)
+
+
+def test_koza_source_streams(bgi_file, monkeypatch):
+    monkeypatch.setattr("koza.model.source.JSONReader", JSONReader)
+    use_streaming_json_reader()
+    with open("src/kg_alzheimers/ingests/alliance/gene.yaml") as fh:
+        config = yaml.safe_load(fh)
+    config["files"] = [str(bgi_file), str(bgi_file)]
+    source = Source(PrimaryFileConfig(**config))
+    assert all(isinstance(reader, StreamingJSONReader) for reader in source._readers)
+    assert list(source) == GENES * 2
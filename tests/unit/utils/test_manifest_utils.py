@@ -0,0 +1,143 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from kg_alzheimers.utils import manifest_utils
+from kg_alzheimers.utils.manifest_utils import (
+    PHENIO_INPUTS,
+    changed_inputs,
+    ingest_inputs,
+    ingest_settings,
+    is_up_to_date,
+    load_manifest,
+    manifest_path,
+    package_modules,
+    record_manifest,
+)
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    config = tmp_path / "ingest.yaml"
+    config.write_text("name: test\n")
+    data = tmp_path / "data.tsv"
+    data.write_text("a\tb\n")
+    return [str(config), str(data)]
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    return str(tmp_path / "output")
+
+
+def test_no_manifest_is_not_up_to_date(inputs, output_dir):
+    assert changed_inputs("test", inputs, output_dir) == ["<no manifest>"]
+    assert not is_up_to_date("test", inputs, output_dir)
+
+
+def test_recorded_inputs_are_up_to_date(inputs, output_dir):
+    record_manifest("test", inputs, output_dir)
+    assert manifest_path("test", output_dir).is_file()
+    assert is_up_to_date("test", inputs, output_dir)
+
+
+def test_changed_content_is_detected(inputs, output_dir):
+    record_manifest("test", inputs, output_dir)
+    with open(inputs[1], "a") as fh:
+        fh.write("c\td\n")
+    assert changed_inputs("test", inputs, output_dir) == [inputs[1]]
+
+
+def test_touched_but_identical_file_is_up_to_date(inputs, output_dir):
+    record_manifest("test", inputs, output_dir)
+    stat = os.stat(inputs[1])
+    os.utime(inputs[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert is_up_to_date("test", inputs, output_dir)
+
+
+def test_missing_input_is_never_up_to_date(inputs, output_dir):
+    record_manifest("test", inputs, output_dir)
+    os.remove(inputs[1])
+    assert changed_inputs("test", inputs, output_dir) == [inputs[1]]
+
+
+def test_added_input_is_detected(inputs, output_dir, tmp_path):
+    record_manifest("test", inputs, output_dir)
+    extra = tmp_path / "map.tsv"
+    extra.write_text("x\n")
+    assert changed_inputs("test", inputs + [str(extra)], output_dir) == [str(extra)]
+
+
+def test_package_version_change_is_detected(inputs, output_dir, monkeypatch):
+    record_manifest("test", inputs, output_dir)
+    monkeypatch.setattr(manifest_utils, "package_versions", lambda: {"kg-alzheimers": "99.0.0"})
+    assert changed_inputs("test", inputs, output_dir) == ["<versions>"]
+
+
+def test_corrupt_manifest_is_ignored(inputs, output_dir):
+    record_manifest("test", inputs, output_dir)
+    manifest_path("test", output_dir).write_text("{")
+    assert load_manifest("test", output_dir) is None
+    assert not is_up_to_date("test", inputs, output_dir)
+
+
+def test_manifest_records_hashes(inputs, output_dir):
+    record_manifest("test", inputs, output_dir)
+    with open(manifest_path("test", output_dir)) as fh:
+        manifest = json.load(fh)
+    assert set(manifest["inputs"]) == set(inputs)
+    assert all(len(entry["sha256"]) == 64 for entry in manifest["inputs"].values())
+
+
+def test_ingest_inputs_include_config_code_data_and_maps():
+    inputs = ingest_inputs("string_protein_links")
+    assert any(i.endswith("string/protein_links.yaml") for i in inputs)
+    assert any(i.endswith("string/protein_links.py") for i in inputs)
+    assert any(i.endswith("string/string_utils.py") for i in inputs)
+    assert "./data/string/9606.protein_links.txt.gz" in inputs
+    assert "./src/kg_alzheimers/maps/entrez-2-string.yaml" in inputs
+    assert "./src/kg_alzheimers/translation_table.yaml" in inputs
+
+
+def test_changed_settings_are_detected(inputs, output_dir):
+    record_manifest("test", inputs, output_dir, {"row_limit": 100, "engine": "koza"})
+    assert changed_inputs("test", inputs, output_dir, {"row_limit": None, "engine": "koza"}) == ["<settings>"]
+    assert changed_inputs("test", inputs, output_dir, {"row_limit": 100, "engine": "columnar"}) == ["<settings>"]
+    assert is_up_to_date("test", inputs, output_dir, {"row_limit": 100, "engine": "koza"})
+
+
+def test_ingest_settings():
+    assert ingest_settings("string_protein_links", 100, "columnar") == {"row_limit": 100, "engine": "columnar"}
+    # ingests without a columnar engine run through Koza anyway
+    assert ingest_settings("hgnc_gene", None, "columnar") == {"row_limit": None, "engine": "koza"}
+
+
+def test_ingest_inputs_include_the_package_modules_the_ingest_runs():
+    koza = [i for i in ingest_inputs("string_protein_links") if "/kg_alzheimers/" in i]
+    assert any(i.endswith("utils/association_utils.py") for i in koza)
+    # imported by association_utils
+    assert any(i.endswith("utils/id_utils.py") for i in koza)
+    assert not any(i.endswith("columnar/string_protein_links.py") for i in koza)
+
+    columnar = ingest_inputs("string_protein_links", "columnar")
+    assert any(i.endswith("columnar/string_protein_links.py") for i in columnar)
+    assert any(i.endswith("columnar/tsv.py") for i in columnar)
+    assert not any(i.endswith("utils/association_utils.py") for i in columnar)
+
+
+def test_package_modules_follow_imports():
+    files = package_modules(["kg_alzheimers.columnar.phenio"])
+    assert {Path(file).relative_to(manifest_utils.PACKAGE_DIR).as_posix() for file in files} >= {
+        "columnar/phenio.py",
+        "columnar/tsv.py",
+        "utils/parquet_utils.py",
+        "utils/manifest_utils.py",
+    }
+
+
+def test_phenio_inputs_include_the_phenio_transform():
+    modules = {Path(file).relative_to(manifest_utils.PACKAGE_DIR).as_posix() for file in PHENIO_INPUTS[1:]}
+    assert PHENIO_INPUTS[0] == manifest_utils.PHENIO_TAR
+    assert {"columnar/phenio.py", "columnar/tsv.py", "utils/parquet_utils.py", "utils/schema_utils.py"} <= modules
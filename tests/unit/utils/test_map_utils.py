@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+
+import pytest
+import yaml
+from koza.app import KozaApp
+from koza.model.config.source_config import MapFileConfig
+from koza.model.source import Source
+from koza.utils.exceptions import MapItemException
+
+from kg_alzheimers.utils.map_utils import (
+    CompiledMap,
+    _koza_load_map,
+    clear_map_registry,
+    compile_map,
+    format_map_report,
+    is_compilable,
+    preload_maps,
+    use_compiled_maps,
+)
+
+ROWS = [
+    "#NCBI taxid / entrez / STRING",
+    "# a comment",
+    "9606\t1\t9606.ENSP01",
+    "9606\t2\t9606.ENSP02",
+    "9606\t3\t9606.ENSP03",
+    "9606\t4\t9606.ENSP02",
+    "9606\t\t9606.ENSP04",
+]
+
+
+@pytest.fixture(autouse=True)
+def map_registry(monkeypatch):
+    monkeypatch.setattr(KozaApp, "_load_map", _koza_load_map)
+    clear_map_registry()
+    yield
+    clear_map_registry()
+
+
+@pytest.fixture
+def map_config(tmp_path):
+    path = tmp_path / "entrez_2_string.tsv"
+    path.write_text("\n".join(ROWS) + "\n")
+    with open("src/kg_alzheimers/maps/entrez-2-string.yaml") as fh:
+        config = yaml.safe_load(fh)
+    config["files"] = [str(path)]
+    # set by KozaApp, the map has no transform code
+    config["transform_code"] = str(tmp_path / "entrez-2-string.py")
+    return MapFileConfig(**config)
+
+
+def koza_map(config, load_map=_koza_load_map, ingest=None):
+    koza_app = KozaApp.__new__(KozaApp)
+    koza_app._map_cache = {}
+    koza_app.source = SimpleNamespace(config=SimpleNamespace(name=ingest)) if ingest else None
+    load_map(koza_app, Source(config))
+    return koza_app._map_cache[config.name]
+
+
+def test_same_map_as_koza(map_config, tmp_path):
+    compiled = CompiledMap(compile_map(map_config, tmp_path / "cache"))
+    expected = koza_map(map_config)
+    assert dict(compiled) == dict(expected)
+    assert compiled["9606.ENSP02"] == {"entrez": "4"}
+    assert compiled["9606.ENSP04"] == {"entrez": ""}
+    assert len(compiled) == 4
+
+
+def test_missing_key(map_config, tmp_path):
+    compiled = CompiledMap(compile_map(map_config, tmp_path / "cache"))
+    with pytest.raises(MapItemException):
+        compiled["9606.ENSP05"]
+    assert compiled.get("9606.ENSP05") is None
+    assert "9606.ENSP01" in compiled.keys()
+    assert "9606.ENSP05" not in compiled
+
+
+def test_reused_until_source_changes(map_config, tmp_path):
+    cache = tmp_path / "cache"
+    path = compile_map(map_config, cache)
+    (path / "data.bin").touch()
+    assert compile_map(map_config, cache) == path
+
+    with open(map_config.files[0], "a") as fh:
+        fh.write("9606\t5\t9606.ENSP05\n")
+    rebuilt = compile_map(map_config, cache)
+    assert rebuilt != path
+    assert CompiledMap(rebuilt)["9606.ENSP05"] == {"entrez": "5"}
+
+
+def test_empty_map(map_config, tmp_path):
+    with open(map_config.files[0], "w") as fh:
+        fh.write(ROWS[0] + "\n")
+    compiled = CompiledMap(compile_map(map_config, tmp_path / "cache"))
+    assert len(compiled) == 0
+    assert "9606.ENSP01" not in compiled
+
+
+def test_maps_with_transform_code_are_not_compiled():
+    with open("src/kg_alzheimers/maps/mimtitles.yaml") as fh:
+        config = MapFileConfig(**yaml.safe_load(fh))
+    config.transform_code = "src/kg_alzheimers/maps/mimtitles.py"
+    assert not is_compilable(config)
+
+
+def test_koza_loads_compiled_maps(map_config, tmp_path):
+    use_compiled_maps(str(tmp_path / "cache"))
+    loaded = koza_map(map_config, KozaApp._load_map)
+    assert isinstance(loaded, CompiledMap)
+    assert dict(loaded) == dict(koza_map(map_config))
+
+
+def test_map_loaded_once_per_build(map_config, tmp_path):
+    use_compiled_maps(str(tmp_path / "cache"))
+    first = koza_map(map_config, KozaApp._load_map, ingest="string_protein_links")
+    second = koza_map(map_config, KozaApp._load_map, ingest="other_ingest")
+    assert first is second
+    report = format_map_report()
+    assert "entrez_2_string" in report
+    assert "MB mapped, used by other_ingest, string_protein_links" in report
+
+
+def test_preload_maps(map_config, tmp_path):
+    map_file = tmp_path / "entrez-2-string.yaml"
+    with open("src/kg_alzheimers/maps/entrez-2-string.yaml") as fh:
+        config = yaml.safe_load(fh)
+    config["files"] = [str(file) for file in map_config.files]
+    map_file.write_text(yaml.safe_dump(config))
+    missing_file = tmp_path / "missing.yaml"
+    missing_file.write_text(yaml.safe_dump({**config, "name": "missing", "files": [str(tmp_path / "missing.tsv")]}))
+
+    preload_maps({"a": [str(map_file)], "b": [str(map_file), str(missing_file)]}, str(tmp_path / "cache"))
+    report = format_map_report()
+    assert "entrez_2_string" in report and "used by a, b" in report
+    assert "missing" not in report
+
+    use_compiled_maps(str(tmp_path / "cache"))
+    assert dict(koza_map(map_config, KozaApp._load_map)) == dict(koza_map(map_config))
@@ -0,0 +1,47 @@
+import pyarrow.parquet as pq
+
+from kg_alzheimers.utils.mapping_utils import compile_mappings
+
+SSSOM = [
+    "# curie_map:",
+    "#   MONDO: http://purl.obolibrary.org/obo/MONDO_",
+    "subject_id\tpredicate_id\tobject_id\tcomment",
+    "MONDO:2\tskos:exactMatch\tOMIM:2\t# a comment",
+    "MONDO:1\tskos:exactMatch\tOMIM:1\t",
+    "MONDO:3\tskos:exactMatch\t\t",
+]
+CHEBI_SSSOM = ["subject_id\tobject_id", "CHEBI:1\tMESH:1", "CHEBI:2\tOMIM:2"]
+
+
+def _write(tmp_path):
+    mappings = [tmp_path / "mondo.sssom.tsv", tmp_path / "chebi.sssom.tsv"]
+    mappings[0].write_text("\n".join(SSSOM) + "\n")
+    mappings[1].write_text("\n".join(CHEBI_SSSOM) + "\n")
+    return [str(mapping) for mapping in mappings]
+
+
+def test_compile_mappings(tmp_path):
+    mappings = _write(tmp_path)
+    path = compile_mappings(mappings, str(tmp_path / "cache"))
+    # sorted by object_id, keeping the order of the mappings in the files
+    assert pq.read_table(path).to_pylist() == [
+        {"object_id": "MESH:1", "subject_id": "CHEBI:1", "mapping": 3},
+        {"object_id": "OMIM:1", "subject_id": "MONDO:1", "mapping": 1},
+        {"object_id": "OMIM:2", "subject_id": "MONDO:2", "mapping": 0},
+        {"object_id": "OMIM:2", "subject_id": "CHEBI:2", "mapping": 4},
+    ]
+
+
+def test_compile_mappings_is_cached(tmp_path):
+    mappings = _write(tmp_path)
+    path = compile_mappings(mappings, str(tmp_path / "cache"))
+    mtime = path.stat().st_mtime_ns
+    assert compile_mappings(mappings, str(tmp_path / "cache")) == path
+    assert path.stat().st_mtime_ns == mtime
+
+    # a changed file is compiled again, replacing the old table
+    (tmp_path / "chebi.sssom.tsv").write_text("subject_id\tobject_id\nCHEBI:1\tMESH:1\n")
+    changed = compile_mappings(mappings, str(tmp_path / "cache"))
+    assert changed != path
+    assert [p.name for p in (tmp_path / "cache").glob("*.parquet")] == [changed.name]
+    assert pq.read_table(changed).num_rows == 3
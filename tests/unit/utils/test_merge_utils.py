@@ -0,0 +1,192 @@
+import gzip
+import tarfile
+
+import pytest
+import yaml
+from pyarrow import csv as pa_csv
+
+from kg_alzheimers.utils.id_utils import DEFAULT_ID_STRATEGY, edge_id, get_id_strategy, set_id_strategy
+from kg_alzheimers.utils.merge_utils import merge
+from kg_alzheimers.utils.parquet_utils import write_parquet
+
+FILES = {
+    "a_nodes.tsv": [
+        ["id", "category", "name", "in_taxon"],
+        ["HGNC:1", "biolink:Gene", "one", "NCBITaxon:9606"],
+        ["HGNC:2", "biolink:Gene", '"quoted"', ""],
+        ["MONDO:1", "biolink:Disease", "disease", ""],
+        ["HGNC:1", "biolink:Gene", "one again", "NCBITaxon:9606"],
+    ],
+    "b_nodes.tsv": [
+        ["id", "category", "provided_by", "xref"],
+        ["HGNC:1", "biolink:Gene", "ignored", "ENSEMBL:1"],
+        ["CHEBI:1", "", "ignored", ""],
+        ["MONDO:2", "biolink:Disease", "", "OMIM:2"],
+    ],
+    "a_edges.tsv": [
+        ["id", "subject", "predicate", "object", "category", "publications"],
+        ["e1", "HGNC:1", "biolink:related_to", "OMIM:1", "biolink:Association", "PMID:1|PMID:2"],
+        ["e2", "HGNC:2", "biolink:related_to", "MONDO:1", "biolink:Association", ""],
+        ["e3", "HGNC:9", "biolink:interacts_with", "HGNC:1", "biolink:Association", ""],
+        ["e4", "MESH:1", "biolink:affects", "OMIM:3", "", ""],
+        ["e4", "HGNC:1", "biolink:affects", "MONDO:2", "biolink:Association", ""],
+    ],
+    "b_edges.tsv": [
+        ["id", "object", "subject", "predicate", "category"],
+        ["e5", "MONDO:2", "CHEBI:1", "biolink:treats", "biolink:Association"],
+        ["e6", "FOO:1", "MONDO:404", "biolink:treats", "biolink:Association"],
+    ],
+    "readme.txt": [["not", "merged"]],
+}
+
+SSSOM = [
+    "# curie_map:",
+    "#   MONDO: http://purl.obolibrary.org/obo/MONDO_",
+    "subject_id\tpredicate_id\tobject_id\tmapping_justification",
+    "MONDO:1\tskos:exactMatch\tOMIM:1\tsemapv:ManualMappingCuration",
+    "MONDO:2\tskos:exactMatch\tOMIM:3\tsemapv:ManualMappingCuration",
+    "MONDO:3\tskos:exactMatch\tOMIM:3\tsemapv:ManualMappingCuration  # a second mapping",
+]
+CHEBI_SSSOM = ["subject_id\tobject_id", "CHEBI:1\tMESH:1"]
+
+
+@pytest.fixture
+def transform_output(tmp_path):
+    input_dir = tmp_path / "transform_output"
+    input_dir.mkdir()
+    for name, rows in FILES.items():
+        (input_dir / name).write_text("".join("\t".join(row) + "\n" for row in rows))
+    mappings = [tmp_path / "mondo.sssom.tsv", tmp_path / "chebi.sssom.tsv"]
+    mappings[0].write_text("\n".join(SSSOM) + "\n")
+    mappings[1].write_text("\n".join(CHEBI_SSSOM) + "\n")
+    return input_dir, [str(mapping) for mapping in mappings]
+
+
+def _outputs(output_dir):
+    with tarfile.open(output_dir / "kg.tar.gz") as tar:
+        members = {member.name: tar.extractfile(member).read().decode() for member in tar.getmembers()}
+    for name in ["kg-duplicate-nodes.tsv.gz", "kg-dangling-edges.tsv.gz"]:
+        members[name] = gzip.decompress((output_dir / "qc" / name).read_bytes()).decode()
+    return members, yaml.safe_load((output_dir / "qc_report.yaml").read_text())
+
+
+def test_merge_matches_cat_merge(tmp_path, transform_output):
+    from cat_merge.merge import merge as cat_merge
+
+    input_dir, mappings = transform_output
+    cat_merge(
+        name="kg",
+        nodes=sorted(str(path) for path in input_dir.glob("*_nodes.tsv")),
+        edges=sorted(str(path) for path in input_dir.glob("*_edges.tsv")),
+        mappings=mappings,
+        output_dir=str(tmp_path / "cat_merge"),
+    )
+    merge("kg", str(input_dir), str(tmp_path / "duckdb"), mappings=mappings, memory_limit="100MB")
+
+    expected_files, expected_report = _outputs(tmp_path / "cat_merge")
+    files, report = _outputs(tmp_path / "duckdb")
+    assert files == expected_files
+    assert report == expected_report
+    assert not list((tmp_path / "duckdb").glob(".merge-*"))
+
+
+def test_merge(tmp_path, transform_output):
+    input_dir, mappings = transform_output
+    merge("kg", str(input_dir), str(tmp_path), mappings=mappings)
+    files, report = _outputs(tmp_path)
+
+    nodes = [line.split("\t") for line in files["kg_nodes.tsv"].splitlines()]
+    assert nodes[0] == ["id", "category", "name", "in_taxon", "provided_by", "xref"]
+    assert [node[0] for node in nodes[1:]] == ["HGNC:1", "HGNC:2", "MONDO:1", "CHEBI:1", "MONDO:2"]
+    assert nodes[1][2] == "one"
+    assert nodes[2][2] == '"""quoted"""'
+    assert nodes[4][4] == "b_nodes"
+
+    edges = [line.split("\t") for line in files["kg_edges.tsv"].splitlines()]
+    assert edges[0] == [
+        "id",
+        "original_subject",
+        "predicate",
+        "original_object",
+        "category",
+        "publications",
+        "provided_by",
+        "subject",
+        "object",
+    ]
+    # e1 is mapped to MONDO:1, e4 is duplicated, e3 and e6 are dangling
+    assert [(edge[0], edge[7], edge[8], edge[3]) for edge in edges[1:]] == [
+        ("e1", "HGNC:1", "MONDO:1", "OMIM:1"),
+        ("e2", "HGNC:2", "MONDO:1", ""),
+        ("e5", "CHEBI:1", "MONDO:2", ""),
+    ]
+    dangling = [line.split("\t")[0] for line in files["kg-dangling-edges.tsv.gz"].splitlines()[1:]]
+    # e4 is also mapped to MONDO:3, which isn't a node
+    assert dangling == ["e3", "e4", "e6"]
+
+    assert {node["name"]: node["total_number"] for node in report["nodes"]} == {"a_nodes": 3, "b_nodes": 2}
+    assert [edge["name"] for edge in report["duplicate_edges"]] == ["a_edges"]
+    assert report["duplicate_edges"][0]["total_number"] == 3
+
+    # e4 is repeated for both mappings of OMIM:3
+    assert yaml.safe_load((tmp_path / "qc" / "kg-mapping-report.yaml").read_text()) == {
+        "mappings": 4,
+        "remapped": [
+            {"prefix": "MESH", "ids": 1, "subjects": 2, "objects": 0},
+            {"prefix": "OMIM", "ids": 2, "subjects": 0, "objects": 3},
+        ],
+    }
+    assert len(list((tmp_path / "mapping_cache").glob("*.parquet"))) == 1
+
+
+def test_merge_reads_parquet(tmp_path, transform_output):
+    input_dir, mappings = transform_output
+    parquet_dir = tmp_path / "parquet"
+    parquet_dir.mkdir()
+    for path in list(input_dir.glob("*_nodes.tsv")) + list(input_dir.glob("*_edges.tsv")):
+        table = pa_csv.read_csv(
+            path,
+            parse_options=pa_csv.ParseOptions(delimiter="\t", quote_char=False),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: "string" for name in FILES[path.name][0]}, strings_can_be_null=True
+            ),
+        )
+        write_parquet(table.to_reader(), parquet_dir / f"{path.stem}.parquet")
+
+    merge("kg", str(input_dir), str(tmp_path / "from_tsv"), mappings=mappings)
+    merge("kg", str(parquet_dir), str(tmp_path / "from_parquet"), mappings=mappings)
+    assert _outputs(tmp_path / "from_parquet") == _outputs(tmp_path / "from_tsv")
+
+
+def test_cat_merge_rejects_parquet(tmp_path):
+    from kg_alzheimers.cli_utils import merge_files
+
+    (tmp_path / "a_nodes.tsv").write_text("id\tcategory\n")
+    (tmp_path / "a_edges.parquet").write_bytes(b"")
+    with pytest.raises(ValueError, match="cat_merge only reads TSV"):
+        merge_files(input_dir=str(tmp_path), output_dir=str(tmp_path / "output"), engine="cat_merge")
+
+
+@pytest.fixture
+def default_ids():
+    previous = get_id_strategy()
+    set_id_strategy(DEFAULT_ID_STRATEGY)
+    yield
+    set_id_strategy(previous)
+
+
+def test_edges_from_identical_rows_survive_the_merge(tmp_path, default_ids):
+    # e.g. the same dictyBase gene and phenotype recorded for two strains
+    input_dir = tmp_path / "transform_output"
+    input_dir.mkdir()
+    (input_dir / "x_nodes.tsv").write_text("id\tcategory\nDDB:1\tbiolink:Gene\nDDBSTRAIN:1\tbiolink:Phenotype\n")
+    rows = [["id", "subject", "predicate", "object", "primary_knowledge_source", "category"]]
+    for _ in range(2):
+        values = ["DDB:1", "biolink:has_phenotype", "DDBSTRAIN:1", "infores:dictybase"]
+        rows.append([edge_id(*values)] + values + ["biolink:GeneToPhenotypicFeatureAssociation"])
+    (input_dir / "x_edges.tsv").write_text("".join("\t".join(row) + "\n" for row in rows))
+
+    merge("kg", str(input_dir), str(tmp_path / "output"))
+    files, report = _outputs(tmp_path / "output")
+    assert len(files["kg_edges.tsv"].splitlines()) == 3
+    assert report["duplicate_edges"] == []
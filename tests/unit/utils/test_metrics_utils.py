@@ -0,0 +1,122 @@
+import json
+import math
+import time
+
+import pytest
+from koza.model.config.source_config import MapFileConfig, PrimaryFileConfig
+from koza.model.source import Source
+
+from kg_alzheimers.utils import metrics_utils
+from kg_alzheimers.utils.metrics_utils import (
+    collect_metrics,
+    compare_metrics,
+    count_rows,
+    format_comparison,
+    load_metrics,
+    use_row_counts,
+)
+
+
+@pytest.fixture
+def row_counts(monkeypatch):
+    monkeypatch.setattr(Source, "_get_row", Source._get_row)
+    use_row_counts()
+
+
+def _config(config_class, path, **kwargs):
+    return config_class(
+        name="example", files=[str(path)], format="csv", delimiter="\t", columns=["id", "score"], **kwargs
+    )
+
+
+def test_collect_metrics_counts_koza_rows(tmp_path, row_counts):
+    data = tmp_path / "example.tsv"
+    data.write_text("id\tscore\n" + "".join(f"X:{i}\t{i}\n" for i in range(10)))
+    filters = [{"column": "score", "inclusion": "exclude", "filter_code": "in", "value": ["0", "1", "2", "3"]}]
+    transform_output = tmp_path / "output" / "transform_output"
+    transform_output.mkdir(parents=True)
+
+    with collect_metrics("example", str(tmp_path / "output")):
+        rows = list(Source(_config(PrimaryFileConfig, data, filters=filters)))
+        # maps aren't the ingest's rows
+        list(Source(_config(MapFileConfig, data, key="id", values=["score"])))
+        (transform_output / "example_edges.tsv").write_text("id\n" + "e\n" * len(rows))
+
+    assert len(rows) == 6
+    metrics = json.loads((tmp_path / "output" / "metrics" / "example.json").read_text())
+    assert metrics["rows_read"] == 10
+    assert metrics["rows_filtered"] == 4
+    assert metrics["nodes"] is None
+    assert metrics["edges"] == metrics["rows_written"] == 6
+    assert metrics["rows_per_second"] > 0
+    assert metrics["peak_rss_mb"] > 0
+
+
+def test_collect_metrics_reported_rows(tmp_path):
+    with collect_metrics("phenio", str(tmp_path), engine="columnar") as metrics:
+        metrics["rows_read"] = 20
+    assert load_metrics(str(tmp_path / "metrics"))["phenio"]["rows_read"] == 20
+    assert load_metrics(str(tmp_path / "metrics" / "phenio.json"))["phenio"]["engine"] == "columnar"
+
+
+def test_count_rows(tmp_path):
+    path = tmp_path / "x.tsv"
+    assert count_rows(path) is None
+    path.write_text("id\n")
+    assert count_rows(path) == 0
+    path.write_text("id\na\nb")
+    assert count_rows(path) == 2
+
+
+def test_compare_metrics():
+    baseline = {
+        "a": {"wall_seconds": 10.0, "rows_per_second": 1000.0, "peak_rss_mb": 100.0, "rows_read": 10000},
+        "b": {"wall_seconds": 1.0, "rows_per_second": None},
+    }
+    current = {
+        "a": {"wall_seconds": 10.5, "rows_per_second": 800.0, "peak_rss_mb": 200.0, "rows_read": 9000},
+        "c": {"wall_seconds": 1.0},
+    }
+    rows = compare_metrics(baseline, current)
+    regressions = {row["metric"] for row in rows if row["regression"]}
+    assert regressions == {"rows_per_second", "peak_rss_mb"}
+    assert {row["ingest"] for row in rows} == {"a"}
+    assert compare_metrics(baseline, current, threshold=1.5) == [{**row, "regression": False} for row in rows]
+
+    table = format_comparison(rows, baseline, current)
+    assert "only in baseline: b" in table
+    assert "new: c" in table
+    assert "2 regression(s)" in table
+    assert "-20.0%" in table
+
+
+def test_row_counts_reset_between_ingests(tmp_path, row_counts):
+    metrics_utils._row_counts["read"] = 5
+    with collect_metrics("x", str(tmp_path)):
+        pass
+    assert load_metrics(str(tmp_path / "metrics"))["x"]["rows_read"] is None
+
+
+def test_compare_metrics_from_zero():
+    baseline = {"a": {"wall_seconds": 0.0, "rows_per_second": 0.0, "cpu_seconds": 0.0}}
+    current = {"a": {"wall_seconds": 2.0, "rows_per_second": 500.0, "cpu_seconds": 0.0}}
+    rows = {row["metric"]: row for row in compare_metrics(baseline, current)}
+    assert rows["wall_seconds"]["change"] == math.inf
+    assert rows["wall_seconds"]["regression"]
+    # more throughput than none at all isn't a regression
+    assert not rows["rows_per_second"]["regression"]
+    assert rows["cpu_seconds"]["change"] == 0.0
+    assert not rows["cpu_seconds"]["regression"]
+    assert "+inf" in format_comparison(list(rows.values()), baseline, current)
+
+
+def test_peak_rss_is_per_ingest(tmp_path):
+    # two ingests in one process, like a serial --all run, the second mustn't report the first one's peak
+    with collect_metrics("large", str(tmp_path)):
+        data = b"x" * (128 * 1024 * 1024)
+        time.sleep(3 * metrics_utils.RSS_SAMPLE_SECONDS)
+        del data
+    with collect_metrics("small", str(tmp_path)):
+        pass
+    metrics = load_metrics(str(tmp_path / "metrics"))
+    assert metrics["small"]["peak_rss_mb"] < metrics["large"]["peak_rss_mb"] - 64
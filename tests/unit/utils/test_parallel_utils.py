@@ -0,0 +1,82 @@
+"""
+Unit tests for running ingests in parallel worker processes
+"""
+
+import os
+
+import pytest
+
+from kg_alzheimers.utils.parallel_utils import format_summary, run_parallel
+
+
+def succeeds(path: str):
+    with open(path, "w") as f:
+        f.write(str(os.getpid()))
+
+
+def raises():
+    raise ValueError("Missing data")
+
+
+def crashes():
+    os._exit(3)
+
+
+@pytest.fixture
+def results(tmp_path):
+    tasks = [
+        {"name": "first", "func": succeeds, "kwargs": {"path": str(tmp_path / "first.txt")}},
+        {"name": "second", "func": succeeds, "kwargs": {"path": str(tmp_path / "second.txt")}, "lane": "io"},
+        {"name": "broken", "func": raises, "kwargs": {}},
+        {"name": "crashed", "func": crashes, "kwargs": {}},
+        {"name": "downstream", "func": succeeds, "kwargs": {"path": str(tmp_path / "x.txt")}, "depends_on": ["broken"]},
+        {"name": "after_first", "func": succeeds, "kwargs": {"path": str(tmp_path / "y.txt")}, "depends_on": ["first"]},
+    ]
+    return {result["name"]: result for result in run_parallel(tasks, max_workers=2, lanes={"io": 1})}
+
+
+def test_every_task_reports(results):
+    assert set(results.keys()) == {"first", "second", "broken", "crashed", "downstream", "after_first"}
+    for result in results.values():
+        assert result["wall_time"] >= 0
+
+
+def test_tasks_run_in_separate_processes(results, tmp_path):
+    pids = {(tmp_path / "first.txt").read_text(), (tmp_path / "second.txt").read_text()}
+    assert len(pids) == 2
+    assert str(os.getpid()) not in pids
+
+
+def test_failures_are_isolated(results):
+    assert results["first"]["status"] == "ok"
+    assert results["second"]["status"] == "ok"
+    assert results["broken"]["status"] == "failed"
+    assert results["broken"]["error"] == "ValueError: Missing data"
+    assert results["crashed"]["status"] == "failed"
+    assert "exited with code 3" in results["crashed"]["error"]
+    assert results["crashed"]["max_rss_mb"] is None
+
+
+def test_dependencies(results, tmp_path):
+    assert results["after_first"]["status"] == "ok"
+    assert (tmp_path / "y.txt").is_file()
+    assert results["downstream"]["status"] == "failed"
+    assert results["downstream"]["error"] == "dependency failed: broken"
+    assert not (tmp_path / "x.txt").exists()
+
+
+def test_unknown_dependency():
+    with pytest.raises(ValueError):
+        run_parallel([{"name": "orphan", "func": raises, "kwargs": {}, "depends_on": ["missing"]}], max_workers=1)
+
+
+def test_summary_table(results):
+    summary = format_summary(list(results.values()))
+    lines = summary.splitlines()
+    assert lines[0].split() == ["ingest", "status", "wall", "(s)", "cpu", "(s)", "max", "rss", "(MB)"]
+    assert "broken: ValueError: Missing data" in summary
+
+
+def test_max_workers_must_be_positive():
+    with pytest.raises(ValueError):
+        run_parallel([], max_workers=0)
@@ -0,0 +1,101 @@
+import pyarrow
+import pyarrow.parquet as pq
+from biolink_model.datamodel.pydanticmodel_v2 import (
+    AgentTypeEnum,
+    Gene,
+    GeneToPhenotypicFeatureAssociation,
+    KnowledgeLevelEnum,
+)
+from koza.app import KozaApp
+from koza.io.writer.tsv_writer import TSVWriter
+
+from kg_alzheimers.utils.parquet_utils import (
+    ParquetWriter,
+    remove_other_formats,
+    use_parquet_writer,
+    write_parquet,
+)
+
+NODE_PROPERTIES = ["id", "category", "name", "xref", "in_taxon"]
+EDGE_PROPERTIES = [
+    "id",
+    "subject",
+    "predicate",
+    "object",
+    "category",
+    "negated",
+    "publications",
+    "has_evidence",
+    "knowledge_level",
+    "agent_type",
+]
+
+
+def _entities():
+    gene = Gene(id="HGNC:1", category=["biolink:Gene"], name="A1BG", xref=["ENSEMBL:1", "OMIM:2"])
+    association = GeneToPhenotypicFeatureAssociation(
+        id="uuid:1",
+        subject="HGNC:1",
+        predicate="biolink:has_phenotype",
+        object="HP:1",
+        negated=True,
+        publications=["PMID:1", "PMID:2"],
+        knowledge_level=KnowledgeLevelEnum.knowledge_assertion,
+        agent_type=AgentTypeEnum.manual_agent,
+    )
+    return [gene, association]
+
+
+def test_parquet_writer_writes_what_tsv_writer_does(tmp_path):
+    tsv = TSVWriter(tmp_path, "example", list(NODE_PROPERTIES), list(EDGE_PROPERTIES))
+    parquet = ParquetWriter(tmp_path, "example", list(NODE_PROPERTIES), list(EDGE_PROPERTIES))
+    for writer in [tsv, parquet]:
+        writer.write(_entities())
+        writer.finalize()
+
+    for kind in ["nodes", "edges"]:
+        table = pq.read_table(tmp_path / f"example_{kind}.parquet")
+        header, *rows = [line.split("\t") for line in (tmp_path / f"example_{kind}.tsv").read_text().splitlines()]
+        assert table.column_names == header
+        as_tsv = [
+            ["|".join(value) if isinstance(value, list) else "" if value is None else value for value in row.values()]
+            for row in table.to_pylist()
+        ]
+        assert as_tsv == rows
+
+    edges = pq.read_table(tmp_path / "example_edges.parquet")
+    assert edges.schema.field("publications").type == pyarrow.list_(pyarrow.string())
+    assert edges.schema.field("category").type == pyarrow.string()
+    assert edges.column("publications").to_pylist() == [["PMID:1", "PMID:2"]]
+    assert edges.column("has_evidence").to_pylist() == [None]
+
+
+def test_write_parquet_splits_multivalued_columns(tmp_path):
+    batch = pyarrow.RecordBatch.from_pydict(
+        {"id": ["a", "b"], "name": ["x|y", None], "publications": ["PMID:1|PMID:2", None]}
+    )
+    reader = pyarrow.RecordBatchReader.from_batches(batch.schema, [batch])
+    assert write_parquet(reader, tmp_path / "x.parquet") == 2
+    table = pq.read_table(tmp_path / "x.parquet")
+    assert table.to_pylist() == [
+        {"id": "a", "name": "x|y", "publications": ["PMID:1", "PMID:2"]},
+        {"id": "b", "name": None, "publications": None},
+    ]
+
+
+def test_use_parquet_writer():
+    tsv_get_writer = KozaApp._get_writer
+    try:
+        use_parquet_writer()
+        assert KozaApp._get_writer is not tsv_get_writer
+        use_parquet_writer(False)
+        assert KozaApp._get_writer is tsv_get_writer
+    finally:
+        KozaApp._get_writer = tsv_get_writer
+
+
+def test_remove_other_formats(tmp_path):
+    for name in ["x_nodes.tsv", "x_edges.tsv", "x_edges.parquet", "y_edges.tsv"]:
+        (tmp_path / name).write_text("")
+    remove_other_formats(str(tmp_path), "x", "parquet")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["x_edges.parquet", "y_edges.tsv"]
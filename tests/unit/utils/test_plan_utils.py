@@ -0,0 +1,100 @@
+"""
+Unit tests for the transform --all planner
+"""
+
+import pytest
+
+from kg_alzheimers.utils.plan_utils import build_ingest_graph, critical_path, format_plan, schedule
+
+
+def node(estimate, lane="cpu", depends_on=None):
+    return {
+        "lane": lane,
+        "depends_on": depends_on or [],
+        "maps": [],
+        "files": [],
+        "missing": [],
+        "skipped": False,
+        "estimate": float(estimate),
+    }
+
+
+@pytest.fixture
+def graph():
+    return {
+        "small": node(10),
+        "medium": node(20),
+        "large": node(40),
+        "after_small": node(25, depends_on=["small"]),
+        "download": node(30, lane="io"),
+    }
+
+
+def test_longest_chains_start_first(graph):
+    planned = schedule(graph, cpu_workers=2, io_workers=1)
+    starts = {task["name"]: task["start"] for task in planned}
+    assert starts["large"] == 0
+    # small unlocks after_small, so the chain small -> after_small outranks medium
+    assert starts["small"] == 0
+    assert starts["after_small"] == 10
+    assert starts["medium"] == 35
+    assert starts["download"] == 0
+
+
+def test_downloads_do_not_use_cpu_workers(graph):
+    planned = schedule(graph, cpu_workers=1, io_workers=1)
+    cpu_end = max(task["end"] for task in planned if task["lane"] == "cpu")
+    assert cpu_end == 95
+    assert {task["slot"] for task in planned if task["lane"] == "cpu"} == {0}
+
+
+def test_critical_path(graph):
+    path, length = critical_path(graph)
+    assert path == ["large"]
+    assert length == 40
+    graph["after_small"]["estimate"] = 35.0
+    assert critical_path(graph) == (["small", "after_small"], 45.0)
+
+
+def test_dependency_cycle_is_an_error(graph):
+    graph["small"]["depends_on"] = ["after_small"]
+    with pytest.raises(ValueError):
+        schedule(graph, cpu_workers=2)
+
+
+def test_format_plan(graph):
+    plan = format_plan(graph, schedule(graph, cpu_workers=2), cpu_workers=2)
+    assert "Critical path: large (0:00:40)" in plan
+    assert plan.splitlines()[-1] == "Estimated makespan: 0:00:55"
+
+
+def test_ingest_graph(tmp_path):
+    graph = build_ingest_graph(output_dir=str(tmp_path))
+    assert graph["phenio"]["lane"] == "cpu"
+    assert graph["biogrid"]["lane"] == "io"
+    assert graph["string_protein_links"]["lane"] == "cpu"
+    assert graph["string_protein_links"]["maps"] == ["entrez_2_string"]
+    assert "./data/string/entrez_2_string.tsv" in graph["string_protein_links"]["files"]
+    assert graph["panther_genome_orthologs"]["files"] == ["data/panther/AllOrthologs.tar.gz"]
+    assert graph["string_protein_links"]["depends_on"] == ["map:entrez_2_string"]
+
+
+def test_ingests_wait_for_the_maps_they_share(tmp_path):
+    graph = build_ingest_graph(output_dir=str(tmp_path))
+    taxon_labels = graph["map:taxon-labels"]
+    assert taxon_labels["lane"] == "cpu"
+    assert taxon_labels["map_file"].endswith("taxon-labels.yaml")
+    assert {"alliance_gene", "dictybase_gene", "pombase_gene"} <= set(taxon_labels["users"])
+    for user in taxon_labels["users"]:
+        assert "map:taxon-labels" in graph[user]["depends_on"]
+    assert graph["map:entrez_2_string"]["files"] == ["data/string/entrez_2_string.tsv"]
+
+
+def test_critical_path_through_a_map(graph):
+    graph["map:shared"] = node(30)
+    graph["uses_map"] = node(15, depends_on=["map:shared"])
+    path, length = critical_path(graph)
+    assert path == ["map:shared", "uses_map"]
+    assert length == 45
+    planned = {task["name"]: task for task in schedule(graph, cpu_workers=2)}
+    assert planned["uses_map"]["start"] >= planned["map:shared"]["end"]
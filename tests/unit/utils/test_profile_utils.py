@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+import time
+
+from kg_alzheimers.utils.profile_utils import collect_profiles, frame_label, phase, profile_ingest
+
+SITE = "/venv/lib/python3.11/site-packages"
+SRC = "/repo/src/kg_alzheimers"
+
+
+def _stack(*filenames):
+    return tuple((filename, "f", 1) for filename in filenames)
+
+
+def test_phase():
+    transform = f"{SRC}/ingests/mgi/gene.py"
+    assert phase(_stack("main.py", f"{SITE}/koza/app.py", f"{SITE}/koza/model/source.py")) == "read"
+    assert phase(_stack("main.py", transform, f"{SITE}/pydantic/main.py")) == "pydantic"
+    assert phase(_stack("main.py", transform, f"{SITE}/koza/app.py", f"{SITE}/koza/io/writer/tsv_writer.py")) == "write"
+    assert phase(_stack("main.py", f"{SITE}/koza/app.py", transform)) == "transform"
+    # map lookups and the like called from the transform count as transform time
+    assert phase(_stack("main.py", transform, f"{SRC}/utils/map_utils.py")) == "transform"
+    assert phase(_stack("main.py", f"{SITE}/koza/app.py")) == "other"
+
+
+def test_frame_label():
+    assert frame_label((f"{SITE}/koza/app.py", "get_row", 10)) == "get_row (koza/app.py:10)"
+    assert frame_label(("/usr/lib/python3.11/csv.py", "__next__", 107)) == "__next__ (csv.py:107)"
+
+
+def _read_rows(seconds: float) -> int:
+    rows = 0
+    data = "a\tb\n" + "1\t2\n" * 10000
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        rows += sum(1 for _ in csv.DictReader(io.StringIO(data), delimiter="\t"))
+    return rows
+
+
+def test_profile_ingest(tmp_path):
+    profile_dir = tmp_path / "profile"
+    with profile_ingest("example", str(profile_dir)):
+        _read_rows(0.3)
+
+    summary = json.loads((profile_dir / "example.json").read_text())
+    assert summary["samples"] > 10
+    assert summary["phases"]["read"]["share"] > 0.5
+    assert abs(sum(values["share"] for values in summary["phases"].values()) - 1) < 0.01
+    assert summary["top_functions"][0]["samples"] > 0
+
+    folded = (profile_dir / "example.folded").read_text().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in folded) == summary["samples"]
+    assert any("_read_rows (" in line and "__next__ (csv.py" in line for line in folded)
+
+    with profile_ingest("other", str(profile_dir)):
+        time.sleep(0.05)
+    assert sorted(json.loads((profile_dir / "profile.json").read_text())) == ["example", "other"]
+
+
+def test_profile_ingest_disabled(tmp_path):
+    with profile_ingest("example", None):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_collect_profiles_skips_files_being_written(tmp_path):
+    (tmp_path / "done.json").write_text(json.dumps({"seconds": 1.0}))
+    # another ingest's summary, halfway through being written
+    (tmp_path / "running.json.123").write_text('{"sec')
+    assert collect_profiles(str(tmp_path)) == {"done": {"seconds": 1.0}}
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["done.json", "profile.json", "running.json.123"]
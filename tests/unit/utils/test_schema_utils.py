@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from biolink_model.datamodel import model
+
+from kg_alzheimers.utils import schema_utils
+
+
+@pytest.fixture(scope="module")
+def schema():
+    return schema_utils.biolink_schema()
+
+
+@pytest.fixture
+def biolink_sets(tmp_path):
+    schema_utils.biolink_sets.cache_clear()
+    yield lambda: schema_utils.biolink_sets(str(tmp_path))
+    schema_utils.biolink_sets.cache_clear()
+
+
+def test_schema_is_the_installed_version(schema):
+    assert schema.schema.version == model.version
+
+
+def test_derived_sets(schema):
+    sets = schema_utils.derive_sets(schema)
+    assert sets["version"] == model.version
+    assert "biolink:Gene" in sets["named_thing_descendants"]
+    assert "biolink:GeneToPhenotypicFeatureAssociation" in sets["association_descendants"]
+    assert "biolink:Gene" not in sets["association_descendants"]
+    assert {"biolink:has_phenotype", "biolink:subclass_of"} <= set(sets["related_to_descendants"])
+    assert sets["class_ancestors"]["biolink:Gene"][0] == "biolink:Gene"
+    assert "biolink:NamedThing" in sets["class_ancestors"]["biolink:Gene"]
+    assert "has evidence" in sets["multivalued_slots"]
+    assert "name" not in sets["multivalued_slots"]
+    for name in sets["multivalued_slots"]:
+        assert schema.get_slot(name).multivalued
+
+
+def test_sets_cached_per_version(biolink_sets, tmp_path, monkeypatch):
+    sets = biolink_sets()
+    cache_file = tmp_path / f"biolink-{model.version}.json"
+    assert json.loads(cache_file.read_text()) == sets
+
+    def _no_schema():
+        raise AssertionError("parsed the schema again")
+
+    monkeypatch.setattr(schema_utils, "biolink_schema", _no_schema)
+    schema_utils.biolink_sets.cache_clear()
+    assert biolink_sets() == sets